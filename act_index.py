@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Índice de atos extraídos (SQLite)
+# ======================================
+"""
+Guarda num banco SQLite cada linha extraída dos diários, com a data da edição,
+o tipo de diário, a planilha, a página e a coluna (quando o processador as
+informa), para responder sem reprocessar "em que edição saiu o RQN 12345/2025?".
+Cada edição é identificada pelo SHA-256 do PDF: uma edição já ingerida é
+ignorada, mesmo com outro nome de arquivo.
+
+Com GIL_INDEX_DB definido, o aplicativo alimenta o índice a cada extração e
+exibe a aba "Pesquisa de atos".
+
+Uso (a partir da raiz do repositório):
+    python act_index.py ingerir diarios/ --banco atos.sqlite
+    python act_index.py ingerir "diarios/2025-03-*.pdf" --tipo Legislativo --processos 4
+    python act_index.py consultar "RQN 12345/2025" --banco atos.sqlite
+    python act_index.py consultar --sigla LEI --de 2025-01-01 --ate 2025-03-31 --csv leis.csv
+"""
+
+# --- Importações ---
+# app.py importa este módulo: o processamento (app, batch) só é importado pelas funções de ingestão
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import datetime
+import threading
+from pathlib import Path
+
+# --- Configuração ---
+# Banco do índice (GIL_INDEX_DB); sem ele, o aplicativo não grava nem exibe a pesquisa
+INDEX_DB = os.environ.get("GIL_INDEX_DB") or None
+# Máximo de linhas devolvidas por consulta
+SEARCH_LIMIT = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS edicoes (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    diario TEXT NOT NULL,
+    data TEXT,
+    arquivo TEXT,
+    ingerido_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS atos (
+    edicao_id INTEGER NOT NULL REFERENCES edicoes (id),
+    planilha TEXT NOT NULL,
+    sigla TEXT,
+    numero TEXT,
+    ano TEXT,
+    pagina INTEGER,
+    coluna INTEGER,
+    detalhe TEXT
+);
+CREATE INDEX IF NOT EXISTS atos_ato ON atos (sigla, numero, ano);
+CREATE INDEX IF NOT EXISTS atos_numero ON atos (numero, ano);
+CREATE INDEX IF NOT EXISTS atos_edicao ON atos (edicao_id);
+CREATE INDEX IF NOT EXISTS edicoes_data ON edicoes (data);
+"""
+
+# Colunas devolvidas por ActIndex.search
+SEARCH_COLUMNS = ['Data', 'Diário', 'Planilha', 'Sigla', 'Número', 'Ano', 'Página', 'Coluna', 'Detalhe', 'Arquivo']
+
+# "RQN 12345/2025", "LEI nº 25.020/2025", "DEC 46000 2020"
+ATO_PATTERN = re.compile(r'^\s*([A-Za-zÀ-ú]+)\.?\s*(?:n[º°o.]*\s*)?([\d.]+)?(?:\s*[/\s]\s*(\d{4}))?\s*$', re.IGNORECASE)
+ANO_PATTERN = re.compile(r'(\d{4})$')
+
+# --- Conversão das Linhas ---
+def act_rows(dados, diario: str):
+    """ Converte os dados extraídos em linhas do índice: (planilha, sigla, número, ano, página, coluna, detalhe).
+    No Executivo, cada norma alterada vira também uma linha própria ("Alterações"), com a página e a
+    coluna da norma que a altera. O Administrativo informa só a página (o texto de cada página é
+    corrido, sem colunas) e o Legislativo, nenhuma das duas (as regras varrem o texto do diário inteiro). """
+    if diario == 'Legislativo':
+        for planilha, linhas in dados.items():
+            for linha in linhas:
+                detalhe = " | ".join(str(v) for v in linha[3:] if v) or None
+                yield planilha, linha[0], linha[1], linha[2], None, None, detalhe
+        return
+    if diario == 'Administrativo':
+        for linha in dados:
+            yield diario, linha[0], linha[1], linha[2], linha[3], None, None
+        return
+
+    norma = None
+    for pagina, coluna, sancao, tipo, numero, alteracao in dados:
+        if tipo:
+            ano = ANO_PATTERN.search(sancao)
+            norma = (tipo, numero, pagina or None, coluna or None)
+            yield diario, tipo, numero, ano and ano.group(1), norma[2], norma[3], sancao or None
+        if alteracao and norma is not None:
+            # "TIPO NÚMERO [ANO]", em que o tipo não mapeado pode ter mais de uma palavra
+            partes = alteracao.split()
+            ano = partes.pop() if len(partes) > 2 and ANO_PATTERN.fullmatch(partes[-1]) else None
+            yield "Alterações", " ".join(partes[:-1]), partes[-1], ano, norma[2], norma[3], f"alterada por {norma[0]} {norma[1]}"
+
+def parse_act(texto: str) -> tuple:
+    """ (sigla, número, ano) de uma referência como "RQN 12.345/2025"; None nas partes ausentes. """
+    m = ATO_PATTERN.match(texto or "")
+    if not m:
+        raise ValueError(f"Referência de ato não reconhecida: {texto!r} (use, por exemplo, RQN 12345/2025)")
+    sigla, numero, ano = m.groups()
+    return sigla.upper(), numero and numero.replace(".", ""), ano
+
+# --- Índice ---
+class ActIndex:
+    """ Banco SQLite com as edições ingeridas e os atos extraídos de cada uma. Uma instância pode ser
+    compartilhada entre threads (as gravações são serializadas); vários processos podem usar o mesmo
+    arquivo, pois o banco fica em modo WAL. """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        # WAL permite consultar o índice enquanto outra extração grava
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def has_edition(self, digest: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM edicoes WHERE hash = ?", (digest,)).fetchone() is not None
+
+    def ingest(self, digest: str, diario: str, data: str, arquivo: str, dados, replace: bool = False) -> int:
+        """ Grava a edição e os seus atos numa única transação e retorna o número de atos gravados.
+        Uma edição já ingerida é ignorada (retorna 0), exceto com replace=True, que substitui os seus atos. """
+        linhas = list(act_rows(dados, diario))
+        agora = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM atos WHERE edicao_id IN (SELECT id FROM edicoes WHERE hash = ?)", (digest,))
+                self._conn.execute("DELETE FROM edicoes WHERE hash = ?", (digest,))
+            # Sem consulta prévia: outro processo (aplicativo, watch.py, ingerir) pode gravar a mesma
+            # edição ao mesmo tempo, e quem chegar depois simplesmente não insere nada
+            cursor = self._conn.execute(
+                "INSERT INTO edicoes (hash, diario, data, arquivo, ingerido_em) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (hash) DO NOTHING",
+                (digest, diario, data, arquivo, agora)
+            )
+            if not cursor.rowcount:
+                return 0
+            edicao_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO atos (edicao_id, planilha, sigla, numero, ano, pagina, coluna, detalhe) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((edicao_id, *linha) for linha in linhas)
+            )
+        return len(linhas)
+
+    def search(self, sigla: str = None, numero: str = None, ano: str = None, de: str = None, ate: str = None,
+               diario: str = None, planilha: str = None, limit: int = SEARCH_LIMIT) -> list:
+        """ Atos que atendem a todos os filtros informados, em ordem de data da edição (AAAA-MM-DD; de e
+        ate inclusive). Cada linha segue SEARCH_COLUMNS. """
+        filtros = [
+            ("a.sigla = ?", sigla and sigla.upper()),
+            ("a.numero = ?", numero and numero.replace(".", "")),
+            ("a.ano = ?", ano),
+            ("e.data >= ?", de),
+            ("e.data <= ?", ate),
+            ("e.diario = ?", diario),
+            ("a.planilha = ?", planilha),
+        ]
+        filtros = [(condicao, valor) for condicao, valor in filtros if valor]
+        where = " AND ".join(condicao for condicao, _ in filtros) or "1"
+        sql = (
+            "SELECT e.data, e.diario, a.planilha, a.sigla, a.numero, a.ano, a.pagina, a.coluna, a.detalhe, e.arquivo "
+            f"FROM atos a JOIN edicoes e ON e.id = a.edicao_id WHERE {where} "
+            "ORDER BY e.data, e.id, a.rowid LIMIT ?"
+        )
+        with self._lock:
+            return self._conn.execute(sql, [valor for _, valor in filtros] + [limit]).fetchall()
+
+    def stats(self) -> dict:
+        """ Edições e atos no índice e o período coberto. """
+        with self._lock:
+            edicoes, inicio, fim = self._conn.execute("SELECT COUNT(*), MIN(data), MAX(data) FROM edicoes").fetchone()
+            atos = self._conn.execute("SELECT COUNT(*) FROM atos").fetchone()[0]
+        return {"edicoes": edicoes, "atos": atos, "de": inicio, "ate": fim}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Ingestão (linha de comando) ---
+def extract_file(path: Path, diario: str = None, data: str = None) -> dict:
+    """ Extrai um PDF para o índice, sem gravar arquivos de saída. Executada nos processos auxiliares. """
+    from app import TimeBudgetExceeded, detect_diary_type, edition_date, extract_diary
+    resultado = {"arquivo": path, "diario": diario, "data": data, "dados": None, "segundos": 0.0, "erro": None}
+    inicio = time.perf_counter()
+    try:
+        diario = resultado["diario"] = diario or detect_diary_type(str(path), path.name)
+        if diario is None:
+            resultado["erro"] = "tipo de diário não identificado (use --tipo)"
+            return resultado
+        resultado["data"] = data or edition_date(str(path), path.name)
+        resultado["dados"] = extract_diary(str(path), diario)
+    except TimeBudgetExceeded as e:
+        resultado["erro"] = f"interrompido por tempo: {e}"
+    except Exception as e:
+        resultado["erro"] = f"erro ao processar: {e}"
+    finally:
+        resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+def ingest_files(indice: ActIndex, arquivos: list, diario: str = None, data: str = None,
+                 processos: int = 1, replace: bool = False):
+    """ Extrai num pool de processos os PDFs ainda não ingeridos e grava cada um no índice (só este
+    processo grava no banco). Gera (arquivo, resultado da extração ou None se já ingerido, atos gravados). """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    import batch
+    from pdf_text import pdf_hash
+
+    # Cópias do mesmo PDF com outro nome contam como a mesma edição
+    hashes, vistos = {}, set()
+    for path in arquivos:
+        digest = pdf_hash(str(path))
+        if digest in vistos or (not replace and indice.has_edition(digest)):
+            yield path, None, 0
+        else:
+            hashes[path] = digest
+        vistos.add(digest)
+
+    pendentes = list(hashes)
+    if processos <= 1 or len(pendentes) <= 1:
+        resultados = (extract_file(path, diario, data) for path in pendentes)
+        pool = None
+    else:
+        # "spawn", como em batch.py: os processos importam app.py sem herdar o estado do pai
+        context = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=processos, mp_context=context, initializer=batch._init_worker)
+        resultados = (future.result() for future in [pool.submit(extract_file, path, diario, data) for path in pendentes])
+    try:
+        for r in resultados:
+            atos = 0
+            if r["dados"]:
+                try:
+                    atos = indice.ingest(hashes[r["arquivo"]], r["diario"], r["data"], r["arquivo"].name, r["dados"], replace)
+                except sqlite3.Error as e:
+                    r["erro"] = f"erro ao gravar no índice: {e}"
+            elif r["erro"] is None:
+                r["erro"] = "nenhum dado extraído"
+            yield r["arquivo"], r, atos
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def main():
+    banco = argparse.ArgumentParser(add_help=False)
+    banco.add_argument("--banco", default=INDEX_DB or "atos.sqlite", help="arquivo do índice (padrão: GIL_INDEX_DB ou atos.sqlite)")
+    parser = argparse.ArgumentParser(description="Índice SQLite dos atos extraídos dos diários.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    ingerir = comandos.add_parser("ingerir", parents=[banco], help="extrai os PDFs e grava os atos no índice")
+    ingerir.add_argument("entradas", nargs="+", help="PDFs, diretórios ou padrões glob (entre aspas)")
+    ingerir.add_argument("--tipo", choices=['Legislativo', 'Administrativo', 'Executivo', "auto"], default="auto",
+                         help="tipo dos diários; 'auto' identifica cada arquivo pela primeira página")
+    ingerir.add_argument("--data", type=datetime.date.fromisoformat,
+                         help="data da edição (AAAA-MM-DD); por padrão, a do nome do arquivo ou do cabeçalho")
+    ingerir.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="arquivos processados em paralelo")
+    ingerir.add_argument("--reprocessar", action="store_true", help="extrai de novo as edições já ingeridas e substitui os seus atos")
+
+    consultar = comandos.add_parser("consultar", parents=[banco], help="pesquisa atos no índice")
+    consultar.add_argument("ato", nargs="?", help='referência do ato, ex.: "RQN 12345/2025"')
+    consultar.add_argument("--sigla")
+    consultar.add_argument("--numero")
+    consultar.add_argument("--ano")
+    consultar.add_argument("--de", type=datetime.date.fromisoformat, help="edições a partir desta data (AAAA-MM-DD)")
+    consultar.add_argument("--ate", type=datetime.date.fromisoformat, help="edições até esta data (AAAA-MM-DD)")
+    consultar.add_argument("--diario", choices=['Legislativo', 'Administrativo', 'Executivo'])
+    consultar.add_argument("--planilha", help="Normas, Proposicoes, Requerimentos, Pareceres, Executivo, Alterações...")
+    consultar.add_argument("--limite", type=int, default=SEARCH_LIMIT)
+    consultar.add_argument("--csv", metavar="ARQUIVO", help="grava o resultado em CSV ('-' para a saída padrão)")
+    args = parser.parse_args()
+
+    if args.comando == "ingerir":
+        from batch import collect_pdfs
+        arquivos = collect_pdfs(args.entradas)
+        if not arquivos:
+            parser.error("nenhum PDF encontrado nas entradas informadas")
+        diario = None if args.tipo == "auto" else args.tipo
+        data = args.data and args.data.isoformat()
+        inicio = time.perf_counter()
+        ingeridos = ignorados = 0
+        with ActIndex(args.banco) as indice:
+            for path, r, atos in ingest_files(indice, arquivos, diario, data, args.processos, args.reprocessar):
+                if r is None:
+                    ignorados += 1
+                    print(f"{str(path):<50}já ingerido")
+                    continue
+                ingeridos += bool(atos)
+                status = r["erro"] or f"{atos} atos"
+                print(f"{str(path):<50}{r['diario'] or '?':<16}{r['data'] or 'sem data':<12}{r['segundos']:>8.2f}s  {status}")
+            stats = indice.stats()
+        print(f"\n{ingeridos} edições ingeridas, {ignorados} já estavam no índice ({time.perf_counter() - inicio:.1f}s). "
+              f"Índice: {stats['edicoes']} edições, {stats['atos']} atos")
+        return
+
+    sigla = numero = ano = None
+    if args.ato:
+        try:
+            sigla, numero, ano = parse_act(args.ato)
+        except ValueError as e:
+            parser.error(str(e))
+    with ActIndex(args.banco) as indice:
+        linhas = indice.search(
+            args.sigla or sigla, args.numero or numero, args.ano or ano,
+            args.de and args.de.isoformat(), args.ate and args.ate.isoformat(),
+            args.diario, args.planilha, args.limite
+        )
+    if args.csv:
+        import writers
+        conteudo = writers.write_csv(linhas, header=SEARCH_COLUMNS)
+        if args.csv == "-":
+            sys.stdout.buffer.write(conteudo)
+        else:
+            Path(args.csv).write_bytes(conteudo)
+            print(f"{len(linhas)} atos gravados em {args.csv}")
+        return
+    for data, diario, planilha, sigla, numero, ano, pagina, coluna, detalhe, arquivo in linhas:
+        local = f" p. {pagina}, col. {coluna}" if pagina else ""
+        print(f"{data or 'sem data':<12}{diario:<16}{planilha:<15}{sigla} {numero}/{ano or '-':<8}{local}  {detalhe or ''}  [{arquivo}]")
+    print(f"\n{len(linhas)} atos" + (f" (limite de {args.limite})" if len(linhas) == args.limite else ""))
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,36 @@
 # ======================================
 
 # --- Importações ---
+# As dependências pesadas (pandas, pypdf, PyMuPDF, requests) são importadas dentro das
+# funções que as usam, para que a primeira tela seja exibida sem esperar por elas: cada uma só é
+# carregada quando um diário que precisa dela é processado (ou, no caso de requests, no modo Link).
+from __future__ import annotations
+
 import streamlit as st
 import re
-import pandas as pd
-import pypdf # Usado para encontrar as páginas relevantes de forma leve
+import bisect
+import time
 import io
-import csv
-import fitz # PyMuPDF
-import requests
-import pdfplumber
+import os
+import pickle
+import datetime
+import threading
+import multiprocessing
+from typing import TYPE_CHECKING
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import act_index
+import jobs
+import leg_steps
+import timing
+import writers
+
+from pdf_text import BACKENDS, TEXT_BACKENDS, iter_pages_lazily, iter_pages_text, keep_pdf, open_pdf, pdf_hash, spooled_pdf
+
+if TYPE_CHECKING:
+    from download import DownloadedPDF
 
 # --- Constantes e Mapeamentos ---
 TIPO_MAP_NORMA = {
@@ -54,6 +75,240 @@ meses = {
     "AGOSTO": "08", "SETEMBRO": "09", "OUTUBRO": "10", "NOVEMBRO": "11", "DEZEMBRO": "12"
 }
 
+# --- Padrões (compilados uma única vez, na importação) ---
+# Registro central usado por todos os processadores e pelo benchmark em benchmarks/bench_patterns.py.
+PATTERNS = {
+    # Normalização de texto
+    "espacos": re.compile(r"\s+"),
+    "espacos_horizontais": re.compile(r"[ \t]+"),
+    "quebras_linha": re.compile(r"\n+"),
+
+    # Diário do Legislativo - normas
+    "leg_norma": re.compile(
+        r"^(LEI COMPLEMENTAR|LEI|RESOLUÇÃO|EMENDA À CONSTITUIÇÃO|DELIBERAÇÃO DA MESA) Nº (\d{1,5}(?:\.\d{0,3})?)(?:/(\d{4}))?(?:, DE .+ DE (\d{4}))?$",
+        re.MULTILINE
+    ),
+
+    # Diário do Legislativo - proposições
+    "leg_proposicao": re.compile(
+        r"^\s*(?:- )?\s*(PROJETO DE LEI COMPLEMENTAR|PROJETO DE LEI|INDICAÇÃO|PROJETO DE RESOLUÇÃO|PROPOSTA DE EMENDA À CONSTITUIÇÃO|MENSAGEM|VETO) Nº (\d{1,4}\.?\d{0,3}/\d{4})",
+        re.MULTILINE
+    ),
+    "leg_utilidade_publica": re.compile(r"Declara de utilidade pública", re.IGNORECASE | re.DOTALL),
+    "leg_redacao_final": re.compile(r"opinamos por se dar à proposição a seguinte redação final", re.IGNORECASE),
+    "leg_publicada_antes": re.compile(r"foi publicad[ao] na edição anterior\.", re.IGNORECASE),
+    "leg_em_epigrafe": re.compile(r"Na publicação da matéria em epígrafe", re.IGNORECASE),
+    "leg_redacao_vencido": re.compile(r"\(Redação do Vencido\)"),
+
+    # Diário do Legislativo - âncoras das regras de requerimentos e proposições (ver ANCHOR_RULES)
+    # O lookahead descarta rapidamente posições que não iniciam nenhuma âncora; as âncoras de
+    # início de linha consomem o "\n" anterior e começam no grupo nomeado.
+    "leg_ancoras": re.compile(
+        r"(?=[odré\n])(?:"
+        r"(?P<oficio>Ofício nº )"
+        r"|(?P<comissao>da Comissão)"
+        r"|(?P<recebimento>RECEBIMENTO DE PROPOSIÇÃO)"
+        r"|(?P<recebido>É\s+recebido\s+pela\s+presidência,)"
+        r"|\n(?:(?P<cabecalho>\s*[Nn]º\s)"
+        r"|(?P<proposicao>\s*(?:- )?\s*(?:PROJETO DE|INDICAÇÃO|PROPOSTA DE|MENSAGEM|VETO))))",
+        re.IGNORECASE
+    ),
+
+    # Diário do Legislativo - requerimentos
+    "leg_req_oficio": re.compile(
+        r"Ofício nº .*?,.*?relativas ao Requerimento\s*nº (\d{1,4}\.?\d{0,3}/\d{4})",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "leg_req_aprovado_comissao": re.compile(
+        r"(da Comissão.*?, informando que, na.*?foi aprovado o Requerimento\s*nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4}))",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "leg_req_recebimento": re.compile(
+        r"RECEBIMENTO DE PROPOSIÇÃO[\s\S]*?REQUERIMENTO Nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4})",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "leg_rqc_aprovado": re.compile(
+        r"É\s+recebido\s+pela\s+presidência,\s+submetido\s+a\s+votação\s+e\s+aprovado\s+o\s+Requerimento(?:s)?(?: nº| Nº| n\u00ba| n\u00b0)?\s*(\d{1,5}(?:\.\d{0,3})?)/\s*(\d{4})",
+        re.IGNORECASE
+    ),
+    "leg_rqc_apreciacao": re.compile(
+        r"É recebido pela\s+presidência, para posterior apreciação, o Requerimento(?: nº| Nº)?\s*(\d{1,5}(?:\.\d{0,3})?)/(\d{4})",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "leg_req_cabecalho": re.compile(r"^(?:\s*)(Nº|nº)\s+(\d{2}\.?\d{3}/\d{4})(\s*,\s*(?:do|da))?", re.MULTILINE),
+    "leg_nao_recebidas": re.compile(r"PROPOSIÇÕES\s*NÃO\s*RECEBIDAS", re.IGNORECASE),
+    "leg_proxima_secao": re.compile(r"^\s*(\*?)\s*.*\s*(\*?)\s*$", re.MULTILINE),
+    "leg_rqn_nao_recebido": re.compile(r"REQUERIMENTO Nº (\d{2}\.?\d{3}/\d{4})", re.IGNORECASE),
+    # Separadores e desfechos das regras com trecho preguiçoso (ver WINDOWED_RULES)
+    "leg_virgula": re.compile(r","),
+    "leg_req_oficio_fim": re.compile(r"relativas ao Requerimento\s*nº (\d{1,4}\.?\d{0,3}/\d{4})", re.IGNORECASE),
+    "leg_req_informando": re.compile(r", informando que, na", re.IGNORECASE),
+    "leg_req_aprovado_comissao_fim": re.compile(
+        r"foi aprovado o Requerimento\s*nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4})",
+        re.IGNORECASE
+    ),
+    "leg_req_recebimento_fim": re.compile(r"REQUERIMENTO Nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4})", re.IGNORECASE),
+
+    # Diário do Legislativo - títulos das seções (ver LEG_SECTIONS e SectionIndex)
+    # Cada grupo nomeado é uma seção; os títulos além da Tramitação ocupam uma linha inteira.
+    "leg_secoes": re.compile(
+        r"(?P<tramitacao>TRAMITAÇÃO DE PROPOSIÇÕES)"
+        r"|^[ \t]*(?:(?P<atas>ATAS)"
+        r"|(?P<ordens_do_dia>ORDE(?:M|NS) DO DIA)"
+        r"|(?P<editais>EDITAIS DE CONVOCAÇÃO)"
+        r"|(?P<manifestacoes>MANIFESTAÇÕES)"
+        r"|(?P<materia_administrativa>MATÉRIA ADMINISTRATIVA))[ \t]*$",
+        re.MULTILINE
+    ),
+
+    # Diário do Legislativo - pareceres
+    "leg_votacao": re.compile(
+        r"(Votação do Requerimento[\s\S]*?)(?=Votação do Requerimento|Diário do Legislativo|Projetos de Lei Complementar|Diário do Legislativo - Poder Legislativo|$)",
+        re.IGNORECASE
+    ),
+    "leg_emendas_ao_pl": re.compile(r"EMENDAS AO PROJETO DE LEI Nº (\d{1,4}\.?\d{0,3})/(\d{4})", re.IGNORECASE),
+    "leg_emenda_completa": re.compile(
+        r"EMENDA Nº (\d+)\s+AO\s+(?:SUBSTITUTIVO Nº \d+\s+AO\s+)?PROJETO DE LEI(?: COMPLEMENTAR)? Nº (\d{1,4}\.?\d{0,3})/(\d{4})",
+        re.IGNORECASE
+    ),
+    "leg_emenda": re.compile(r"^(?:\s*)EMENDA Nº (\d+)\s*", re.MULTILINE),
+    "leg_substitutivo": re.compile(r"^(?:\s*)SUBSTITUTIVO Nº (\d+)\s*", re.MULTILINE),
+    "leg_conclusao_projeto": re.compile(
+        r"Conclusão\s*([\s\S]*?)(Projeto de Lei|PL|Projeto de Resolução|PRE|Proposta de Emenda à Constituição|PEC|Projeto de Lei Complementar|PLC|Requerimento)\s+(?:nº|Nº)?\s*(\d{1,4}(?:\.\d{1,3})?)\s*/\s*(\d{4})",
+        re.IGNORECASE | re.DOTALL
+    ),
+    "leg_conclusao": re.compile(r"Conclusão", re.IGNORECASE),
+    "leg_conclusao_projeto_fim": re.compile(
+        r"(Projeto de Lei|PL|Projeto de Resolução|PRE|Proposta de Emenda à Constituição|PEC|Projeto de Lei Complementar|PLC|Requerimento)\s+(?:nº|Nº)?\s*(\d{1,4}(?:\.\d{1,3})?)\s*/\s*(\d{4})",
+        re.IGNORECASE
+    ),
+
+    # Diário Administrativo
+    "adm_norma": re.compile(r'(DELIBERAÇÃO DA MESA|PORTARIA DGE|ORDEM DE SERVIÇO PRES/PSEC)\s+Nº\s+([\d\.]+)\/(\d{4})'),
+    "adm_dcs": re.compile(r'DECIS[ÃA]O DA 1ª-SECRETARIA'),
+
+    # Diário do Executivo
+    "exec_leis_decretos": re.compile(r'Leis\s*e\s*Decretos', re.IGNORECASE),
+    "exec_atos_governador": re.compile(r'Atos\s*do\s*Governador', re.IGNORECASE),
+    "exec_norma": re.compile(
+        r'\b(LEI\s+COMPLEMENTAR|LEI|DECRETO\s+NE|DECRETO)\s+N[º°]\s*([\d\s\.]+),\s*DE\s+([A-Z\s\d]+)\b'
+    ),
+    # Ficam revogados | Fica acrescentado | Ficam alterados | passando o item | passa a vigorar | passam a vigorar,
+    # agrupados pelo início comum para que cada posição da coluna seja testada só contra "fica" e "passa"
+    "exec_comandos": re.compile(
+        r'(Fica(?:m\s+revogados|\s+acrescentado|m\s+alterados)|passa(?:ndo\s+o\s+item|\s+a\s+vigorar|m\s+a\s+vigorar))',
+        re.IGNORECASE
+    ),
+    # A data vai no máximo até 40 caracteres adiante ("1º de dezembro de 2024" tem 22): como as normas
+    # citadas são localizadas na coluna inteira, a data não pode se estender pelo resto do texto
+    "exec_norma_alterada": re.compile(
+        r'(LEI\s+COMPLEMENTAR|LEI|DECRETO\s+NE|DECRETO)\s+N[º°]?\s*([\d\s\./]+)(?:,\s*de\s*(.{0,40}?\d{4})?)?',
+        re.IGNORECASE
+    ),
+    "exec_ano": re.compile(r'(\d{4})'),
+
+    # Identificação do tipo de diário (primeira página)
+    "tipo_legislativo": re.compile(r'Di[áa]rio\s+do\s+Legislativo', re.IGNORECASE),
+    "tipo_executivo": re.compile(r'Di[áa]rio\s+do\s+Executivo', re.IGNORECASE),
+    "tipo_administrativo": re.compile(r'Di[áa]rio\s+Administrativo', re.IGNORECASE),
+    # Data da edição: no nome do arquivo (2025-03-14, 20250314, 14-03-2025) ou no cabeçalho da primeira página
+    "data_arquivo": re.compile(r'(?<!\d)(?:(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})|(\d{2})[-_.](\d{2})[-_.](\d{4}))(?!\d)'),
+    "data_extenso": re.compile(r'(\d{1,2})º?\s+de\s+([A-Za-zçÇ]+)\s+de\s+(\d{4})', re.IGNORECASE),
+}
+
+# Regras alimentadas por cada grupo de PATTERNS["leg_ancoras"]. Toda ocorrência de uma
+# regra começa numa âncora do seu grupo, então a regra só é testada nessas posições.
+ANCHOR_RULES = {
+    "oficio": ("leg_req_oficio",),
+    "comissao": ("leg_req_aprovado_comissao",),
+    "recebimento": ("leg_req_recebimento",),
+    "recebido": ("leg_rqc_aprovado", "leg_rqc_apreciacao"),
+    "cabecalho": ("leg_req_cabecalho",),
+    "proposicao": ("leg_proposicao",),
+}
+
+# Regras no formato "âncora, trecho preguiçoso ([\s\S]*? / .*? com DOTALL), desfecho", com um
+# separador obrigatório opcional no meio: regra -> (separador, desfecho). Sem o índice, uma
+# âncora sem desfecho faria o padrão varrer o restante do diário (tempo quadrático).
+WINDOWED_RULES = {
+    "leg_req_oficio": ("leg_virgula", "leg_req_oficio_fim"),
+    "leg_req_aprovado_comissao": ("leg_req_informando", "leg_req_aprovado_comissao_fim"),
+    "leg_req_recebimento": (None, "leg_req_recebimento_fim"),
+}
+
+# Blocos do Diário do Legislativo que não são delimitados pelo título seguinte:
+# bloco -> (título, fim). Só o primeiro título do bloco é considerado.
+LEG_BLOCKS = {
+    "nao_recebidas": ("leg_nao_recebidas", "leg_proxima_secao"),
+}
+
+# Seções (grupos de PATTERNS["leg_secoes"] ou LEG_BLOCKS) varridas por cada etapa do
+# LegislativeProcessor; None varre o diário inteiro. As demais seções são puladas pela etapa.
+LEG_SECTIONS = {
+    "normas": None,
+    "proposicoes": None,
+    "requerimentos": None,
+    "nao_recebidos": ("nao_recebidas",),
+    "pareceres": ("tramitacao",),
+}
+
+# Janelas de contexto (em caracteres) antes e depois do cabeçalho de uma proposição
+# em que os marcadores de descarte e de utilidade pública são procurados
+PROPOSICAO_CONTEXTO_ANTES = 200
+PROPOSICAO_CONTEXTO_DEPOIS = 250
+
+# Raio (em caracteres, para cada lado) em que as normas alteradas por um comando são procuradas no Executivo
+ALTERACAO_RAIO = 150
+
+# Etapas do Legislativo: (planilha, método process_*, nome da etapa nos tempos), na ordem das planilhas
+LEG_STEPS = (
+    ("Normas", "normas", "Normas"),
+    ("Proposicoes", "proposicoes", "Proposições"),
+    ("Requerimentos", "requerimentos", "Requerimentos"),
+    ("Pareceres", "pareceres", "Pareceres"),
+)
+# Processos do modo concorrente do Legislativo (GIL_LEG_STEP_WORKERS); 1 executa as etapas em série
+LEG_STEP_WORKERS = int(os.environ.get("GIL_LEG_STEP_WORKERS", min(len(LEG_STEPS), os.cpu_count() or 1)))
+# Abaixo deste tamanho de texto (caracteres), iniciar os processos custa mais do que executar as etapas em série
+LEG_PARALLEL_MIN_CHARS = int(os.environ.get("GIL_LEG_PARALLEL_MIN_CHARS", "3000000"))
+
+# Tempo máximo (em segundos) de cada processador antes de abortar a extração
+PROCESSOR_TIME_BUDGET = 120
+
+# --- Controle de Tempo ---
+class TimeBudgetExceeded(Exception):
+    """ Indica que uma regra (ou etapa) fez o processador estourar seu orçamento de tempo. """
+    def __init__(self, rule: str, elapsed: float, budget: float):
+        self.rule = rule
+        self.elapsed = elapsed
+        self.budget = budget
+        super().__init__(
+            f"A regra '{rule}' excedeu o tempo limite do processador ({elapsed:.1f}s de {budget:g}s)."
+        )
+
+    def __reduce__(self):
+        # Recriada com os argumentos originais ao voltar de um processo auxiliar
+        return self.__class__, (self.rule, self.elapsed, self.budget)
+
+class TimeBudget:
+    """ Orçamento de tempo de um processador, contado a partir da sua criação. """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = time.perf_counter()
+
+    def check(self, rule: str):
+        if self.seconds is None:
+            return
+        elapsed = time.perf_counter() - self.start
+        if elapsed > self.seconds:
+            raise TimeBudgetExceeded(rule, elapsed, self.seconds)
+
+    def remaining(self):
+        """ Segundos ainda disponíveis (None se não há limite). """
+        if self.seconds is None:
+            return None
+        return max(self.seconds - (time.perf_counter() - self.start), 0.0)
+
 # --- Funções Utilitárias ---
 def classify_req(segment: str) -> str:
     """ Classifica um requerimento com base no texto do segmento. """
@@ -70,19 +325,207 @@ def classify_req(segment: str) -> str:
         return "Manifestação de apoio"
     return ""
 
+def extract_legislative_text(pdf_source, workers: int = None, backend: str = None) -> str:
+    """ Extrai e normaliza o texto de um Diário do Legislativo. """
+    backend = backend or TEXT_BACKENDS["Legislativo"]
+    # Páginas extraídas em paralelo (ver pdf_text.EXTRACTION_WORKERS) e unidas numa única junção
+    # As regras cruzam quebras de página, então o texto é montado inteiro, mas sem guardar a lista de páginas
+    with timing.stage("Extração de texto") as etapa:
+        pages = timing.counted(iter_pages_text(pdf_source, workers, backend=backend), etapa)
+        text = "".join(page_text + "\n" for page_text in pages if page_text)
+    # Normalização básica
+    with timing.stage("Normalização do texto"):
+        regras = {}
+        text = rule_sub("espacos_horizontais", regras, " ", text)
+        text = rule_sub("quebras_linha", regras, "\n", text)
+    add_rule_timings(regras)
+    return text
+
+def rule_finditer(rule: str, timings: dict, text: str, *args):
+    """ PATTERNS[rule].finditer(text, *args), somando as ocorrências e o tempo da busca em timings[rule]. """
+    return timing.timed(PATTERNS[rule].finditer(text, *args), timings.setdefault(rule, [0, 0.0]))
+
+def rule_search(rule: str, timings: dict, text: str, *args):
+    """ PATTERNS[rule].search(text, *args), somando a ocorrência (se houver) e o tempo em timings[rule]. """
+    registro = timings.setdefault(rule, [0, 0.0])
+    inicio = time.perf_counter()
+    match = PATTERNS[rule].search(text, *args)
+    registro[1] += time.perf_counter() - inicio
+    registro[0] += match is not None
+    return match
+
+def rule_sub(rule: str, timings: dict, repl: str, text: str) -> str:
+    """ PATTERNS[rule].sub(repl, text), somando as substituições e o tempo em timings[rule]. """
+    registro = timings.setdefault(rule, [0, 0.0])
+    inicio = time.perf_counter()
+    text, substituicoes = PATTERNS[rule].subn(repl, text)
+    registro[1] += time.perf_counter() - inicio
+    registro[0] += substituicoes
+    return text
+
+def add_rule_timings(timings: dict):
+    """ Registra na execução corrente o total de cada regra ({regra: [ocorrências, segundos]}). """
+    for rule, (ocorrencias, segundos) in timings.items():
+        timing.add(rule, segundos, "regra", ocorrencias=ocorrencias)
+
+def iter_anchored_matches(pattern, text: str, anchors: list):
+    """ Equivale a pattern.finditer(text) quando toda ocorrência começa numa das posições `anchors` (ordenadas). """
+    last_end = 0
+    for pos in anchors:
+        if pos < last_end:
+            continue
+        match = pattern.match(text, pos)
+        if match:
+            last_end = match.end()
+            yield match
+
+def iter_window_matches(pattern, text: str, anchors: list, ends: list, separators: list = None):
+    """
+    Equivale a pattern.finditer(text) para as regras de WINDOWED_RULES. `ends` e `separators`
+    são os intervalos (início, fim), em ordem, dos desfechos e separadores no texto. Para cada
+    âncora, o primeiro separador e o primeiro desfecho seguinte são localizados por busca
+    binária, e o padrão só é avaliado até o fim desse desfecho.
+    """
+    end_starts = [start for start, _ in ends]
+    sep_starts = [start for start, _ in separators] if separators is not None else None
+    last_end = 0
+    for pos in anchors:
+        if pos < last_end:
+            continue
+        boundary = pos
+        if separators is not None:
+            i = bisect.bisect_left(sep_starts, pos)
+            if i == len(separators):
+                break
+            boundary = separators[i][1]
+        j = bisect.bisect_left(end_starts, boundary)
+        if j == len(ends):
+            break
+        match = pattern.match(text, pos, ends[j][1])
+        if match:
+            last_end = match.end()
+            yield match
+
+def markers_in_ranges(occurrences, ranges: list) -> list:
+    """
+    Para cada intervalo (início, fim) de `ranges`, indica se alguma das ocorrências do marcador
+    (em ordem no texto) cabe inteiramente nele. As ocorrências são percorridas uma única vez e
+    cada intervalo é resolvido por busca binária (a primeira ocorrência que começa dentro do
+    intervalo é também a que termina primeiro).
+    """
+    occ_starts, occ_ends = [], []
+    for m in occurrences:
+        occ_starts.append(m.start())
+        occ_ends.append(m.end())
+    if not occ_starts:
+        return [False] * len(ranges)
+    result = []
+    for inicio, fim in ranges:
+        i = bisect.bisect_left(occ_starts, inicio)
+        result.append(i < len(occ_starts) and occ_ends[i] <= fim)
+    return result
+
+# --- Seções do Diário ---
+class SectionIndex:
+    """ Divide o texto de um Diário do Legislativo nas suas seções numa única varredura. Cada seção
+    vai do fim do seu título até o título seguinte (ou o fim do texto); os blocos de LEG_BLOCKS
+    terminam no seu próprio padrão. Guarda apenas os intervalos (início, fim) de cada seção.
+    Os tempos das regras de títulos são somados em `timings` ({regra: [ocorrências, segundos]}). """
+    def __init__(self, text: str, timings: dict = None):
+        self.text = text
+        self.spans = {}
+        timings = {} if timings is None else timings
+        titulos = list(rule_finditer("leg_secoes", timings, text))
+        for i, titulo in enumerate(titulos):
+            fim = titulos[i + 1].start() if i + 1 < len(titulos) else len(text)
+            self.spans.setdefault(titulo.lastgroup, []).append((titulo.end(), fim))
+        for bloco, (inicio_key, fim_key) in LEG_BLOCKS.items():
+            titulo = rule_search(inicio_key, timings, text)
+            if titulo:
+                fim = rule_search(fim_key, timings, text, titulo.end())
+                self.spans[bloco] = [(titulo.end(), fim.start() if fim else len(text))]
+
+    def __contains__(self, section: str) -> bool:
+        return section in self.spans
+
+    def section_text(self, sections) -> str:
+        """ Texto das seções indicadas, na ordem do diário; None devolve o diário inteiro. """
+        if sections is None:
+            return self.text
+        spans = sorted(span for section in sections for span in self.spans.get(section, ()))
+        if len(spans) == 1:
+            return self.text[spans[0][0]:spans[0][1]]
+        # Quebra de linha entre trechos não contíguos, para que nenhuma regra una duas seções
+        return "\n".join(self.text[inicio:fim] for inicio, fim in spans)
+
 # --- Classes de Processamento ---
 class LegislativeProcessor:
     """ Processa o texto de um Diário do Legislativo, extraindo normas, proposições, requerimentos e pareceres. """
-    def __init__(self, text: str):
+    def __init__(self, text: str, time_budget: float = PROCESSOR_TIME_BUDGET):
         self.text = text
-
-    def process_normas(self) -> pd.DataFrame:
-        pattern = re.compile(
-            r"^(LEI COMPLEMENTAR|LEI|RESOLUÇÃO|EMENDA À CONSTITUIÇÃO|DELIBERAÇÃO DA MESA) Nº (\d{1,5}(?:\.\d{0,3})?)(?:/(\d{4}))?(?:, DE .+ DE (\d{4}))?$",
-            re.MULTILINE
-        )
+        self.budget = TimeBudget(time_budget)
+        self._anchors = None
+        self._sections = None
+        # (etapa, seção) -> [caracteres varridos, segundos]
+        self.section_timings = {}
+        # regra de PATTERNS -> [ocorrências, segundos]
+        self.rule_timings = {}
+
+    @property
+    def sections(self) -> SectionIndex:
+        if self._sections is None:
+            self._sections = SectionIndex(self.text, self.rule_timings)
+        return self._sections
+
+    def _section_text(self, step: str) -> str:
+        return self.sections.section_text(LEG_SECTIONS[step])
+
+    def _record(self, step: str, caracteres: int, inicio: float):
+        """ Acumula o tempo desde `inicio` e os caracteres varridos pela etapa nas suas seções. """
+        secoes = LEG_SECTIONS[step]
+        registro = self.section_timings.setdefault((step, ", ".join(secoes) if secoes else "diário"), [0, 0.0])
+        registro[0] += caracteres
+        registro[1] += time.perf_counter() - inicio
+
+    def _finditer(self, rule: str, text: str = None):
+        """ Ocorrências da regra no texto (por padrão, o diário inteiro), com o tempo somado em rule_timings. """
+        return rule_finditer(rule, self.rule_timings, self.text if text is None else text)
+
+    def _spans(self, key: str) -> list:
+        return [m.span() for m in self._finditer(key)]
+
+    def _iter_rule(self, rule: str):
+        """ Equivale a PATTERNS[rule].finditer(self.text), testando a regra apenas nas suas âncoras. """
+        if self._anchors is None:
+            # Varredura única do texto, compartilhada por todas as regras de ANCHOR_RULES.
+            # O início do texto também é início de linha, então é sempre candidato.
+            inicio = time.perf_counter()
+            self._anchors = {r: [] for rules in ANCHOR_RULES.values() for r in rules}
+            self._anchors["leg_req_cabecalho"].append(0)
+            self._anchors["leg_proposicao"].append(0)
+            total = 0
+            for total, anchor in enumerate(PATTERNS["leg_ancoras"].finditer(self.text), start=1):
+                for r in ANCHOR_RULES[anchor.lastgroup]:
+                    self._anchors[r].append(anchor.start(anchor.lastgroup))
+            self.rule_timings["leg_ancoras"] = [total, time.perf_counter() - inicio]
+
+        anchors = self._anchors[rule]
+        if rule in WINDOWED_RULES:
+            separator_key, end_key = WINDOWED_RULES[rule]
+            separators = self._spans(separator_key) if separator_key else None
+            matches = iter_window_matches(PATTERNS[rule], self.text, anchors, self._spans(end_key), separators)
+        else:
+            matches = iter_anchored_matches(PATTERNS[rule], self.text, anchors)
+        # Só o tempo gasto procurando a próxima ocorrência conta para a regra, não o de quem a consome
+        for match in timing.timed(matches, self.rule_timings.setdefault(rule, [0, 0.0])):
+            self.budget.check(rule)
+            yield match
+
+    def process_normas(self) -> list:
+        inicio = time.perf_counter()
         normas = []
-        for match in pattern.finditer(self.text):
+        for match in self._finditer("leg_norma", self._section_text("normas")):
+            self.budget.check("leg_norma")
             tipo_extenso = match.group(1)
             numero_raw = match.group(2).replace(".", "")
             ano = match.group(3) if match.group(3) else match.group(4)
@@ -90,74 +533,61 @@ class LegislativeProcessor:
                 continue
             sigla = TIPO_MAP_NORMA[tipo_extenso]
             normas.append([sigla, numero_raw, ano])
-        return pd.DataFrame(normas)
-
-    def process_proposicoes(self) -> pd.DataFrame:
-        pattern_prop = re.compile(
-            r"^\s*(?:- )?\s*(PROJETO DE LEI COMPLEMENTAR|PROJETO DE LEI|INDICAÇÃO|PROJETO DE RESOLUÇÃO|PROPOSTA DE EMENDA À CONSTITUIÇÃO|MENSAGEM|VETO) Nº (\d{1,4}\.?\d{0,3}/\d{4})",
-            re.MULTILINE
-        )
-        pattern_utilidade = re.compile(r"Declara de utilidade pública", re.IGNORECASE | re.DOTALL)
-        ignore_redacao_final = re.compile(r"opinamos por se dar à proposição a seguinte redação final", re.IGNORECASE)
-        ignore_publicada_antes = re.compile(r"foi publicad[ao] na edição anterior\.", re.IGNORECASE)
-        ignore_em_epigrafe = re.compile(r"Na publicação da matéria em epígrafe", re.IGNORECASE)
+        self._record("normas", len(self.text), inicio)
+        return normas
+
+    def process_proposicoes(self, context_before: int = PROPOSICAO_CONTEXTO_ANTES,
+                            context_after: int = PROPOSICAO_CONTEXTO_DEPOIS) -> list:
+        inicio = time.perf_counter()
+        matches = list(self._iter_rule("leg_proposicao"))
+        if not matches:
+            self._record("proposicoes", len(self.text), inicio)
+            return []
+
+        # Os marcadores são localizados uma única vez no texto e as janelas de contexto de
+        # todas as proposições são resolvidas por busca binária, sem fatiar o texto
+        antes = [(max(m.start() - context_before, 0), m.start()) for m in matches]
+        depois = [(m.end(), m.end() + context_after) for m in matches]
+        self.budget.check("leg_proposicao")
+        ignorar = map(any, zip(
+            markers_in_ranges(self._finditer("leg_em_epigrafe"), depois),
+            markers_in_ranges(self._finditer("leg_redacao_final"), antes),
+            markers_in_ranges(self._finditer("leg_publicada_antes"), depois),
+            markers_in_ranges(self._finditer("leg_redacao_vencido"), depois),
+        ))
+        utilidade = markers_in_ranges(self._finditer("leg_utilidade_publica"), depois)
 
         proposicoes = []
-        for match in pattern_prop.finditer(self.text):
-            start_idx = match.start()
-            end_idx = match.end()
-            contexto_antes = self.text[max(0, start_idx - 200):start_idx]
-            contexto_depois = self.text[end_idx:end_idx + 250]
-
-            if ignore_em_epigrafe.search(contexto_depois):
+        for match, ignorada, up in zip(matches, ignorar, utilidade):
+            if ignorada:
                 continue
-            if ignore_redacao_final.search(contexto_antes) or ignore_publicada_antes.search(contexto_depois):
-                continue
-            subseq_text = self.text[end_idx:end_idx + 250]
-            if "(Redação do Vencido)" in subseq_text:
-                continue
-
             tipo_extenso = match.group(1)
             numero_ano = match.group(2).replace(".", "")
             numero, ano = numero_ano.split("/")
             sigla = TIPO_MAP_PROP[tipo_extenso]
-            categoria = "UP" if pattern_utilidade.search(subseq_text) else ""
+            categoria = "UP" if up else ""
             proposicoes.append([sigla, numero, ano, categoria])
 
-        return pd.DataFrame(
-            proposicoes,
-            columns=['Sigla', 'Número', 'Ano', 'Categoria']
-        )
+        self._record("proposicoes", len(self.text), inicio)
+        return proposicoes
 
-    def process_requerimentos(self) -> pd.DataFrame:
+    def process_requerimentos(self) -> list:
+        inicio = time.perf_counter()
         requerimentos = []
-        ignore_pattern = re.compile(
-            r"Ofício nº .*?,.*?relativas ao Requerimento\s*nº (\d{1,4}\.?\d{0,3}/\d{4})",
-            re.IGNORECASE | re.DOTALL
-        )
-        # Adiciona a nova regex para ignorar requerimentos com "aprovado"
-        aprovado_pattern = re.compile(
-            r"(da Comissão.*?, informando que, na.*?foi aprovado o Requerimento\s*nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4}))",
-            re.IGNORECASE | re.DOTALL
-        )
         reqs_to_ignore = set()
-        for match in ignore_pattern.finditer(self.text):
+        for match in self._iter_rule("leg_req_oficio"):
             numero_ano = match.group(1).replace(".", "")
             reqs_to_ignore.add(numero_ano)
 
         # Adiciona os requerimentos do novo padrão de aprovação à lista de ignorados
-        for match in aprovado_pattern.finditer(self.text):
+        for match in self._iter_rule("leg_req_aprovado_comissao"):
             num_part = match.group(2).replace('.', '')
             ano = match.group(3)
             numero_ano = f"{num_part}/{ano}"
             reqs_to_ignore.add(numero_ano)
 
         # 1) Requerimentos recebidos com padrão "RECEBIMENTO DE PROPOSIÇÃO" (nova regra)
-        req_recebimento_pattern = re.compile(
-            r"RECEBIMENTO DE PROPOSIÇÃO[\s\S]*?REQUERIMENTO Nº (\d{1,5}(?:\.\d{0,3})?)/(\d{4})",
-            re.IGNORECASE | re.DOTALL
-        )
-        for match in req_recebimento_pattern.finditer(self.text):
+        for match in self._iter_rule("leg_req_recebimento"):
             num_part = match.group(1).replace('.', '')
             ano = match.group(2)
             numero_ano = f"{num_part}/{ano}"
@@ -166,11 +596,7 @@ class LegislativeProcessor:
 
         # 2) RQC recebidos e aprovados (Com correção para o caractere 'º')
         # A nova regex abaixo lida com o texto inicial e a formatação do número.
-        rqc_pattern_aprovado = re.compile(
-            r"É\s+recebido\s+pela\s+presidência,\s+submetido\s+a\s+votação\s+e\s+aprovado\s+o\s+Requerimento(?:s)?(?: nº| Nº| n\u00ba| n\u00b0)?\s*(\d{1,5}(?:\.\d{0,3})?)/\s*(\d{4})",
-            re.IGNORECASE
-        )
-        for match in rqc_pattern_aprovado.finditer(self.text):
+        for match in self._iter_rule("leg_rqc_aprovado"):
             num_part = match.group(1).replace('.', '')
             ano = match.group(2)
             numero_ano = f"{num_part}/{ano}"
@@ -178,11 +604,7 @@ class LegislativeProcessor:
                 requerimentos.append(["RQC", num_part, ano, "", "", "Aprovado"])
 
         # 3) RQC recebidos para apreciação (novo critério)
-        rqc_recebido_apreciacao_pattern = re.compile(
-            r"É recebido pela\s+presidência, para posterior apreciação, o Requerimento(?: nº| Nº)?\s*(\d{1,5}(?:\.\d{0,3})?)/(\d{4})",
-            re.IGNORECASE | re.DOTALL
-        )
-        for match in rqc_recebido_apreciacao_pattern.finditer(self.text):
+        for match in self._iter_rule("leg_rqc_apreciacao"):
             num_part = match.group(1).replace('.', '')
             ano = match.group(2)
             numero_ano = f"{num_part}/{ano}"
@@ -190,38 +612,37 @@ class LegislativeProcessor:
                 requerimentos.append(["RQC", num_part, ano, "", "", "Recebido para apreciação"])
 
         # 4) RQN e RQC (padrão antigo)
-        rqn_pattern = re.compile(r"^(?:\s*)(Nº)\s+(\d{2}\.?\d{3}/\d{4})\s*,\s*(do|da)", re.MULTILINE)
-        rqc_old_pattern = re.compile(r"^(?:\s*)(nº)\s+(\d{2}\.?\d{3}/\d{4})\s*,\s*(do|da)", re.MULTILINE)
-        for pattern, sigla_prefix in [(rqn_pattern, "RQN"), (rqc_old_pattern, "RQC")]:
-            for match in pattern.finditer(self.text):
-                start_idx = match.start()
-                next_match = re.search(r"^(?:\s*)(Nº|nº)\s+(\d{2}\.?\d{3}/\d{4})", self.text[start_idx + 1:], flags=re.MULTILINE)
-                end_idx = (next_match.start() + start_idx + 1) if next_match else len(self.text)
-                block = self.text[start_idx:end_idx].strip()
-                nums_in_block = re.findall(r'\d{2}\.?\d{3}/\d{4}', block)
-                if not nums_in_block:
-                    continue
-                num_part, ano = nums_in_block[0].replace(".", "").split("/")
-                numero_ano = f"{num_part}/{ano}"
-                if numero_ano not in reqs_to_ignore:
-                    classif = classify_req(block)
-                    requerimentos.append([sigla_prefix, num_part, ano, "", "", classif])
-
-        # 5) RQN não recebidos
-        nao_recebidas_header_pattern = re.compile(r"PROPOSIÇÕES\s*NÃO\s*RECEBIDAS", re.IGNORECASE)
-        header_match = nao_recebidas_header_pattern.search(self.text)
-        if header_match:
-            start_idx = header_match.end()
-            next_section_pattern = re.compile(r"^\s*(\*?)\s*.*\s*(\*?)\s*$", re.MULTILINE)
-            next_section_match = next_section_pattern.search(self.text, start_idx)
-            end_idx = next_section_match.start() if next_section_match else len(self.text)
-            nao_recebidos_block = self.text[start_idx:end_idx]
-            rqn_nao_recebido_pattern = re.compile(r"REQUERIMENTO Nº (\d{2}\.?\d{3}/\d{4})", re.IGNORECASE)
-            for match in rqn_nao_recebido_pattern.finditer(nao_recebidos_block):
+        # Todos os cabeçalhos "Nº/nº 12.345/2025" são localizados numa única varredura;
+        # cada bloco vai de um cabeçalho até o seguinte. "Nº" indica RQN e "nº" indica RQC,
+        # e só abrem requerimento os cabeçalhos seguidos de ", do"/", da".
+        headers = list(self._iter_rule("leg_req_cabecalho"))
+        old_style_reqs = {"RQN": [], "RQC": []}
+        for i, match in enumerate(headers):
+            if not match.group(3):
+                continue
+            start_idx = match.start()
+            end_idx = headers[i + 1].start() if i + 1 < len(headers) else len(self.text)
+            num_part, ano = match.group(2).replace(".", "").split("/")
+            numero_ano = f"{num_part}/{ano}"
+            if numero_ano not in reqs_to_ignore:
+                sigla_prefix = "RQN" if match.group(1) == "Nº" else "RQC"
+                classif = classify_req(self.text[start_idx:end_idx])
+                old_style_reqs[sigla_prefix].append([sigla_prefix, num_part, ano, "", "", classif])
+        requerimentos.extend(old_style_reqs["RQN"])
+        requerimentos.extend(old_style_reqs["RQC"])
+
+        self._record("requerimentos", len(self.text), inicio)
+
+        # 5) RQN não recebidos, procurados apenas no bloco "PROPOSIÇÕES NÃO RECEBIDAS" (ver LEG_BLOCKS)
+        inicio = time.perf_counter()
+        if "nao_recebidas" in self.sections:
+            nao_recebidos_block = self._section_text("nao_recebidos")
+            for match in self._finditer("leg_rqn_nao_recebido", nao_recebidos_block):
                 numero_ano = match.group(1).replace(".", "")
                 num_part, ano = numero_ano.split("/")
                 if numero_ano not in reqs_to_ignore:
                     requerimentos.append(["RQN", num_part, ano, "", "", "NÃO RECEBIDO"])
+            self._record("nao_recebidos", len(nao_recebidos_block), inicio)
 
         # Remove duplicatas
         unique_reqs = []
@@ -232,31 +653,29 @@ class LegislativeProcessor:
                 seen.add(key)
                 unique_reqs.append(r)
 
-        return pd.DataFrame(unique_reqs)
+        return unique_reqs
 
-    def process_pareceres(self) -> pd.DataFrame:
+    def process_pareceres(self) -> list:
+        inicio = time.perf_counter()
         found_projects = {}
-        pareceres_start_pattern = re.compile(r"TRAMITAÇÃO DE PROPOSIÇÕES")
-        votacao_pattern = re.compile(
-            r"(Votação do Requerimento[\s\S]*?)(?=Votação do Requerimento|Diário do Legislativo|Projetos de Lei Complementar|Diário do Legislativo - Poder Legislativo|$)",
-            re.IGNORECASE
-        )
-        pareceres_start = pareceres_start_pattern.search(self.text)
-        if not pareceres_start:
-            return pd.DataFrame(columns=['Sigla', 'Número', 'Ano', 'Tipo'])
-
-        pareceres_text = self.text[pareceres_start.end():]
-        # remove blocos de votação
-        clean_text = pareceres_text
-        for match in votacao_pattern.finditer(pareceres_text):
-            clean_text = clean_text.replace(match.group(0), "")
+        if "tramitacao" not in self.sections:
+            return []
+
+        # Pareceres só existem na Tramitação de Proposições: as demais seções não são varridas
+        pareceres_text = self._section_text("pareceres")
+        # remove blocos de votação: os intervalos encontrados são descartados
+        # numa única junção, sem afetar trechos idênticos fora deles
+        pieces = []
+        last_end = 0
+        for match in self._finditer("leg_votacao", pareceres_text):
+            self.budget.check("leg_votacao")
+            pieces.append(pareceres_text[last_end:match.start()])
+            last_end = match.end()
+        pieces.append(pareceres_text[last_end:])
+        clean_text = "".join(pieces)
 
         # Adiciona a nova regra para "EMENDAS AO PROJETO DE LEI"
-        emenda_projeto_lei_pattern = re.compile(
-            r"EMENDAS AO PROJETO DE LEI Nº (\d{1,4}\.?\d{0,3})/(\d{4})",
-            re.IGNORECASE | re.DOTALL
-        )
-        for match in emenda_projeto_lei_pattern.finditer(clean_text):
+        for match in self._finditer("leg_emendas_ao_pl", clean_text):
             numero_raw = match.group(1).replace('.', '')
             ano = match.group(2)
             project_key = ("PL", numero_raw, ano)
@@ -264,18 +683,7 @@ class LegislativeProcessor:
                 found_projects[project_key] = set()
             found_projects[project_key].add("EMENDA")
 
-        emenda_completa_pattern = re.compile(
-            r"EMENDA Nº (\d+)\s+AO\s+(?:SUBSTITUTIVO Nº \d+\s+AO\s+)?PROJETO DE LEI(?: COMPLEMENTAR)? Nº (\d{1,4}\.?\d{0,3})/(\d{4})",
-            re.IGNORECASE
-        )
-        emenda_pattern = re.compile(r"^(?:\s*)EMENDA Nº (\d+)\s*", re.MULTILINE)
-        substitutivo_pattern = re.compile(r"^(?:\s*)SUBSTITUTIVO Nº (\d+)\s*", re.MULTILINE)
-        project_pattern = re.compile(
-            r"Conclusão\s*([\s\S]*?)(Projeto de Lei|PL|Projeto de Resolução|PRE|Proposta de Emenda à Constituição|PEC|Projeto de Lei Complementar|PLC|Requerimento)\s+(?:nº|Nº)?\s*(\d{1,4}(?:\.\d{1,3})?)\s*/\s*(\d{4})",
-            re.IGNORECASE | re.DOTALL
-        )
-
-        for match in emenda_completa_pattern.finditer(clean_text):
+        for match in self._finditer("leg_emenda_completa", clean_text):
             numero = match.group(2).replace(".", "")
             ano = match.group(3)
             sigla = "PLC" if "COMPLEMENTAR" in match.group(0).upper() else "PL"
@@ -285,17 +693,26 @@ class LegislativeProcessor:
             found_projects[project_key].add("EMENDA")
 
         all_matches = sorted(
-            list(emenda_pattern.finditer(clean_text)) + list(substitutivo_pattern.finditer(clean_text)),
+            list(self._finditer("leg_emenda", clean_text)) + list(self._finditer("leg_substitutivo", clean_text)),
             key=lambda x: x.start()
         )
 
-        for title_match in all_matches:
-            text_before_title = clean_text[:title_match.start()]
-            last_project_match = None
-            for match in project_pattern.finditer(text_before_title):
-                last_project_match = match
+        # Indexa as conclusões uma única vez; a última conclusão que termina antes
+        # de cada título de emenda/substitutivo é localizada por busca binária.
+        # "Conclusão ... Projeto de Lei nº X/AAAA" é avaliada só até o desfecho mais próximo.
+        project_matches = list(timing.timed(iter_window_matches(
+            PATTERNS["leg_conclusao_projeto"],
+            clean_text,
+            [m.start() for m in self._finditer("leg_conclusao", clean_text)],
+            [m.span() for m in self._finditer("leg_conclusao_projeto_fim", clean_text)]
+        ), self.rule_timings.setdefault("leg_conclusao_projeto", [0, 0.0])))
+        project_ends = [m.end() for m in project_matches]
 
-            if last_project_match:
+        for title_match in all_matches:
+            self.budget.check("leg_conclusao_projeto")
+            idx = bisect.bisect_right(project_ends, title_match.start()) - 1
+            if idx >= 0:
+                last_project_match = project_matches[idx]
                 sigla_raw = last_project_match.group(2)
                 sigla = SIGLA_MAP_PARECER.get(sigla_raw.lower(), sigla_raw.upper())
                 numero = last_project_match.group(3).replace(".", "")
@@ -305,173 +722,264 @@ class LegislativeProcessor:
                 if project_key not in found_projects:
                     found_projects[project_key] = set()
                 found_projects[project_key].add(item_type)
-                
-        # Adiciona a nova regra
-        emenda_projeto_lei_pattern = re.compile(r"EMENDAS AO PROJETO DE LEI Nº (\d{1,4}\.?\d{0,3})/(\d{4})", re.IGNORECASE)
-        for match in emenda_projeto_lei_pattern.finditer(clean_text):
-            numero_raw = match.group(1).replace('.', '')
-            ano = match.group(2)
-            project_key = ("PL", numero_raw, ano)
-            if project_key not in found_projects:
-                found_projects[project_key] = set()
-            found_projects[project_key].add("EMENDA")
 
         pareceres = []
         for (sigla, numero, ano), types in found_projects.items():
             type_str = "SUB/EMENDA" if len(types) > 1 else list(types)[0]
             pareceres.append([sigla, numero, ano, type_str])
 
-        return pd.DataFrame(pareceres)
-
-    def process_all(self) -> dict:
-        df_normas = self.process_normas()
-        df_proposicoes = self.process_proposicoes()
-        df_requerimentos = self.process_requerimentos()
-        df_pareceres = self.process_pareceres()
-        return {
-            "Normas": df_normas,
-            "Proposicoes": df_proposicoes,
-            "Requerimentos": df_requerimentos,
-            "Pareceres": df_pareceres
-        }
+        self._record("pareceres", len(pareceres_text), inicio)
+        return pareceres
+
+    def run_step(self, step: str) -> tuple:
+        """ Executa uma etapa e retorna (linhas, segundos, tempos por regra, tempos por seção) apenas dela. """
+        self.rule_timings, self.section_timings = {}, {}
+        inicio = time.perf_counter()
+        linhas = getattr(self, f"process_{step}")()
+        return linhas, time.perf_counter() - inicio, self.rule_timings, self.section_timings
+
+    def iter_sheets(self, workers: int = None):
+        """ Gera (planilha, linhas) de cada etapa assim que ela termina. As etapas não compartilham estado:
+        com workers > 1 e um texto grande, rodam ao mesmo tempo num pool de processos (ver leg_steps),
+        que recebem o texto uma única vez, na inicialização, e não a cada etapa. """
+        workers = LEG_STEP_WORKERS if workers is None else workers
+        if workers <= 1 or len(self.text) < LEG_PARALLEL_MIN_CHARS:
+            for planilha, step, etapa in LEG_STEPS:
+                with timing.stage(etapa):
+                    linhas = getattr(self, f"process_{step}")()
+                yield planilha, linhas
+            return
+
+        rule_timings, section_timings = {}, {}
+        # "spawn", como em pdf_text: os processos importam app.py sem herdar o estado do pai
+        context = multiprocessing.get_context("spawn")
+        with timing.stage("Etapas em paralelo"), ProcessPoolExecutor(
+            max_workers=min(workers, len(LEG_STEPS)), mp_context=context,
+            initializer=leg_steps.init_worker, initargs=(self.text, self.budget.remaining())
+        ) as pool:
+            futures = {pool.submit(leg_steps.run_step, step): (planilha, etapa) for planilha, step, etapa in LEG_STEPS}
+            for future in as_completed(futures):
+                planilha, etapa = futures[future]
+                linhas, segundos, regras, secoes = future.result()
+                timing.add(etapa, segundos, "etapa")
+                # A mesma regra pode rodar em mais de um processo (ex.: a varredura das âncoras): os tempos se somam
+                for destino, origem in ((rule_timings, regras), (section_timings, secoes)):
+                    for chave, (quantidade, tempo) in origem.items():
+                        registro = destino.setdefault(chave, [0, 0.0])
+                        registro[0] += quantidade
+                        registro[1] += tempo
+                yield planilha, linhas
+        self.rule_timings, self.section_timings = rule_timings, section_timings
+
+    def process_all(self, workers: int = None) -> dict:
+        """ Retorna as linhas de cada planilha ({planilha: linhas}); as colunas estão em LEG_COLUMNS. """
+        planilhas = {}
+        for planilha, linhas in self.iter_sheets(workers):
+            planilhas[planilha] = linhas
+            # Num job, a planilha já pode ser exibida enquanto as demais etapas terminam
+            jobs.publish(planilha, linhas)
+        add_rule_timings(self.rule_timings)
+        for (step, secao), (caracteres, segundos) in self.section_timings.items():
+            timing.add(f"{step} ({secao})", segundos, "seção", caracteres=caracteres)
+        return {planilha: planilhas[planilha] for planilha, _, _ in LEG_STEPS}
 
 class AdministrativeProcessor:
-    """ Processa bytes de um Diário Administrativo, extraindo normas e retornando dados CSV. """
-    def __init__(self, pdf_bytes: bytes):
-        self.pdf_bytes = pdf_bytes
+    """ Processa um Diário Administrativo (caminho ou bytes do PDF), extraindo normas e retornando dados CSV. """
+    def __init__(self, pdf_source, time_budget: float = PROCESSOR_TIME_BUDGET, backend: str = None):
+        self.pdf_source = pdf_source
+        self.budget = TimeBudget(time_budget)
+        self.backend = backend or TEXT_BACKENDS["Administrativo"]
+        # regra de PATTERNS -> [ocorrências, segundos]
+        self.rule_timings = {}
 
     def process_pdf(self):
         try:
-            doc = fitz.open(stream=self.pdf_bytes, filetype="pdf")
+            BACKENDS[self.backend].page_count(self.pdf_source)
+            # Páginas lidas uma a uma, sem manter o diário inteiro em memória
+            pages = iter_pages_text(self.pdf_source, backend=self.backend)
         except Exception as e:
-            st.error(f"Erro ao abrir o arquivo PDF: {e}")
+            jobs.notify("error", f"Erro ao abrir o arquivo PDF: {e}")
             return None
 
         resultados = []
-        regex = re.compile(
-            r'(DELIBERAÇÃO DA MESA|PORTARIA DGE|ORDEM DE SERVIÇO PRES/PSEC)\s+Nº\s+([\d\.]+)\/(\d{4})'
-        )
-        regex_dcs = re.compile(r'DECIS[ÃA]O DA 1ª-SECRETARIA')
-
-        for page in doc:
-            text = page.get_text("text")
-            text = re.sub(r'\s+', ' ', text)
-            for match in regex.finditer(text):
-                tipo_texto = match.group(1)
-                numero = match.group(2).replace('.', '')
-                ano = match.group(3)
-                sigla = {
-                    "DELIBERAÇÃO DA MESA": "DLB",
-                    "PORTARIA DGE": "PRT",
-                    "ORDEM DE SERVIÇO PRES/PSEC": "OSV"
-                }.get(tipo_texto, None)
-                if sigla:
-                    resultados.append([sigla, numero, ano])
-            if regex_dcs.search(text):
-                resultados.append(["DCS", "", ""])
-        doc.close()
+
+        # Extração e regras se alternam página a página, então são medidas juntas
+        with timing.stage("Extração de texto e regras") as etapa:
+            for pagina, text in enumerate(timing.counted(pages, etapa), start=1):
+                self.budget.check("adm_norma")
+                text = rule_sub("espacos", self.rule_timings, ' ', text)
+                for match in rule_finditer("adm_norma", self.rule_timings, text):
+                    tipo_texto = match.group(1)
+                    numero = match.group(2).replace('.', '')
+                    ano = match.group(3)
+                    sigla = {
+                        "DELIBERAÇÃO DA MESA": "DLB",
+                        "PORTARIA DGE": "PRT",
+                        "ORDEM DE SERVIÇO PRES/PSEC": "OSV"
+                    }.get(tipo_texto, None)
+                    if sigla:
+                        resultados.append([sigla, numero, ano, pagina])
+                if rule_search("adm_dcs", self.rule_timings, text):
+                    resultados.append(["DCS", "", "", pagina])
+        add_rule_timings(self.rule_timings)
         return resultados
 
-    def to_csv(self):
-        resultados = self.process_pdf()
-        if resultados is None:
+    @staticmethod
+    def rows_to_csv(resultados):
+        if not resultados:
             return None
-        output_csv = io.StringIO()
-        writer = csv.writer(output_csv, delimiter="\t")
-        writer.writerows(resultados)
-        return output_csv.getvalue().encode('utf-8')
+        # Separado por tabulação, sem cabeçalho, com as quebras de linha "\r\n" do módulo csv.
+        # A página (último campo) fica de fora, mantendo o leiaute original do arquivo
+        return writers.write_csv((linha[:-1] for linha in resultados), delimiter="\t", lineterminator="\r\n")
+
+    def to_csv(self):
+        return self.rows_to_csv(self.process_pdf())
 
 class ExecutiveProcessor:
-    """Processa o texto de um Diário do Executivo, extraindo normas e alterações."""
-    def __init__(self, pdf_bytes: bytes):
-        self.pdf_bytes = pdf_bytes
+    """Processa o texto de um Diário do Executivo (caminho ou bytes do PDF), extraindo normas e alterações."""
+    def __init__(self, pdf_source, time_budget: float = PROCESSOR_TIME_BUDGET):
+        self.pdf_source = pdf_source
+        self.budget = TimeBudget(time_budget)
+        self.extraction_failed = False
         self.mapa_tipos = {
             "LEI": "LEI",
             "LEI COMPLEMENTAR": "LCP",
             "DECRETO": "DEC",
             "DECRETO NE": "DNE"
         }
-        self.norma_regex = re.compile(
-            r'\b(LEI\s+COMPLEMENTAR|LEI|DECRETO\s+NE|DECRETO)\s+N[º°]\s*([\d\s\.]+),\s*DE\s+([A-Z\s\d]+)\b'
-        )
-        self.comandos_regex = re.compile(
-            r'(Ficam\s+revogados|Fica\s+acrescentado|Ficam\s+alterados|passando\s+o\s+item|passa\s+a\s+vigorar|passam\s+a\s+vigorar)',
-            re.IGNORECASE
-        )
-        self.norma_alterada_regex = re.compile(
-            r'(LEI\s+COMPLEMENTAR|LEI|DECRETO\s+NE|DECRETO)\s+N[º°]?\s*([\d\s\./]+)(?:,\s*de\s*(.*?\d{4})?)?',
-            re.IGNORECASE
-        )
-        
-    def find_relevant_pages(self) -> tuple:
-        """Encontra as páginas de início e fim da seção relevante de forma eficiente."""
+        # regra de PATTERNS -> [ocorrências, segundos]
+        self.rule_timings = {}
+
+    @staticmethod
+    def join_lines(palavras: list) -> str:
+        """Une as palavras (topo, x0, texto) de uma coluna na ordem de leitura: linhas agrupadas
+        pelo topo, com tolerância de 3pt como no pdfplumber, e palavras da esquerda para a direita."""
+        linhas = []
+        ultimo_topo = None
+        for topo, x0, palavra in sorted(palavras):
+            if ultimo_topo is None or topo > ultimo_topo + 3:
+                linhas.append([])
+            linhas[-1].append((x0, palavra))
+            ultimo_topo = topo
+        return " ".join(palavra for linha in linhas for _, palavra in sorted(linha))
+
+    @staticmethod
+    def find_section(page_texts, budget: TimeBudget, timings: dict = None) -> tuple:
+        """Percorre o texto das páginas até passar de 'Atos do Governador' e retorna os índices da
+        última página com 'Leis e Decretos' e da página que encerra a seção (None se ausentes).
+        Os tempos das regras são somados em `timings` ({regra: [ocorrências, segundos]})."""
+        timings = {} if timings is None else timings
+        start_page_num, end_page_num = None, None
+        for i, text in enumerate(page_texts):
+            budget.check("exec_leis_decretos")
+            tem_inicio = rule_search("exec_leis_decretos", timings, text) is not None
+            if tem_inicio:
+                start_page_num = i
+            if rule_search("exec_atos_governador", timings, text):
+                end_page_num = i
+                # Uma página com os dois títulos pode ser o sumário: só encerra após o início da seção
+                if start_page_num is not None and not tem_inicio:
+                    break
+        return start_page_num, end_page_num
+
+    def iter_section_columns(self):
+        """Lê o PDF uma única vez: localiza a seção entre 'Leis e Decretos' e 'Atos do Governador',
+        parando ao passar do seu fim, e gera o texto de cada coluna das páginas da seção, separadas
+        pelas caixas das palavras. Em caso de erro, marca extraction_failed e encerra."""
         try:
-            reader = pypdf.PdfReader(io.BytesIO(self.pdf_bytes))
-            start_page_num, end_page_num = None, None
-            
-            for i, page in enumerate(reader.pages):
-                text = page.extract_text() or ""
-                if not text.strip():
-                    continue
-                if re.search(r'Leis\s*e\s*Decretos', text, re.IGNORECASE):
-                    start_page_num = i
-                if re.search(r'Atos\s*do\s*Governador', text, re.IGNORECASE):
-                    end_page_num = i
-
-            if start_page_num is None or end_page_num is None or start_page_num > end_page_num:
-                st.warning("Não foi encontrado o trecho de 'Leis e Decretos' ou 'Atos do Governador' para delimitar a seção.")
-                return None, None
-
-            return start_page_num, end_page_num + 1
-
-        except Exception as e:
-            st.error(f"Erro ao buscar páginas relevantes com PyPDF: {e}")
-            return None, None
-
-    def process_pdf(self) -> pd.DataFrame:
-        start_page_idx, end_page_idx = self.find_relevant_pages()
-        if start_page_idx is None:
-            return pd.DataFrame()
-
-        trechos = []
-        try:
-            with pdfplumber.open(io.BytesIO(self.pdf_bytes)) as pdf:
-                # Processa apenas o subconjunto de páginas relevante
-                for i in range(start_page_idx, end_page_idx):
-                    pagina = pdf.pages[i]
-                    largura, altura = pagina.width, pagina.height
-                    for col_num, (x0, x1) in enumerate([(0, largura/2), (largura/2, largura)], start=1):
-                        coluna = pagina.crop((x0, 0, x1, altura)).extract_text(layout=True) or ""
-                        texto_limpo = re.sub(r'\s+', ' ', coluna).strip()
-                        trechos.append({
+            with timing.stage("Abertura do PDF") as etapa:
+                doc = open_pdf(self.pdf_source)
+                etapa["paginas"] = doc.page_count
+            with doc:
+                with timing.stage("Localização da seção") as etapa:
+                    start_page_num, end_page_num = self.find_section(
+                        timing.counted((page.get_text("text") for page in doc), etapa), self.budget, self.rule_timings
+                    )
+
+                if start_page_num is None or end_page_num is None or start_page_num > end_page_num:
+                    jobs.notify("warning", "Não foi encontrado o trecho de 'Leis e Decretos' ou 'Atos do Governador' para delimitar a seção.")
+                    return
+
+                for i in range(start_page_num, end_page_num + 1):
+                    self.budget.check("exec_colunas")
+                    page = doc[i]
+                    meio = page.rect.width / 2
+                    colunas = ([], [])
+                    for x0, topo, x1, _, palavra, *_ in page.get_text("words"):
+                        colunas[0 if (x0 + x1) / 2 < meio else 1].append((topo, x0, palavra))
+                    for col_num, palavras in enumerate(colunas, start=1):
+                        yield {
                             "pagina": i + 1,
                             "coluna": col_num,
-                            "texto": texto_limpo
-                        })
+                            "texto": rule_sub("espacos", self.rule_timings, ' ', self.join_lines(palavras)).strip()
+                        }
+        except TimeBudgetExceeded:
+            raise
         except Exception as e:
-            st.error(f"Erro ao extrair texto detalhado do PDF do Executivo: {e}")
-            return pd.DataFrame()
-            
+            jobs.notify("error", f"Erro ao extrair texto detalhado do PDF do Executivo: {e}")
+            self.extraction_failed = True
+
+    def process_pdf(self) -> list:
+        """Retorna as linhas extraídas, com os campos na ordem de EXEC_COLUMNS (vazia se a extração falhar)."""
+        # As colunas são processadas à medida que são extraídas, sem manter a seção inteira em memória
+        with timing.stage("Colunas e regras") as etapa:
+            dados = self.extract_rows(timing.counted(self.iter_section_columns(), etapa, "colunas"))
+        add_rule_timings(self.rule_timings)
+
+        if self.extraction_failed:
+            return []
+        return [[linha[coluna] for coluna in EXEC_COLUMNS] for linha in dados]
+
+    @staticmethod
+    def merge_events(publicadas: list, comandos: list):
+        """Intercala as normas publicadas e os comandos de uma coluna (cada lista já ordenada pela
+        posição) numa única passada, gerando (tipo, match); na mesma posição, a norma vem primeiro."""
+        i = j = 0
+        while i < len(publicadas) or j < len(comandos):
+            if j == len(comandos) or (i < len(publicadas) and publicadas[i].start() <= comandos[j].start()):
+                yield 'published', publicadas[i]
+                i += 1
+            else:
+                yield 'command', comandos[j]
+                j += 1
+
+    def altered_norms(self, command, alteracoes: list, inicios: list) -> list:
+        """Normas alteradas por um comando, entre as ocorrências da coluna (inicios é a lista ordenada das
+        suas posições) que começam a até ALTERACAO_RAIO caracteres dele: todas, se o comando revoga,
+        ou só a mais próxima (a anterior, no empate). Como as ocorrências vêm da coluna inteira, uma
+        norma que começa dentro do raio é tomada inteira, com o número e a data completos, mesmo que
+        termine fora dele (o antigo trecho de ±ALTERACAO_RAIO a cortava ou a perdia)."""
+        pos = command.start()
+        lo = bisect.bisect_left(inicios, pos - ALTERACAO_RAIO)
+        hi = bisect.bisect_left(inicios, pos + ALTERACAO_RAIO)
+        if lo == hi:
+            return []
+        if 'revogado' in command.group(0).lower():
+            return alteracoes[lo:hi]
+        idx = bisect.bisect_left(inicios, pos, lo, hi)
+        if idx == hi or (idx > lo and pos - inicios[idx - 1] <= inicios[idx] - pos):
+            idx -= 1
+        return [alteracoes[idx]]
+
+    def extract_rows(self, trechos) -> list:
+        """Aplica as regras de normas e alterações às colunas, na ordem de leitura. As normas citadas
+        são localizadas uma única vez por coluna e cada comando as consulta por busca binária."""
         dados = []
         ultima_norma = None
         seen_alteracoes = set()
 
         for t in trechos:
+            self.budget.check("exec_norma_alterada")
             pagina = t["pagina"]
             coluna = t["coluna"]
             texto = t["texto"]
 
-            eventos = []
-            for m in self.norma_regex.finditer(texto):
-                eventos.append(('published', m.start(), m))
-            for c in self.comandos_regex.finditer(texto):
-                eventos.append(('command', c.start(), c))
-            eventos.sort(key=lambda e: e[1])
-
-            for ev in eventos:
-                tipo_ev, pos_ev, match_obj = ev
-                command_text = match_obj.group(0).lower()
+            comandos = list(rule_finditer("exec_comandos", self.rule_timings, texto))
+            alteracoes = list(rule_finditer("exec_norma_alterada", self.rule_timings, texto)) if comandos else []
+            inicios = [m.start() for m in alteracoes]
 
+            publicadas = list(rule_finditer("exec_norma", self.rule_timings, texto))
+            for tipo_ev, match_obj in self.merge_events(publicadas, comandos):
                 if tipo_ev == 'published':
                     match = match_obj
                     tipo_raw = match.group(1).strip()
@@ -504,25 +1012,7 @@ class ExecutiveProcessor:
                     if ultima_norma is None:
                         continue
 
-                    raio = 150
-                    start_block = max(0, pos_ev - raio)
-                    end_block = min(len(texto), pos_ev + raio)
-                    bloco = texto[start_block:end_block]
-
-                    alteracoes_para_processar = []
-                    if 'revogado' in command_text:
-                        alteracoes_para_processar = list(self.norma_alterada_regex.finditer(bloco))
-                    else:
-                        alteracoes_candidatas = list(self.norma_alterada_regex.finditer(bloco))
-                        if alteracoes_candidatas:
-                            pos_comando_no_bloco = pos_ev - start_block
-                            melhor_candidato = min(
-                                alteracoes_candidatas,
-                                key=lambda m: abs(m.start() - pos_comando_no_bloco)
-                            )
-                            alteracoes_para_processar = [melhor_candidato]
-                    
-                    for alt in alteracoes_para_processar:
+                    for alt in self.altered_norms(match_obj, alteracoes, inicios):
                         tipo_alt_raw = alt.group(1).strip()
                         tipo_alt = self.mapa_tipos.get(tipo_alt_raw.upper(), tipo_alt_raw)
                         num_alt = alt.group(2).replace(" ", "").replace(".", "").replace("/", "")
@@ -530,7 +1020,7 @@ class ExecutiveProcessor:
                         data_texto_alt = alt.group(3)
                         ano_alt = ""
                         if data_texto_alt:
-                            ano_match = re.search(r'(\d{4})', data_texto_alt)
+                            ano_match = rule_search("exec_ano", self.rule_timings, data_texto_alt)
                             if ano_match:
                                 ano_alt = ano_match.group(1)
                                 
@@ -557,15 +1047,216 @@ class ExecutiveProcessor:
                                 "Alterações": chave_alt
                             })
         
-        return pd.DataFrame(dados) if dados else pd.DataFrame()
+        return dados
+
+    @staticmethod
+    def rows_to_csv(dados, columns: list = None):
+        if not dados:
+            return None
+        return writers.write_csv(dados, header=columns or EXEC_COLUMNS)
 
     def to_csv(self):
-        df = self.process_pdf()
-        if df.empty:
+        return self.rows_to_csv(self.process_pdf())
+
+# --- Pipeline de Extração ---
+XLSX_MIME = writers.XLSX_MIME
+
+DIARY_TYPES = ('Legislativo', 'Administrativo', 'Executivo')
+
+# Colunas das saídas: as planilhas do Legislativo e o CSV do Administrativo não têm cabeçalho,
+# mas os nomes identificam os campos nos formatos JSONL e Parquet (o CSV do Administrativo omite a página)
+LEG_COLUMNS = {
+    "Normas": ['Sigla', 'Número', 'Ano'],
+    "Proposicoes": ['Sigla', 'Número', 'Ano', 'Categoria'],
+    "Requerimentos": ['Sigla', 'Número', 'Ano', 'Coluna 4', 'Coluna 5', 'Classificação'],
+    "Pareceres": ['Sigla', 'Número', 'Ano', 'Tipo'],
+}
+ADM_COLUMNS = ['Sigla', 'Número', 'Ano', 'Página']
+EXEC_COLUMNS = ['Página', 'Coluna', 'Sanção', 'Tipo', 'Número', 'Alterações']
+
+# Formato padrão de cada tipo de diário (o mesmo do download original)
+DEFAULT_FORMATS = {'Legislativo': 'xlsx', 'Administrativo': 'csv', 'Executivo': 'csv'}
+
+def output_formats(diario: str) -> list:
+    """ Formatos oferecidos para o tipo de diário: o padrão, JSONL e, com o pyarrow instalado, Parquet. """
+    formatos = [DEFAULT_FORMATS[diario], "jsonl"]
+    if writers.parquet_available():
+        formatos.append("parquet")
+    return formatos
+
+def detect_diary_type(pdf_source, file_name: str = "") -> str:
+    """ Identifica o tipo de diário pelo título da primeira página ou, na falta dele, pelo nome do arquivo. """
+    with open_pdf(pdf_source) as doc:
+        text = doc[0].get_text("text") if doc.page_count else ""
+    for diario in DIARY_TYPES:
+        if PATTERNS[f"tipo_{diario.lower()}"].search(text):
+            return diario
+    for diario in DIARY_TYPES:
+        if diario.lower() in file_name.lower():
+            return diario
+    return None
+
+def edition_date(pdf_source, file_name: str = "") -> str:
+    """ Data da edição (AAAA-MM-DD): a do nome do arquivo ou, na falta dela, a primeira data por
+    extenso da primeira página (o cabeçalho do diário). None se nenhuma data válida for encontrada. """
+    def valida(ano, mes, dia):
+        try:
+            return datetime.date(int(ano), int(mes), int(dia)).isoformat()
+        except ValueError:
             return None
-        output_csv = io.StringIO()
-        df.to_csv(output_csv, index=False, encoding="utf-8-sig")
-        return output_csv.getvalue().encode('utf-8')
+
+    for m in PATTERNS["data_arquivo"].finditer(Path(file_name).stem):
+        data = valida(m.group(1), m.group(2), m.group(3)) if m.group(1) else valida(m.group(6), m.group(5), m.group(4))
+        if data:
+            return data
+    with open_pdf(pdf_source) as doc:
+        text = doc[0].get_text("text") if doc.page_count else ""
+    for m in PATTERNS["data_extenso"].finditer(text):
+        mes = meses.get(m.group(2).upper())
+        data = mes and valida(m.group(3), mes, m.group(1))
+        if data:
+            return data
+    return None
+
+def extract_diary(pdf_source, diario: str):
+    """ Executa o processador do tipo de diário sobre o PDF (de preferência o caminho em disco) e
+    retorna os dados extraídos: linhas por planilha (Legislativo) ou linhas (Administrativo e Executivo). """
+    if diario == 'Legislativo':
+        # Extrai o texto do PDF com o backend configurado (pdf_text.TEXT_BACKENDS)
+        text = extract_legislative_text(pdf_source)
+        return LegislativeProcessor(text).process_all()
+    if diario == 'Administrativo':
+        return AdministrativeProcessor(pdf_source).process_pdf()
+    return ExecutiveProcessor(pdf_source).process_pdf()
+
+def export_diary(extracted_data, diario: str, formato: str = None, extra_columns: list = ()) -> tuple:
+    """ Grava os dados extraídos no formato pedido (padrão: DEFAULT_FORMATS) e retorna
+    (dados para download, nome do arquivo, MIME). As linhas vão direto para o arquivo, sem
+    DataFrames; extra_columns nomeia campos acrescentados à frente das linhas (ex.: Arquivo no lote). """
+    formato = formato or DEFAULT_FORMATS[diario]
+    extensao, mime_type = writers.FORMATS[formato]
+    file_name = f"{diario}_Extraido{extensao}"
+
+    if diario == 'Legislativo':
+        if formato == "xlsx":
+            return writers.write_xlsx(extracted_data), file_name, mime_type
+        # Nos formatos de registros, as planilhas viram um único arquivo, com o nome da planilha em cada linha
+        registros = (
+            registro
+            for sheet_name, linhas in extracted_data.items()
+            for registro in writers.records(linhas, [*extra_columns, *LEG_COLUMNS[sheet_name]], Planilha=sheet_name)
+        )
+        columns = ["Planilha", *extra_columns, *dict.fromkeys(c for cols in LEG_COLUMNS.values() for c in cols)]
+    else:
+        if not extracted_data:
+            return None, None, None
+        columns = [*extra_columns, *(ADM_COLUMNS if diario == 'Administrativo' else EXEC_COLUMNS)]
+        if formato == "csv" and diario == 'Administrativo':
+            return AdministrativeProcessor.rows_to_csv(extracted_data), file_name, mime_type
+        if formato == "csv":
+            return ExecutiveProcessor.rows_to_csv(extracted_data, columns), file_name, mime_type
+        registros = writers.records(extracted_data, columns)
+
+    if formato == "jsonl":
+        return writers.write_jsonl(registros), file_name, mime_type
+    if formato == "parquet":
+        return writers.write_parquet(registros, columns), file_name, mime_type
+    raise ValueError(f"Formato {formato!r} não disponível para o Diário {diario}")
+
+def process_diary(pdf_source, diario: str, formato: str = None) -> tuple:
+    """ Executa o processador do tipo de diário e retorna (dados para download, nome do arquivo, MIME).
+    Dentro de timing.run(), cada etapa fica registrada na execução corrente. """
+    extracted_data = extract_diary(pdf_source, diario)
+    with timing.stage("Exportação (XLSX/CSV)"):
+        return export_diary(extracted_data, diario, formato)
+
+# --- Cache de Resultados ---
+# Versão das regras de extração: altere sempre que um processador mudar, para invalidar o cache
+PROCESSOR_VERSION = "5"
+
+# Configuração do cache (variáveis de ambiente). Sem GIL_CACHE_DIR, apenas a camada em memória é usada.
+RESULT_CACHE_ENTRIES = int(os.environ.get("GIL_CACHE_ENTRIES", "32"))
+RESULT_CACHE_DIR = os.environ.get("GIL_CACHE_DIR")
+RESULT_CACHE_MAX_MB = int(os.environ.get("GIL_CACHE_MAX_MB", "512"))
+
+class ResultCache:
+    """
+    Cache de resultados endereçado pelo conteúdo do PDF. Mantém uma camada em memória (LRU)
+    e, opcionalmente, uma camada em disco que descarta os arquivos menos usados quando o
+    tamanho total excede o limite.
+    """
+    def __init__(self, max_entries: int = 32, disk_dir: str = None, disk_max_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_source, diario: str, formato: str = None, digest: str = None) -> str:
+        digest = digest or pdf_hash(pdf_source)
+        formato = formato or DEFAULT_FORMATS[diario]
+        return f"{diario}-{PROCESSOR_VERSION}-{TEXT_BACKENDS.get(diario, '')}-{formato}-{digest}"
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self.disk_dir is None:
+            return None
+        path = self.disk_dir / f"{key}.pkl"
+        try:
+            value = pickle.loads(path.read_bytes())
+            os.utime(path)  # marca como usado recentemente
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value):
+        self._remember(key, value)
+        if self.disk_dir is None:
+            return
+        path = self.disk_dir / f"{key}.pkl"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(pickle.dumps(value))
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """ Remove os arquivos usados há mais tempo até o diretório caber no limite. """
+        entries = []
+        for path in self.disk_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """ Instância única do cache, compartilhada entre reexecuções e sessões do Streamlit. """
+    return ResultCache(RESULT_CACHE_ENTRIES, RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB * 1024 * 1024)
 
 # --- Função Principal da Aplicação Streamlit ---
 def run_app():
@@ -600,26 +1291,40 @@ def run_app():
     """, unsafe_allow_html=True)
 
     st.divider()
+    if act_index.INDEX_DB is None:
+        show_extraction()
+        return
+    aba_extracao, aba_pesquisa = st.tabs(["Extração", "Pesquisa de atos"])
+    with aba_extracao:
+        show_extraction()
+    with aba_pesquisa:
+        show_act_search()
+
+def show_extraction():
+    """ Escolha do tipo de diário e do formato, entrada dos PDFs e os jobs de extração da sessão. """
     diario_escolhido = st.radio(
         "Selecione o tipo de Diário para extração:",
-        ('Legislativo', 'Administrativo', 'Executivo'),
+        DIARY_TYPES,
         horizontal=True
     )
+    formato = st.selectbox(
+        "Formato do arquivo de saída:",
+        output_formats(diario_escolhido),
+        format_func=str.upper
+    )
     st.divider()
 
     # --- Modo de entrada do PDF ---
-    pdf_bytes = None
+    # Origens a processar (ID do upload ou link) e o gerador que grava em disco as que ainda não têm
+    # job nesta sessão, entregando (origem, nome, caminho temporário) de cada PDF
+    origens = []
+    fontes = None
     
-    # Lógica condicional para exibir ou não a opção de link
-    if diario_escolhido == 'Executivo':
-        modo = "Upload de arquivo"
-        st.info("Para o Diário do Executivo, é necessário fazer o upload do arquivo.")
-    else:
-        modo = st.radio(
-            "Como deseja fornecer o PDF?",
-            ("Upload de arquivo", "Link da internet"),
-            horizontal=True
-        )
+    modo = st.radio(
+        "Como deseja fornecer o PDF?",
+        ("Upload de arquivo", "Link da internet"),
+        horizontal=True
+    )
 
     if modo == "Upload de arquivo":
         uploaded_file = st.file_uploader(
@@ -627,92 +1332,285 @@ def run_app():
             type="pdf"
         )
         if uploaded_file is not None:
-            pdf_bytes = uploaded_file.read()
+            origens = [uploaded_file.file_id]
+            fontes = lambda pendentes: iter_uploaded_pdf(uploaded_file)
     else:
-        # Link da internet
-        url = st.text_input("Cole o link do PDF aqui:")
-        if url:
-            try:
-                with st.spinner("Baixando PDF..."):
-                    resp = requests.get(url, timeout=30)
-                    if resp.status_code == 200:
-                        ctype = resp.headers.get("Content-Type", "")
-                        if ("pdf" not in ctype.lower()) and (not url.lower().endswith(".pdf")):
-                            st.warning("O link não parece apontar para um PDF (Content-Type != PDF). Tentarei processar mesmo assim.")
-                        pdf_bytes = resp.content
-                    else:
-                        st.error(f"Falha ao baixar (status {resp.status_code}).")
-            except Exception as e:
-                st.error(f"Erro ao baixar o PDF: {e}")
+        # Link da internet (um por linha para processar várias edições)
+        links = st.text_area("Cole o link do PDF aqui (um por linha para várias edições):")
+        urls = list(dict.fromkeys(u.strip() for u in links.splitlines() if u.strip()))
+        if urls:
+            # No Executivo, só as páginas até o fim da seção relevante são baixadas
+            fetch = fetch_executive_section if diario_escolhido == 'Executivo' else None
+            origens = urls
+            fontes = lambda pendentes: iter_link_pdfs(pendentes, fetch)
+    varios = len(origens) > 1
 
     # --- Processamento ---
-    if pdf_bytes:
-        try:
-            if diario_escolhido == 'Legislativo':
-                # Usa PyPDF2 para extrair texto do PDF em memória
-                reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
-                text = ""
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                # Normalização básica
-                text = re.sub(r"[ \t]+", " ", text)
-                text = re.sub(r"\n+", "\n", text)
-                
-                with st.spinner('Extraindo dados do Diário do Legislativo...'):
-                    processor = LegislativeProcessor(text)
-                    extracted_data = processor.process_all()
-
-                    # Gera Excel em memória
-                    output = io.BytesIO()
-                    excel_file_name = "Legislativo_Extraido.xlsx"
-                    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                        for sheet_name, df in extracted_data.items():
-                            df.to_excel(writer, sheet_name=sheet_name, index=False, header=False)
-                    output.seek(0)
-                    download_data = output
-                    file_name = excel_file_name
-                    mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-            elif diario_escolhido == 'Administrativo':
-                with st.spinner('Extraindo dados do Diário Administrativo...'):
-                    processor = AdministrativeProcessor(pdf_bytes)
-                    csv_data = processor.to_csv()
-                    if csv_data:
-                        download_data = csv_data
-                        file_name = "Administrativo_Extraido.csv"
-                        mime_type = "text/csv"
-                    else:
-                        download_data = None
-                        file_name = None
-                        mime_type = None
-            else: # Executivo
-                with st.spinner('Extraindo dados do Diário do Executivo...'):
-                    processor = ExecutiveProcessor(pdf_bytes)
-                    csv_data = processor.to_csv()
-                    if csv_data:
-                        download_data = csv_data
-                        file_name = "Executivo_Extraido.csv"
-                        mime_type = "text/csv"
-                    else:
-                        download_data = None
-                        file_name = None
-                        mime_type = None
-
-            if download_data:
-                st.success("Dados extraídos com sucesso! ✅")
-                st.divider()
-                st.download_button(
-                    label="Clique aqui para baixar o arquivo",
-                    data=download_data,
-                    file_name=file_name,
-                    mime=mime_type
-                )
-                st.info(f"O download do arquivo **{file_name}** está pronto.")
+    # Cada PDF é extraído num job em segundo plano. A sessão guarda o job de cada origem: as
+    # reexecuções (cliques, atualização do progresso) não repetem o download nem a extração
+    manager = get_job_manager()
+    jobs_sessao = st.session_state.setdefault("jobs", {})
+    chaves = {origem: f"{diario_escolhido}|{formato}|{origem}" for origem in origens}
+    pendentes = [origem for origem in origens if manager.get(jobs_sessao.get(chaves[origem])) is None]
+    if pendentes:
+        # Cada fonte é um PDF temporário em disco, removido quando o laço avança para a próxima. As que
+        # falham (download, arquivo vazio, agendamento) viram jobs com erro: as reexecuções só o exibem
+        for origem, nome, pdf_path, erro in fontes(pendentes):
+            chave = chaves[origem]
+            if erro is None and not os.path.getsize(pdf_path):
+                erro = ValueError("o arquivo PDF está vazio.")
+            if erro is None:
+                try:
+                    jobs_sessao[chave] = submit_diary(manager, pdf_path, nome, diario_escolhido, formato).id
+                    continue
+                except Exception as e:
+                    erro = e
+            jobs_sessao[chave] = manager.add_failure(chave, erro, nome).id
+
+    for indice, origem in enumerate(origens):
+        job_id = jobs_sessao.get(chaves[origem])
+        if manager.get(job_id) is not None:
+            show_job(job_id, indice, varios)
+
+# --- Jobs de Extração ---
+# Intervalo (em segundos) entre as atualizações do progresso na tela (GIL_JOB_POLL_SECONDS)
+JOB_POLL_SECONDS = float(os.environ.get("GIL_JOB_POLL_SECONDS", "1"))
+
+@st.cache_resource
+def get_job_manager() -> jobs.JobManager:
+    """ Pool único de jobs, compartilhado entre reexecuções e sessões do Streamlit. """
+    return jobs.JobManager()
+
+def run_diary_job(cache: ResultCache, cache_key: str, pdf_path: str, diario: str, formato: str,
+                  nome: str, digest: str) -> tuple:
+    """ Executado no job: processa o diário, guarda o resultado no cache e, com GIL_INDEX_DB definido,
+    grava os atos extraídos no índice. """
+    extracted_data = extract_diary(pdf_path, diario)
+    with timing.stage("Exportação (XLSX/CSV)"):
+        result = export_diary(extracted_data, diario, formato)
+    if result[0]:
+        cache.put(cache_key, result)
+        if act_index.INDEX_DB is not None:
+            # O download não depende do índice: uma falha nele vira um aviso, não um erro do job
+            try:
+                with timing.stage("Índice de atos"):
+                    get_act_index().ingest(digest, diario, edition_date(pdf_path, nome), nome, extracted_data)
+            except Exception as e:
+                jobs.notify("warning", f"Os atos desta edição não foram gravados no índice de pesquisa: {e}")
+    return result
+
+def submit_diary(manager: jobs.JobManager, pdf_path: str, nome: str, diario: str, formato: str) -> jobs.Job:
+    """ Devolve o resultado do cache como um job concluído ou agenda a extração do PDF. O job recebe
+    um nome próprio para o arquivo temporário (o original é removido pelo chamador) e o remove ao terminar. """
+    # Novos uploads do mesmo arquivo e outros usuários reaproveitam o resultado ou o job em andamento
+    cache = get_result_cache()
+    digest = pdf_hash(pdf_path)
+    cache_key = ResultCache.make_key(pdf_path, diario, formato, digest)
+    result = cache.get(cache_key)
+    # Com o índice ativo, uma edição que ainda não está nele é extraída de novo para ser ingerida
+    if result is not None and edition_indexed(digest):
+        return manager.add_result(cache_key, result, nome)
+    try:
+        total_paginas = BACKENDS["pymupdf"].page_count(pdf_path)
+    except Exception:
+        # O processador informa o erro de abertura; o progresso só fica sem o total de páginas
+        total_paginas = None
+    job_path = keep_pdf(pdf_path)
+    return manager.submit(
+        cache_key, run_diary_job, cache, cache_key, job_path, diario, formato, nome, digest,
+        label=nome, total_pages=total_paginas, cleanup=lambda: os.unlink(job_path)
+    )
 
-        except Exception as e:
-            st.error(f"Ocorreu um erro ao processar o arquivo: {e}")
+def show_job(job_id: str, indice: int, varios: bool):
+    """ Exibe o job: enquanto ele roda, o progresso, atualizado a cada JOB_POLL_SECONDS sem reexecutar
+    a página; ao término, os avisos do processador, o download e os tempos por etapa. """
+    job = get_job_manager().get(job_id)
+    if job.active:
+        st.fragment(show_job_progress, run_every=JOB_POLL_SECONDS)(job_id, varios)
+        return
+
+    if varios:
+        st.subheader(job.label)
+    for kind, message in job.messages:
+        getattr(st, kind)(message)
+    if job.status == jobs.FAILED:
+        if isinstance(job.error, TimeBudgetExceeded):
+            st.error(f"Extração interrompida por tempo: {job.error}")
+        else:
+            st.error(f"Ocorreu um erro ao processar o arquivo: {job.error}")
+        if st.button("Tentar novamente", key=f"retry-{indice}"):
+            # Sem o job, a próxima execução baixa e processa a origem outra vez
+            get_job_manager().discard(job_id)
+            st.rerun()
+        return
+
+    download_data, file_name, mime_type = job.result
+    if download_data:
+        if varios:
+            file_name = f"{Path(job.label).stem}_{file_name}"
+        st.success("Dados extraídos com sucesso! ✅")
+        st.divider()
+        st.download_button(
+            label="Clique aqui para baixar o arquivo",
+            data=download_data,
+            file_name=file_name,
+            mime=mime_type,
+            key=f"download-{indice}"
+        )
+        st.info(f"O download do arquivo **{file_name}** está pronto.")
+
+    show_job_sheets(job)
+    # Resultados vindos do cache não têm tempos: a extração não foi executada agora
+    if job.timer is not None:
+        with st.expander(f"Tempos por etapa ({job.seconds:.2f}s)"):
+            st.dataframe(job.timer.to_frame(), hide_index=True)
+
+def show_job_progress(job_id: str, varios: bool):
+    """ Fragmento reexecutado periodicamente enquanto o job roda; ao término, reexecuta a página para exibir o resultado. """
+    job = get_job_manager().get(job_id)
+    if job is None or not job.active:
+        st.rerun()
+    if varios:
+        st.subheader(job.label)
+    if job.status == jobs.QUEUED:
+        st.progress(0.0, text="Na fila: aguardando o término de outras extrações...")
+        return
+    progresso = job.progress()
+    texto = progresso["etapa"] or "Iniciando"
+    if progresso.get("paginas") is not None:
+        total = f" de {job.total_pages}" if job.total_pages else ""
+        texto += f": {progresso['paginas']}{total} páginas"
+    if progresso.get("colunas") is not None:
+        texto += f", {progresso['colunas']} colunas"
+    st.progress(progresso["fracao"], text=f"{texto} ({job.seconds:.0f}s)")
+    show_job_sheets(job)
+
+def show_job_sheets(job: jobs.Job):
+    """ Planilhas do Legislativo já concluídas: durante o job, cada uma aparece assim que a sua etapa termina. """
+    if not job.partial:
+        return
+    import pandas as pd
+    for planilha, linhas in list(job.partial.items()):
+        with st.expander(f"{planilha}: {len(linhas)} linhas"):
+            st.dataframe(pd.DataFrame(linhas, columns=LEG_COLUMNS.get(planilha)), hide_index=True)
+
+# --- Pesquisa de Atos ---
+@st.cache_resource
+def get_act_index() -> act_index.ActIndex:
+    """ Conexão única com o índice de atos (GIL_INDEX_DB), compartilhada entre sessões e jobs. """
+    return act_index.ActIndex(act_index.INDEX_DB)
+
+def edition_indexed(digest: str) -> bool:
+    """ Se a edição já está no índice de atos. Sem índice, ou com ele indisponível, não há o que completar. """
+    if act_index.INDEX_DB is None:
+        return True
+    try:
+        return get_act_index().has_edition(digest)
+    except Exception:
+        return True
+
+def show_act_search():
+    """ Aba de pesquisa no índice: por ato (sigla, número e ano), tipo de diário e período das edições. """
+    try:
+        indice = get_act_index()
+        stats = indice.stats()
+    except Exception as e:
+        st.error(f"O índice de atos ({act_index.INDEX_DB}) não está disponível: {e}")
+        return
+    if not stats["edicoes"]:
+        st.info("O índice ainda não tem edições: os diários extraídos passam a ser pesquisáveis aqui.")
+        return
+    periodo_indice = f", de {stats['de']} a {stats['ate']}" if stats["de"] else ""
+    st.caption(f"{stats['edicoes']} edições e {stats['atos']} atos no índice{periodo_indice}.")
+
+    ato = st.text_input("Ato (ex.: RQN 12345/2025, LEI 25020 ou apenas a sigla):")
+    col_diario, col_periodo = st.columns(2)
+    diario = col_diario.selectbox("Diário", ("Todos", *DIARY_TYPES))
+    periodo = col_periodo.date_input("Período das edições", value=(), format="DD/MM/YYYY")
+    if not ato.strip() and not periodo:
+        return
+    try:
+        sigla, numero, ano = act_index.parse_act(ato) if ato.strip() else (None, None, None)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    de = periodo[0].isoformat() if periodo else None
+    ate = periodo[-1].isoformat() if periodo else None
+
+    linhas = indice.search(sigla, numero, ano, de, ate, None if diario == "Todos" else diario)
+    if not linhas:
+        st.info("Nenhum ato encontrado.")
+        return
+    import pandas as pd
+    limite = f" (exibindo os primeiros {act_index.SEARCH_LIMIT})" if len(linhas) == act_index.SEARCH_LIMIT else ""
+    st.write(f"**{len(linhas)} atos encontrados**{limite}")
+    st.dataframe(pd.DataFrame(linhas, columns=act_index.SEARCH_COLUMNS), hide_index=True)
+
+def fetch_executive_section(url: str, session=None) -> "DownloadedPDF":
+    """ Obtém de um link apenas o necessário de um Diário do Executivo: lê o PDF remoto por requisições
+    Range até o fim da seção 'Leis e Decretos' e monta um PDF com as páginas lidas, em que as anteriores
+    à seção viram páginas em branco (a numeração é preservada). Sem suporte a Range, ou se o PDF não puder
+    ser lido assim, baixa o arquivo inteiro; só falhas de rede definitivas (DownloadError) são levantadas. """
+    import pypdf
+    from download import DownloadedPDF, DownloadError, RangeFile, RangeNotSupported, download_pdf
+
+    pages = []
+    def page_texts():
+        for page in iter_pages_lazily(reader):
+            pages.append(page)
+            yield page.extract_text() or ""
+    try:
+        remoto = RangeFile(url, session)
+        # Fora do modo estrito o pypdf confere o cabeçalho de cada objeto do xref, lendo o arquivo inteiro
+        reader = pypdf.PdfReader(remoto, strict=True)
+        start_page_num, end_page_num = ExecutiveProcessor.find_section(page_texts(), TimeBudget(PROCESSOR_TIME_BUDGET))
+        writer = pypdf.PdfWriter()
+        if start_page_num is None or end_page_num is None or start_page_num > end_page_num:
+            # Sem a seção não há o que copiar; o processador emitirá o aviso habitual
+            writer.add_blank_page(width=595, height=842)
+        else:
+            caixa = pages[start_page_num].mediabox
+            for _ in range(start_page_num):
+                writer.add_blank_page(width=caixa.width, height=caixa.height)
+            for page in pages[start_page_num:end_page_num + 1]:
+                writer.add_page(page)
+        output = io.BytesIO()
+        writer.write(output)
+    except RangeNotSupported:
+        return download_pdf(url, session)
+    except DownloadError:
+        # Falha de rede definitiva: vira o erro deste link
+        raise
+    except Exception:
+        # PDF que precisa de reparo, com estrutura de páginas incomum ou seção que estoura o tempo:
+        # o arquivo completo segue o caminho normal e o processador informa o que houver
+        return download_pdf(url, session)
+    output.seek(0)
+    return DownloadedPDF(url, output, remoto.bytes_fetched, remoto.content_type)
+
+def iter_uploaded_pdf(uploaded_file):
+    """ Grava o upload num PDF temporário em disco e entrega (ID do upload, nome, caminho, erro=None). """
+    with spooled_pdf(uploaded_file) as pdf_path:
+        yield uploaded_file.file_id, uploaded_file.name, pdf_path, None
+
+def iter_link_pdfs(urls: list, fetch=None):
+    """ Baixa os links em paralelo e entrega (link, nome, caminho temporário, erro) de cada PDF assim que o seu
+    download termina; um link que falhou vem sem caminho (None) e com o erro.
+    fetch(url, session) define como cada link é obtido; por padrão, download.download_pdf (o arquivo inteiro). """
+    from download import download_many, download_pdf
+    downloads = download_many(urls, fetch=fetch or download_pdf)
+    while True:
+        with st.spinner("Baixando PDF..."):
+            url, pdf, erro = next(downloads, (None, None, None))
+        if url is None:
+            return
+        if erro is not None:
+            yield url, url, None, erro
+            continue
+        if not pdf.looks_like_pdf:
+            st.warning(f"O link {url} não parece apontar para um PDF (Content-Type != PDF). Tentarei processar mesmo assim.")
+        with pdf, spooled_pdf(pdf.file) as pdf_path:
+            yield url, pdf.file_name, pdf_path, None
 
 # --- Entrada ---
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Processamento em lote de diários (linha de comando)
+# ======================================
+"""
+Processa um acervo de diários sem a interface do Streamlit: cada PDF gera o
+mesmo arquivo que o download do aplicativo e, ao final, os resultados de cada
+tipo de diário são consolidados num único arquivo, com o nome do PDF de origem
+na primeira coluna.
+
+Uso (a partir da raiz do repositório):
+    python batch.py diarios/ --saida resultados/
+    python batch.py "diarios/2025-03-*.pdf" --tipo Legislativo --processos 4
+    python batch.py diarios/ --formato parquet
+"""
+
+import argparse
+import glob
+import os
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import app
+import pdf_text
+import timing
+import writers
+from app import (
+    DIARY_TYPES,
+    TimeBudgetExceeded,
+    detect_diary_type,
+    export_diary,
+    extract_diary,
+)
+
+
+def collect_pdfs(entradas: list) -> list:
+    """ Expande diretórios e padrões glob em uma lista ordenada e sem repetições de PDFs. """
+    arquivos = []
+    for entrada in entradas:
+        caminho = Path(entrada)
+        if caminho.is_dir():
+            arquivos.extend(sorted(p for p in caminho.iterdir() if p.suffix.lower() == ".pdf"))
+        elif caminho.is_file():
+            arquivos.append(caminho)
+        else:
+            arquivos.extend(sorted(Path(p) for p in glob.glob(entrada)))
+    return list(dict.fromkeys(arquivos))
+
+
+def _init_worker():
+    """ Cada processo já trata um arquivo inteiro: desativa o paralelismo por páginas e por etapas dentro dele. """
+    pdf_text.EXTRACTION_WORKERS = 1
+    app.LEG_STEP_WORKERS = 1
+
+
+def process_file(path: Path, diario: str, saida: Path, formato: str = None) -> dict:
+    """ Processa um PDF e grava o seu arquivo de saída. Executada nos processos auxiliares. """
+    resultado = {"arquivo": path, "diario": diario, "paginas": 0, "segundos": 0.0,
+                 "saida": None, "dados": None, "erro": None}
+    inicio = time.perf_counter()
+    try:
+        # O PDF é lido direto do disco, sem carregar o arquivo inteiro em memória
+        resultado["paginas"] = pdf_text.BACKENDS["pymupdf"].page_count(str(path))
+        diario = diario or detect_diary_type(str(path), path.name)
+        resultado["diario"] = diario
+        if diario is None:
+            resultado["erro"] = "tipo de diário não identificado (use --tipo)"
+            return resultado
+
+        # Com GIL_PROFILE_DIR definido, grava o perfil e os tempos por etapa de cada arquivo
+        with timing.run(path.name):
+            dados = extract_diary(str(path), diario)
+            with timing.stage("Exportação (XLSX/CSV)"):
+                download_data, file_name, _ = export_diary(dados, diario, formato)
+        if download_data:
+            destino = saida / f"{path.stem}_{file_name}"
+            destino.write_bytes(download_data)
+            resultado["saida"] = destino
+            resultado["dados"] = dados
+        else:
+            resultado["erro"] = "nenhum dado extraído"
+    except TimeBudgetExceeded as e:
+        resultado["erro"] = f"interrompido por tempo: {e}"
+    except Exception as e:
+        resultado["erro"] = f"erro ao processar: {e}"
+    finally:
+        resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+
+def consolidate(resultados: list, diario: str, formato: str = None):
+    """ Une os dados extraídos de todos os arquivos de um tipo de diário, identificando a origem de cada linha. """
+    extraidos = [(r["arquivo"].name, r["dados"]) for r in resultados if r["diario"] == diario and r["dados"] is not None]
+    if not extraidos:
+        return None
+
+    if diario == "Legislativo":
+        consolidado = {}
+        for nome, dados in extraidos:
+            for sheet_name, linhas in dados.items():
+                consolidado.setdefault(sheet_name, []).extend([nome, *linha] for linha in linhas)
+    else:
+        consolidado = [[nome, *linha] for nome, dados in extraidos for linha in dados]
+    return export_diary(consolidado, diario, formato, extra_columns=["Arquivo"])
+
+
+def run_batch(arquivos: list, diario: str, saida: Path, processos: int, formato: str = None) -> list:
+    """ Processa os arquivos num pool de processos e retorna os resultados na ordem de entrada. """
+    saida.mkdir(parents=True, exist_ok=True)
+    if processos <= 1 or len(arquivos) <= 1:
+        return [process_file(path, diario, saida, formato) for path in arquivos]
+
+    # "spawn", como em pdf_text: os processos importam app.py sem herdar o estado do pai
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processos, mp_context=context, initializer=_init_worker) as pool:
+        futures = [pool.submit(process_file, path, diario, saida, formato) for path in arquivos]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processa diários em lote, sem a interface do Streamlit.")
+    parser.add_argument("entradas", nargs="+", help="PDFs, diretórios ou padrões glob (entre aspas)")
+    parser.add_argument("--tipo", choices=[*DIARY_TYPES, "auto"], default="auto",
+                        help="tipo dos diários; 'auto' identifica cada arquivo pela primeira página")
+    parser.add_argument("--saida", type=Path, default=Path("resultados"), help="diretório dos arquivos gerados")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="arquivos processados em paralelo")
+    parser.add_argument("--formato", choices=["padrao", "jsonl", "parquet"], default="padrao",
+                        help="formato dos arquivos gerados; 'padrao' é o do aplicativo (XLSX no Legislativo, CSV nos demais)")
+    args = parser.parse_args()
+    if args.formato == "parquet" and not writers.parquet_available():
+        parser.error("o formato parquet exige o pacote pyarrow")
+
+    arquivos = collect_pdfs(args.entradas)
+    if not arquivos:
+        parser.error("nenhum PDF encontrado nas entradas informadas")
+
+    diario = None if args.tipo == "auto" else args.tipo
+    formato = None if args.formato == "padrao" else args.formato
+    inicio = time.perf_counter()
+    resultados = run_batch(arquivos, diario, args.saida, args.processos, formato)
+
+    for r in resultados:
+        status = r["saida"] or r["erro"]
+        print(f"{str(r['arquivo']):<50}{r['diario'] or '?':<16}{r['paginas']:>6} pág.{r['segundos']:>8.2f}s  {status}")
+
+    for tipo in DIARY_TYPES:
+        consolidado = consolidate(resultados, tipo, formato)
+        if consolidado:
+            download_data, file_name, _ = consolidado
+            destino = args.saida / file_name.replace("_Extraido", "_Consolidado")
+            destino.write_bytes(download_data)
+            print(f"Consolidado: {destino}")
+
+    total = time.perf_counter() - inicio
+    paginas = sum(r["paginas"] for r in resultados)
+    falhas = sum(1 for r in resultados if r["erro"])
+    print(f"\n{len(resultados)} arquivos ({falhas} sem saída), {paginas} páginas em {total:.1f}s: "
+          f"{paginas / total:.1f} páginas/s, {len(resultados) / total:.2f} arquivos/s")
+
+
+if __name__ == "__main__":
+    main()
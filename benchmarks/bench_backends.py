@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Comparação dos backends de extração de texto
+# ======================================
+"""
+Mede, para cada backend de pdf_text.BACKENDS, o tempo de extração do texto e
+verifica se as planilhas geradas são idênticas às do backend padrão do tipo de
+diário (pdf_text.TEXT_BACKENDS). Só troque o padrão por um backend mais rápido
+que reproduza as mesmas planilhas nos diários de referência.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_backends Legislativo caminho/diario.pdf [outro.pdf ...]
+    python -m benchmarks.bench_backends Administrativo caminho/diario.pdf --repeticoes 3
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app import (
+    AdministrativeProcessor,
+    LegislativeProcessor,
+    extract_legislative_text,
+)
+from pdf_text import BACKENDS, TEXT_BACKENDS, extract_pages_text
+
+
+def run_pipeline(pdf_bytes: bytes, diario: str, backend: str):
+    """ Executa o processador do diário com o backend indicado e retorna os dados extraídos. """
+    if diario == "Legislativo":
+        return LegislativeProcessor(extract_legislative_text(pdf_bytes, workers=1, backend=backend)).process_all()
+    return AdministrativeProcessor(pdf_bytes, backend=backend).process_pdf()
+
+
+def same_output(a, b) -> bool:
+    """ Compara os resultados de dois backends (linhas por planilha ou lista de linhas). """
+    return a == b
+
+
+def bench_backends(pdf_bytes: bytes, diario: str, repeticoes: int = 3) -> list:
+    """ Retorna [backend, páginas, melhor tempo de extração em ms, planilhas idênticas ao padrão]. """
+    referencia = run_pipeline(pdf_bytes, diario, TEXT_BACKENDS[diario])
+    resultados = []
+    for nome in BACKENDS:
+        melhor = float("inf")
+        paginas = 0
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            paginas = len(extract_pages_text(pdf_bytes, workers=1, backend=nome))
+            melhor = min(melhor, time.perf_counter() - inicio)
+        identico = same_output(run_pipeline(pdf_bytes, diario, nome), referencia)
+        resultados.append([nome, paginas, melhor * 1000, identico])
+    resultados.sort(key=lambda r: r[2])
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Velocidade e paridade dos backends de extração de texto.")
+    parser.add_argument("diario", choices=list(TEXT_BACKENDS), help="tipo de diário dos arquivos")
+    parser.add_argument("arquivos", type=Path, nargs="+", help="PDFs de referência")
+    parser.add_argument("--repeticoes", type=int, default=3, help="extrações por backend (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    print(f"Backend padrão para {args.diario}: {TEXT_BACKENDS[args.diario]}")
+    for arquivo in args.arquivos:
+        print(f"\nDiário: {arquivo}")
+        print(f"{'Backend':<14}{'Páginas':>9}{'ms':>12}{'Páginas/s':>12}  Planilhas idênticas")
+        for nome, paginas, ms, identico in bench_backends(arquivo.read_bytes(), args.diario, args.repeticoes):
+            por_segundo = paginas / (ms / 1000) if ms else 0
+            print(f"{nome:<14}{paginas:>9}{ms:>12.1f}{por_segundo:>12.1f}  {'sim' if identico else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
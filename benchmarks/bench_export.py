@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Gravação das saídas: DataFrames x gravação direta
+# ======================================
+"""
+Compara, sobre os dados extraídos de um diário sintético grande
+(benchmarks/synthetic.py), o tempo e a memória alocada (pico do tracemalloc)
+da gravação das saídas:
+
+  - pandas: o caminho anterior, que montava DataFrames a partir das linhas e
+    gravava com pd.ExcelWriter (Legislativo) ou DataFrame.to_csv (Executivo);
+  - writers: a gravação direta das linhas (export_diary), em XLSX write-only,
+    CSV, JSONL e, com o pyarrow instalado, Parquet.
+
+A extração roda uma única vez por tipo; só a gravação é medida.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_export
+    python -m benchmarks.bench_export --paginas 2000 --densidade alta --repeticoes 5
+"""
+
+import io
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from app import EXEC_COLUMNS, export_diary, extract_diary, output_formats
+from benchmarks.synthetic import GENERATORS
+
+
+def legacy_export(dados, diario: str) -> bytes:
+    """ Gravação anterior, com DataFrames intermediários. """
+    import pandas as pd
+    output = io.BytesIO()
+    if diario == "Legislativo":
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            for sheet_name, linhas in dados.items():
+                pd.DataFrame(linhas).to_excel(writer, sheet_name=sheet_name, index=False, header=False)
+        return output.getvalue()
+    output_csv = io.StringIO()
+    pd.DataFrame(dados, columns=EXEC_COLUMNS).to_csv(output_csv, index=False)
+    return output_csv.getvalue().encode("utf-8")
+
+
+def measure(funcao, repeticoes: int) -> tuple:
+    """ Melhor tempo (s), pico de memória alocada durante uma gravação (MB) e tamanho da saída (KB). """
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        dados = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return melhor, pico / (1024 * 1024), len(dados) / 1024
+
+
+def extract(diario: str, paginas: int, densidade: str, seed: int):
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(GENERATORS[diario](paginas, densidade, seed))
+    try:
+        return extract_diary(tmp.name, diario)
+    finally:
+        os.unlink(tmp.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e memória da gravação das saídas.")
+    parser.add_argument("--tipos", nargs="+", default=["Legislativo", "Executivo"], choices=["Legislativo", "Executivo"])
+    parser.add_argument("--paginas", type=int, default=1000)
+    parser.add_argument("--densidade", default="alta", choices=["baixa", "normal", "alta"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3, help="gravações por caminho (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    print(f"{'Tipo':<14}{'Caminho':<18}{'Linhas':>8}{'s':>9}{'Pico (MB)':>11}{'Saída (KB)':>12}")
+    for diario in args.tipos:
+        dados = extract(diario, args.paginas, args.densidade, args.seed)
+        linhas = sum(map(len, dados.values())) if isinstance(dados, dict) else len(dados)
+        caminhos = [("pandas", lambda: legacy_export(dados, diario))]
+        caminhos += [(f"writers {formato}", lambda formato=formato: export_diary(dados, diario, formato)[0])
+                     for formato in output_formats(diario)]
+        for nome, funcao in caminhos:
+            segundos, pico, tamanho = measure(funcao, args.repeticoes)
+            print(f"{diario:<14}{nome:<18}{linhas:>8}{segundos:>9.3f}{pico:>11.1f}{tamanho:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Micro-benchmark dos padrões de extração
+# ======================================
+"""
+Mede o tempo de varredura de cada padrão de app.PATTERNS sobre um diário de
+referência, para identificar regressões quando algum padrão for editado.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_patterns caminho/diario.pdf
+    python -m benchmarks.bench_patterns caminho/diario.txt --repeticoes 10
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app import PATTERNS, extract_legislative_text
+
+
+def load_text(path: Path) -> str:
+    """ Lê o diário de referência: PDF (extraído como no Legislativo) ou texto puro. """
+    if path.suffix.lower() == ".pdf":
+        return extract_legislative_text(path.read_bytes())
+    return path.read_text(encoding="utf-8")
+
+
+def bench_patterns(text: str, repeticoes: int = 5) -> list:
+    """ Retorna [nome, ocorrências, melhor tempo em ms] de cada padrão, do mais lento ao mais rápido. """
+    resultados = []
+    for nome, pattern in PATTERNS.items():
+        melhor = float("inf")
+        ocorrencias = 0
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            ocorrencias = sum(1 for _ in pattern.finditer(text))
+            melhor = min(melhor, time.perf_counter() - inicio)
+        resultados.append([nome, ocorrencias, melhor * 1000])
+    resultados.sort(key=lambda r: r[2], reverse=True)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de varredura por padrão em um diário de referência.")
+    parser.add_argument("arquivo", type=Path, help="PDF ou .txt do diário de referência")
+    parser.add_argument("--repeticoes", type=int, default=5, help="execuções por padrão (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    text = load_text(args.arquivo)
+    print(f"Diário: {args.arquivo} ({len(text):,} caracteres)")
+    print(f"{'Padrão':<28}{'Ocorrências':>12}{'ms':>12}")
+    for nome, ocorrencias, ms in bench_patterns(text, args.repeticoes):
+        print(f"{nome:<28}{ocorrencias:>12}{ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Tempo de inicialização do aplicativo
+# ======================================
+"""
+Mede, em processos novos (como num contêiner recém-criado), quanto app.py
+leva para ser importado e para exibir a primeira tela, e quais dependências
+pesadas já estão carregadas nesse momento. O Streamlit é importado antes da
+medição da primeira tela, como acontece no servidor.
+
+Com --comparar, mede também uma revisão anterior do repositório (extraída com
+git archive num diretório temporário), para comparar as duas versões.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeticoes 10 --comparar HEAD~1
+"""
+
+import io
+import sys
+import json
+import tarfile
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("pandas", "numpy", "pypdf", "fitz", "pdfplumber", "requests", "openpyxl")
+
+# Executado num processo novo, com o diretório do aplicativo como diretório atual
+PROBE = """
+import sys, time, json
+inicio = time.perf_counter()
+import app
+importacao = time.perf_counter() - inicio
+import streamlit
+from streamlit.testing.v1 import AppTest
+inicio = time.perf_counter()
+AppTest.from_file("app.py", default_timeout=120).run()
+primeira_tela = time.perf_counter() - inicio
+print(json.dumps({
+    "importacao": importacao,
+    "primeira_tela": primeira_tela,
+    "modulos": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+# Só a primeira tela, sem importar app.py antes (os módulos já carregados não contariam de novo)
+PROBE_RENDER = PROBE.replace("import app\n", "")
+
+
+def measure(app_dir: Path, probe: str) -> dict:
+    saida = subprocess.run(
+        [sys.executable, "-c", probe], cwd=app_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def bench_startup(app_dir: Path, repeticoes: int) -> dict:
+    """ Mediana dos tempos de importação e de primeira tela em `repeticoes` processos novos. """
+    importacoes = [measure(app_dir, PROBE)["importacao"] for _ in range(repeticoes)]
+    telas = [measure(app_dir, PROBE_RENDER) for _ in range(repeticoes)]
+    return {
+        "importacao": statistics.median(importacoes),
+        "primeira_tela": statistics.median(t["primeira_tela"] for t in telas),
+        "modulos": telas[-1]["modulos"],
+    }
+
+
+def export_revision(revisao: str, destino: Path):
+    """ Extrai os arquivos da revisão do git no diretório de destino. """
+    arquivo = subprocess.run(["git", "archive", revisao], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(arquivo)) as tar:
+        tar.extractall(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e de primeira tela do aplicativo.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="processos medidos por versão (vale a mediana)")
+    parser.add_argument("--comparar", metavar="REVISAO", help="revisão do git a medir também (ex.: HEAD~1)")
+    args = parser.parse_args()
+
+    print(f"{'Versão':<16}{'Importação (s)':>16}{'Primeira tela (s)':>19}  Dependências pesadas carregadas")
+    versoes = [("atual", ROOT)]
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.comparar:
+            export_revision(args.comparar, Path(tmp))
+            versoes.append((args.comparar, Path(tmp)))
+        for nome, app_dir in versoes:
+            r = bench_startup(app_dir, args.repeticoes)
+            print(f"{nome:<16}{r['importacao']:>16.3f}{r['primeira_tela']:>19.3f}  {', '.join(r['modulos']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
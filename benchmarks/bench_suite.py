@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Suíte de benchmarks com diários sintéticos e saídas de referência
+# ======================================
+"""
+Gera diários sintéticos (benchmarks/synthetic.py) de cada tipo, tamanho e
+densidade pedidos, executa o processador completo de cada um e registra a
+vazão (páginas/s) e a memória. Cada cenário roda num processo novo, para que
+a memória medida seja só a dele.
+
+Os cenários de GOLDEN_CASES têm a saída gravada em benchmarks/golden/: a suíte
+compara a extração com esses arquivos e termina com código 1 se alguma diferir.
+Depois de uma mudança intencional nas regras, regrave-os com --atualizar-golden
+e revise o diff dos arquivos antes de publicar.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --paginas 10 100 1000 --densidade alta --tipos Legislativo
+    python -m benchmarks.bench_suite --json resultados.json
+    python -m benchmarks.bench_suite --atualizar-golden
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+# Cenários com saída de referência: pequenos, para que a conferência seja rápida
+GOLDEN_CASES = [
+    (tipo, paginas, densidade, 0)
+    for tipo in ("Legislativo", "Administrativo", "Executivo")
+    for paginas, densidade in ((10, "baixa"), (10, "normal"), (10, "alta"), (50, "normal"))
+]
+
+
+def golden_path(tipo: str, paginas: int, densidade: str, seed: int) -> Path:
+    return GOLDEN_DIR / f"{tipo}-{paginas}p-{densidade}-s{seed}.json"
+
+
+def to_jsonable(dados):
+    """ Converte os dados extraídos (linhas por planilha ou linhas) numa estrutura JSON estável. """
+    if dados is None:
+        return None
+    if isinstance(dados, dict):
+        return {nome: to_jsonable(linhas) for nome, linhas in dados.items()}
+    return [[str(valor) for valor in linha] for linha in dados]
+
+
+def _rows(saida) -> list:
+    """ Linhas de uma saída serializada, prefixadas pelo nome da planilha no Legislativo. """
+    if saida is None:
+        return []
+    if isinstance(saida, dict):
+        return [(nome, *linha) for nome, planilha in saida.items() for linha in _rows(planilha)]
+    return [tuple(linha) for linha in saida]
+
+
+def describe_diff(esperado, obtido) -> str:
+    """ Resume quantas linhas da referência sumiram e quantas linhas novas apareceram. """
+    esperadas, obtidas = Counter(_rows(esperado)), Counter(_rows(obtido))
+    faltando = sum((esperadas - obtidas).values())
+    sobrando = sum((obtidas - esperadas).values())
+    return (f"{sum(esperadas.values())} linhas esperadas, {sum(obtidas.values())} obtidas "
+            f"({faltando} ausentes, {sobrando} novas)")
+
+
+def peak_rss_mb() -> float:
+    """ Memória máxima (RSS) usada pelo processo até agora, em MB; None se indisponível. """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def run_case(tipo: str, paginas: int, densidade: str, seed: int, repeticoes: int, workers: int) -> dict:
+    """ Executado num processo novo: gera o diário, processa-o `repeticoes` vezes e mede tempo e memória. """
+    import pdf_text
+    from app import extract_diary
+    from benchmarks.synthetic import GENERATORS
+
+    pdf_text.EXTRACTION_WORKERS = workers
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(GENERATORS[tipo](paginas, densidade, seed))
+    try:
+        memoria_base = peak_rss_mb()
+        melhor = float("inf")
+        dados = None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            dados = extract_diary(tmp.name, tipo)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        memoria_pico = peak_rss_mb()
+    finally:
+        os.unlink(tmp.name)
+    return {
+        "tipo": tipo, "paginas": paginas, "densidade": densidade, "seed": seed,
+        "segundos": melhor, "paginas_por_segundo": paginas / melhor if melhor else None,
+        "memoria_pico_mb": memoria_pico,
+        "memoria_extracao_mb": memoria_pico - memoria_base if memoria_pico is not None else None,
+        "saida": to_jsonable(dados),
+    }
+
+
+def run_suite(casos: list, repeticoes: int, workers: int) -> list:
+    """ Executa cada cenário num processo "spawn" próprio, um de cada vez, para não disputarem CPU. """
+    context = multiprocessing.get_context("spawn")
+    resultados = []
+    for caso in casos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            resultados.append(pool.submit(run_case, *caso, repeticoes, workers).result())
+    return resultados
+
+
+def check_golden(resultado: dict, atualizar: bool = False) -> str:
+    """ Compara a saída com a referência do cenário (ou a regrava). Retorna "ok", "DIFERENTE" ou "-". """
+    caminho = golden_path(resultado["tipo"], resultado["paginas"], resultado["densidade"], resultado["seed"])
+    if atualizar:
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_text(json.dumps(resultado["saida"], ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+        return "gravado"
+    if not caminho.exists():
+        return "-"
+    esperado = json.loads(caminho.read_text(encoding="utf-8"))
+    if esperado == resultado["saida"]:
+        return "ok"
+    resultado["diferenca"] = describe_diff(esperado, resultado["saida"])
+    return "DIFERENTE"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão, memória e saídas de referência dos processadores.")
+    parser.add_argument("--tipos", nargs="+", default=["Legislativo", "Administrativo", "Executivo"],
+                        choices=["Legislativo", "Administrativo", "Executivo"])
+    parser.add_argument("--paginas", type=int, nargs="+", help="tamanhos dos diários (padrão: cenários golden)")
+    parser.add_argument("--densidade", nargs="+", default=["normal"], choices=["baixa", "normal", "alta"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por cenário (vale o melhor tempo)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processos de extração de texto (pdf_text.EXTRACTION_WORKERS); 1 dá tempos comparáveis")
+    parser.add_argument("--json", type=Path, help="grava as medições (sem as saídas) neste arquivo")
+    parser.add_argument("--atualizar-golden", action="store_true", help="regrava as saídas de referência")
+    args = parser.parse_args()
+
+    if args.paginas:
+        casos = [(tipo, paginas, densidade, args.seed)
+                 for tipo in args.tipos for paginas in args.paginas for densidade in args.densidade]
+    else:
+        casos = [caso for caso in GOLDEN_CASES if caso[0] in args.tipos]
+
+    print(f"{'Tipo':<16}{'Páginas':>8}  {'Densidade':<10}{'s':>9}{'Páginas/s':>11}"
+          f"{'RSS máx. (MB)':>15}{'Extração (MB)':>15}  Golden")
+    resultados = run_suite(casos, args.repeticoes, args.workers)
+    diferentes = 0
+    for r in resultados:
+        golden = check_golden(r, args.atualizar_golden)
+        diferentes += golden == "DIFERENTE"
+        print(f"{r['tipo']:<16}{r['paginas']:>8}  {r['densidade']:<10}{r['segundos']:>9.3f}"
+              f"{r['paginas_por_segundo']:>11.1f}{r['memoria_pico_mb'] or 0:>15.1f}"
+              f"{r['memoria_extracao_mb'] or 0:>15.1f}  {golden}")
+        if "diferenca" in r:
+            print(f"    {r['diferenca']}")
+
+    if args.json:
+        medicoes = [{k: v for k, v in r.items() if k != "saida"} for r in resultados]
+        args.json.write_text(json.dumps(medicoes, ensure_ascii=False, indent=2), encoding="utf-8")
+    if diferentes:
+        print(f"\n{diferentes} cenário(s) com saída diferente da referência em {GOLDEN_DIR}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Diários sintéticos para os benchmarks
+# ======================================
+"""
+Gera diários sintéticos (texto e PDF) dos três tipos, com número de páginas e
+densidade de atos configuráveis. A geração é determinística: a mesma semente,
+o mesmo tamanho e a mesma densidade produzem sempre o mesmo diário, o que
+permite comparar as saídas com os arquivos de benchmarks/golden/.
+
+Os textos imitam a estrutura que os processadores esperam (cabeçalhos de
+requerimentos, bloco de proposições não recebidas, Tramitação de Proposições,
+seção "Leis e Decretos" em duas colunas etc.), entremeados de texto corrido.
+"""
+
+import random
+
+import fitz # PyMuPDF
+
+# Linhas por página dos PDFs de texto corrido (Legislativo e Administrativo)
+LINES_PER_PAGE = 55
+
+# Densidades pré-definidas: probabilidade de cada bloco ser um ato do tipo indicado
+# (requerimentos e emendas) ou quantidade de atos por coluna/página (decretos e normas)
+DENSIDADES = {
+    "baixa": {"requerimentos": 0.10, "emendas": 0.10, "decretos": 1, "normas": 1},
+    "normal": {"requerimentos": 0.30, "emendas": 0.30, "decretos": 3, "normas": 3},
+    "alta": {"requerimentos": 0.60, "emendas": 0.60, "decretos": 6, "normas": 8},
+}
+
+MESES = ["JANEIRO", "FEVEREIRO", "MARÇO", "ABRIL", "MAIO", "JUNHO", "JULHO",
+         "AGOSTO", "SETEMBRO", "OUTUBRO", "NOVEMBRO", "DEZEMBRO"]
+
+TEXTO_CORRIDO = [
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt.",
+    "Texto corrido com números 12 e datas 3/2024 que não correspondem a nenhuma regra.",
+    "A reunião foi encerrada às 16 horas, convocando-se os deputados para a próxima sessão.",
+    "Com a palavra, o deputado manifestou-se sobre a matéria em discussão no Plenário.",
+]
+
+
+def _numero(r: random.Random, lo: int = 1, hi: int = 20000) -> str:
+    """ Número de ato, às vezes com ponto de milhar (12.345), como aparece nos diários. """
+    n = r.randint(lo, hi)
+    return f"{n // 1000}.{n % 1000:03d}" if n >= 1000 and r.random() < 0.5 else str(n)
+
+
+def _requerimento(r: random.Random, ano: int) -> list:
+    """ Um requerimento num dos formatos reconhecidos por LegislativeProcessor.process_requerimentos. """
+    tipo = r.randrange(7)
+    if tipo == 0:
+        return ["RECEBIMENTO DE PROPOSIÇÃO", f"A Presidência recebeu: REQUERIMENTO Nº {_numero(r)}/{ano}"]
+    if tipo == 1:
+        return [f"É recebido pela presidência, submetido a votação e aprovado o Requerimento nº {_numero(r)}/{ano}."]
+    if tipo == 2:
+        return [f"É recebido pela presidência, para posterior apreciação, o Requerimento nº {_numero(r)}/{ano}."]
+    if tipo == 3:
+        return [f"Ofício nº {r.randint(1, 99)}/{ano}, da Secretaria, relativas ao Requerimento nº {_numero(r)}/{ano}."]
+    if tipo == 4:
+        return [f"da Comissão de Saúde, informando que, na reunião, foi aprovado o Requerimento nº {_numero(r)}/{ano}."]
+    n = r.randint(10000, 30000)
+    assunto = r.choice(["em que requer seja formulado voto de congratulações", "manifestação de pesar",
+                        "moção de aplauso", "manifestação de repúdio", "providências"])
+    return [f"{r.choice(['Nº', 'nº'])} {n // 1000}.{n % 1000:03d}/{ano}, do deputado Fulano, {assunto}."]
+
+
+def _corpo_legislativo(r: random.Random, ano: int, densidade: dict) -> list:
+    """ Um bloco das seções iniciais: norma, proposição, requerimento ou texto corrido. """
+    if r.random() < densidade["requerimentos"]:
+        return _requerimento(r, ano)
+    tipo = r.randrange(8)
+    if tipo == 0:
+        norma = r.choice(["LEI", "LEI COMPLEMENTAR", "RESOLUÇÃO", "EMENDA À CONSTITUIÇÃO", "DELIBERAÇÃO DA MESA"])
+        return [f"{norma} Nº {_numero(r, 1, 30000)}, DE {r.randint(1, 28)} DE {r.choice(MESES)} DE {ano}"]
+    if tipo == 1:
+        proposicao = r.choice(["PROJETO DE LEI", "PROJETO DE LEI COMPLEMENTAR", "INDICAÇÃO",
+                               "PROJETO DE RESOLUÇÃO", "MENSAGEM", "VETO"])
+        ementa = r.choice(["Dispõe sobre a matéria.", "Declara de utilidade pública a Associação X.",
+                           "(Redação do Vencido)", "Dispõe sobre a criação do programa."])
+        return [f"{r.choice(['', '- '])}{proposicao} Nº {_numero(r, 1, 3000)}/{ano}", ementa]
+    return [r.choice(TEXTO_CORRIDO)]
+
+
+def _parecer(r: random.Random, ano: int, densidade: dict) -> list:
+    """ Um bloco da Tramitação de Proposições: conclusão, emenda, substitutivo ou texto corrido. """
+    if r.random() < densidade["emendas"]:
+        tipo = r.randrange(4)
+        if tipo == 0:
+            return [f"EMENDA Nº {r.randint(1, 20)}", "Acrescente-se onde couber o seguinte artigo."]
+        if tipo == 1:
+            return [f"SUBSTITUTIVO Nº {r.randint(1, 3)}", "Dê-se ao projeto a seguinte redação."]
+        if tipo == 2:
+            return [f"EMENDAS AO PROJETO DE LEI Nº {_numero(r, 1, 3000)}/{ano}"]
+        complementar = r.choice(["", " COMPLEMENTAR"])
+        return [f"EMENDA Nº {r.randint(1, 9)} AO PROJETO DE LEI{complementar} Nº {_numero(r, 1, 3000)}/{ano}"]
+    if r.random() < 0.3:
+        sigla = r.choice(["Projeto de Lei", "PL", "Projeto de Resolução", "PEC", "Requerimento"])
+        return ["Conclusão", f"Em face do exposto, opinamos pela aprovação do {sigla} nº {_numero(r, 1, 3000)}/{ano}."]
+    return [r.choice(TEXTO_CORRIDO)]
+
+
+def legislativo_text(paginas: int, densidade: str = "normal", seed: int = 0) -> str:
+    """ Texto de um Diário do Legislativo com `paginas` páginas de LINES_PER_PAGE linhas: 85% de
+    atas e correspondência, o bloco de proposições não recebidas e, ao final, a Tramitação. """
+    r = random.Random(seed)
+    dens = DENSIDADES[densidade]
+    total = paginas * LINES_PER_PAGE
+    linhas = ["Diário do Legislativo", "ATAS"]
+    while len(linhas) < total * 0.85:
+        linhas.extend(_corpo_legislativo(r, r.choice([2024, 2025]), dens))
+    linhas.append("PROPOSIÇÕES NÃO RECEBIDAS")
+    linhas.extend(f"REQUERIMENTO Nº {r.randint(10, 30)}.{r.randint(100, 999)}/2025" for _ in range(3))
+    linhas.append("TRAMITAÇÃO DE PROPOSIÇÕES")
+    while len(linhas) < total:
+        linhas.extend(_parecer(r, r.choice([2024, 2025]), dens))
+    return "\n".join(linhas[:total]) + "\n"
+
+
+def pages_pdf(paginas: list) -> bytes:
+    """ PDF com uma página para cada lista de linhas, em fonte pequena para caber na largura. """
+    doc = fitz.open()
+    for linhas in paginas:
+        page = doc.new_page()
+        page.insert_text((30, 40), "\n".join(linhas), fontsize=7)
+    # Sem datas nem identificador novo, o mesmo diário gera sempre os mesmos bytes
+    doc.set_metadata({})
+    data = doc.tobytes(no_new_id=True)
+    doc.close()
+    return data
+
+
+def text_pdf(text: str) -> bytes:
+    """ PDF com LINES_PER_PAGE linhas do texto por página. """
+    linhas = text.splitlines()
+    return pages_pdf([linhas[i:i + LINES_PER_PAGE] for i in range(0, len(linhas), LINES_PER_PAGE)])
+
+
+def legislativo_pdf(paginas: int, densidade: str = "normal", seed: int = 0) -> bytes:
+    return text_pdf(legislativo_text(paginas, densidade, seed))
+
+
+def administrativo_pdf(paginas: int, densidade: str = "normal", seed: int = 0) -> bytes:
+    """ Diário Administrativo: cada página traz DENSIDADES[...]["normas"] atos, em média, e texto corrido. """
+    r = random.Random(seed)
+    normas = DENSIDADES[densidade]["normas"]
+    conteudo = []
+    for p in range(paginas):
+        atos = [
+            f"{r.choice(['DELIBERAÇÃO DA MESA', 'PORTARIA DGE', 'ORDEM DE SERVIÇO PRES/PSEC'])} "
+            f"Nº {_numero(r, 1, 9999)}/{r.choice([2024, 2025])}"
+            for _ in range(r.randint(0, 2 * normas))
+        ]
+        if r.random() < 0.3:
+            atos.append("DECISÃO DA 1ª-SECRETARIA")
+        linhas = [r.choice(TEXTO_CORRIDO) for _ in range(LINES_PER_PAGE - len(atos))]
+        for ato in atos:
+            linhas.insert(r.randrange(len(linhas) + 1), ato)
+        if p == 0:
+            linhas[0] = "Diário Administrativo"
+        conteudo.append(linhas)
+    return pages_pdf(conteudo)
+
+
+def _coluna_executivo(r: random.Random, decretos: int) -> list:
+    linhas = []
+    for _ in range(r.randint(max(1, decretos // 2), decretos)):
+        tipo = r.choice(["DECRETO", "DECRETO", "LEI", "DECRETO NE", "LEI COMPLEMENTAR"])
+        linhas += [
+            f"{tipo} Nº {r.randint(40000, 49999)}, DE {r.randint(1, 28)} DE {r.choice(MESES)} DE 2025",
+            f"Altera o Decreto nº {r.randint(40, 47)}.{r.randint(100, 999)}, de 5 de janeiro de 2024, que dispõe",
+            "sobre a matéria. Art. 1º O art. 2º passa a vigorar com a seguinte redação.",
+            f"Art. 2º Fica revogada a Lei nº {r.randint(10, 25)}.{r.randint(100, 999)}, de 2 de maio de 2010.",
+            r.choice(TEXTO_CORRIDO)[:70],
+        ]
+    return linhas
+
+
+def executivo_pdf(paginas: int, densidade: str = "normal", seed: int = 0) -> bytes:
+    """ Diário do Executivo em duas colunas: sumário na primeira página (com os dois títulos),
+    "Leis e Decretos" na terceira e "Atos do Governador" a 80% do diário. """
+    r = random.Random(seed)
+    decretos = DENSIDADES[densidade]["decretos"]
+    paginas = max(paginas, 4)
+    atos = max(3, int(paginas * 0.8))
+    doc = fitz.open()
+    for p in range(paginas):
+        page = doc.new_page()
+        meio = page.rect.width / 2
+        if p == 0:
+            page.insert_text((40, 40), "Diário do Executivo\nSumário\nLeis e Decretos ..... 3\n"
+                             f"Atos do Governador ..... {atos + 1}", fontsize=9)
+            continue
+        if p == 2:
+            page.insert_text((meio - 60, 45), "LEIS E DECRETOS", fontsize=12)
+        if p == atos:
+            page.insert_text((meio - 70, 45), "ATOS DO GOVERNADOR", fontsize=12)
+        for coluna in range(2):
+            page.insert_text((20 + coluna * meio, 70), "\n".join(_coluna_executivo(r, decretos)), fontsize=5.5)
+    # Sem datas nem identificador novo, o mesmo diário gera sempre os mesmos bytes
+    doc.set_metadata({})
+    data = doc.tobytes(no_new_id=True)
+    doc.close()
+    return data
+
+
+GENERATORS = {
+    "Legislativo": legislativo_pdf,
+    "Administrativo": administrativo_pdf,
+    "Executivo": executivo_pdf,
+}
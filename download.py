@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Download de PDFs a partir de links
+# ======================================
+# Os links são baixados em paralelo numa única sessão HTTP (conexões reaproveitadas),
+# em blocos gravados num arquivo temporário que só vai para o disco acima de
+# SPOOL_MAX_BYTES. Falhas de rede são repetidas com espera crescente e, quando o
+# servidor aceita Range, o download continua do ponto em que parou. RangeFile lê um PDF
+# remoto sob demanda, baixando só os trechos que o leitor de PDF efetivamente acessa.
+
+# --- Importações ---
+import io
+import os
+import re
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Configuração ---
+DOWNLOAD_WORKERS = int(os.environ.get("GIL_DOWNLOAD_WORKERS", "4"))
+DOWNLOAD_RETRIES = int(os.environ.get("GIL_DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_TIMEOUT = 30 # segundos para conectar e entre blocos recebidos
+BACKOFF_SECONDS = 1.0 # espera antes da primeira repetição; dobra a cada tentativa
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+RANGE_BLOCK_SIZE = 64 * 1024 # granularidade das leituras remotas; blocos vizinhos vão na mesma requisição
+
+# Respostas que podem dar certo numa nova tentativa; os demais erros HTTP são definitivos
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+# --- Exceções ---
+class DownloadError(Exception):
+    """ Falha definitiva ao baixar um link (status HTTP inesperado ou tentativas esgotadas). """
+    def __init__(self, url: str, message: str, status: int = None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+class RangeNotSupported(DownloadError):
+    """ O servidor respondeu a uma requisição Range com o arquivo inteiro. """
+
+class _IncompleteDownload(Exception):
+    """ A conexão terminou antes de o corpo da resposta chegar inteiro. """
+
+# --- Classes ---
+class DownloadedPDF:
+    """ PDF baixado, mantido num arquivo temporário (memória ou disco) até ser lido. """
+    def __init__(self, url: str, file, size: int, content_type: str):
+        self.url = url
+        self.file = file
+        self.size = size
+        self.content_type = content_type
+
+    @property
+    def file_name(self) -> str:
+        return unquote(os.path.basename(urlparse(self.url).path)) or "documento.pdf"
+
+    @property
+    def looks_like_pdf(self) -> bool:
+        return "pdf" in self.content_type.lower() or self.url.lower().endswith(".pdf")
+
+    def read(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RangeFile(io.RawIOBase):
+    """ Arquivo remoto somente leitura: cada leitura baixa, por requisições Range, apenas os
+    blocos ainda não recebidos. Levanta RangeNotSupported se o servidor não aceitar Range. """
+    def __init__(self, url: str, session: requests.Session = None, block_size: int = RANGE_BLOCK_SIZE):
+        super().__init__()
+        self.url = url
+        self.session = session or make_session(1)
+        self.block_size = block_size
+        self.bytes_fetched = 0
+        self.content_type = ""
+        self.size = None
+        self._blocks = {}
+        self._pos = 0
+        # O primeiro bloco traz o tamanho total (Content-Range) e o cabeçalho do PDF
+        self._load(0, 0)
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        """ Baixa os bytes [start, end], com as mesmas repetições de download_pdf. """
+        ultimo_erro = None
+        for tentativa in range(DOWNLOAD_RETRIES + 1):
+            if tentativa:
+                time.sleep(BACKOFF_SECONDS * 2 ** (tentativa - 1))
+            try:
+                headers = {"Range": f"bytes={start}-{end}"}
+                with self.session.get(self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as resp:
+                    if resp.status_code == 200:
+                        raise RangeNotSupported(self.url, "O servidor não aceita requisições Range.")
+                    if resp.status_code != 206:
+                        if resp.status_code in RETRY_STATUS:
+                            ultimo_erro = f"status {resp.status_code}"
+                            continue
+                        raise DownloadError(self.url, f"Falha ao baixar (status {resp.status_code}).", resp.status_code)
+                    # Lê só o intervalo pedido, mesmo que o servidor envie além do fim
+                    pedido = end - start + 1
+                    data = bytearray()
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        data += chunk
+                        if len(data) >= pedido:
+                            break
+                    data = bytes(data[:pedido])
+                    total = re.search(r"/(\d+)", resp.headers.get("Content-Range", ""))
+                    if self.size is None:
+                        if not total:
+                            raise RangeNotSupported(self.url, "O servidor não informou o tamanho do arquivo (Content-Range).")
+                        self.size = int(total.group(1))
+                        self.content_type = resp.headers.get("Content-Type", "")
+                    if len(data) < min(end, self.size - 1) - start + 1:
+                        raise _IncompleteDownload(f"recebidos {len(data)} bytes de {start}-{end}")
+                    self.bytes_fetched += len(data)
+                    return data
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    _IncompleteDownload) as e:
+                ultimo_erro = e
+            except requests.RequestException as e:
+                raise DownloadError(self.url, f"Falha ao baixar: {e}") from e
+        raise DownloadError(self.url, f"Falha ao baixar após {DOWNLOAD_RETRIES + 1} tentativas: {ultimo_erro}")
+
+    def _load(self, first: int, last: int):
+        """ Garante em memória os blocos first..last, agrupando os que faltam em intervalos contíguos. """
+        faltando = [i for i in range(first, last + 1) if i not in self._blocks]
+        while faltando:
+            inicio = fim = faltando.pop(0)
+            while faltando and faltando[0] == fim + 1:
+                fim = faltando.pop(0)
+            data = self._fetch(inicio * self.block_size, (fim + 1) * self.block_size - 1)
+            for i in range(inicio, fim + 1):
+                offset = (i - inicio) * self.block_size
+                self._blocks[i] = data[offset:offset + self.block_size]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        fim = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        if self._pos >= fim:
+            return b""
+        first, last = self._pos // self.block_size, (fim - 1) // self.block_size
+        self._load(first, last)
+        inicio = self._pos - first * self.block_size
+        if first == last:
+            data = self._blocks[first][inicio:inicio + fim - self._pos]
+        else:
+            data = b"".join(self._blocks[i] for i in range(first, last + 1))[inicio:inicio + fim - self._pos]
+        self._pos = fim
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+# --- Funções ---
+def make_session(pool_size: int = DOWNLOAD_WORKERS) -> requests.Session:
+    """ Sessão com um pool de conexões por host do tamanho do número de downloads simultâneos. """
+    session = requests.Session()
+    # Sem compressão no transporte, os bytes gravados correspondem às posições pedidas no Range
+    session.headers["Accept-Encoding"] = "identity"
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _range_start(resp: requests.Response) -> int:
+    """ Posição inicial do Content-Range de uma resposta 206, ou None se ausente ou inválido. """
+    m = re.match(r"bytes\s+(\d+)-", resp.headers.get("Content-Range", ""))
+    return int(m.group(1)) if m else None
+
+def download_pdf(url: str, session: requests.Session = None, retries: int = DOWNLOAD_RETRIES) -> DownloadedPDF:
+    """ Baixa um link em blocos, repetindo falhas de rede e retomando com Range quando possível. """
+    session = session or make_session(1)
+    destino = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    recebidos = 0
+    content_type = ""
+    ultimo_erro = None
+    for tentativa in range(retries + 1):
+        if tentativa:
+            time.sleep(BACKOFF_SECONDS * 2 ** (tentativa - 1))
+        headers = {"Range": f"bytes={recebidos}-"} if recebidos else {}
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as resp:
+                if resp.status_code == 200 and recebidos:
+                    # O servidor ignorou o Range: recomeça do início
+                    destino.seek(0)
+                    destino.truncate()
+                    recebidos = 0
+                elif resp.status_code == 206 and _range_start(resp) != recebidos:
+                    # O trecho não começa onde o arquivo parou: descarta o recebido e recomeça do início
+                    destino.seek(0)
+                    destino.truncate()
+                    recebidos = 0
+                    ultimo_erro = f"Content-Range fora da posição pedida ({resp.headers.get('Content-Range')})"
+                    continue
+                elif resp.status_code not in (200, 206):
+                    if resp.status_code in RETRY_STATUS:
+                        ultimo_erro = f"status {resp.status_code}"
+                        continue
+                    destino.close()
+                    raise DownloadError(url, f"Falha ao baixar (status {resp.status_code}).", resp.status_code)
+
+                content_type = resp.headers.get("Content-Type", content_type)
+                esperado = resp.headers.get("Content-Length")
+                inicio = recebidos
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    destino.write(chunk)
+                    recebidos += len(chunk)
+                if esperado is not None and recebidos - inicio < int(esperado):
+                    raise _IncompleteDownload(f"recebidos {recebidos - inicio} de {esperado} bytes")
+            return DownloadedPDF(url, destino, recebidos, content_type)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                _IncompleteDownload) as e:
+            ultimo_erro = e
+        except requests.RequestException as e:
+            # Link inválido, esquema não suportado, redirecionamentos em excesso: não adianta repetir
+            destino.close()
+            raise DownloadError(url, f"Falha ao baixar: {e}") from e
+    destino.close()
+    raise DownloadError(url, f"Falha ao baixar após {retries + 1} tentativas: {ultimo_erro}")
+
+def download_many(urls: list, workers: int = None, fetch=download_pdf):
+    """ Baixa os links em paralelo numa sessão compartilhada e entrega (url, DownloadedPDF, erro)
+    de cada um assim que termina, para que o processamento comece sem esperar os demais.
+    fetch(url, session) define como cada link é obtido (por padrão, o arquivo inteiro). Qualquer
+    falha de um link é entregue como o seu erro, sem interromper os demais. """
+    workers = workers or DOWNLOAD_WORKERS
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, url, session): url for url in urls}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Extrações em segundo plano (jobs)
+# ======================================
+# O aplicativo entrega cada PDF a um pool de threads e acompanha o job pelo seu ID: a
+# sessão do Streamlit guarda os IDs, e as reexecuções do script (cliques, atualização do
+# progresso) apenas consultam o estado do job, sem repetir nem interromper a extração.
+# O progresso vem do RunTimer do job (etapa em andamento, páginas e colunas já lidas).
+# Jobs com a mesma chave (mesmo PDF, tipo de diário e formato) são compartilhados entre
+# sessões enquanto estiverem em andamento ou retidos após o término.
+
+# --- Importações ---
+import os
+import time
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import timing
+
+# --- Configuração ---
+# Extrações simultâneas (GIL_JOB_WORKERS); as demais aguardam na fila
+JOB_WORKERS = int(os.environ.get("GIL_JOB_WORKERS", "4"))
+# Tempo (em segundos) em que um job concluído continua disponível para as sessões (GIL_JOB_RETENTION)
+JOB_RETENTION = int(os.environ.get("GIL_JOB_RETENTION", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED = "na fila", "em andamento", "concluído", "erro"
+
+_current_job = contextvars.ContextVar("gil_job", default=None)
+
+# --- Classes ---
+class Job:
+    """ Uma extração submetida ao JobManager: estado, progresso, avisos, resultados parciais e resultado. """
+    def __init__(self, key: str, label: str = "", total_pages: int = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.label = label
+        self.total_pages = total_pages
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.messages = []
+        self.partial = {}
+        self.timer = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._fraction = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def seconds(self) -> float:
+        """ Duração da execução (até agora, se ainda em andamento). """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def progress(self) -> dict:
+        """ Etapa em andamento, páginas/colunas lidas e a fração concluída (que nunca diminui). """
+        progresso = self.timer.progress() if self.timer is not None else {"etapa": None}
+        if self.status == DONE:
+            self._fraction = 1.0
+        elif self.total_pages and progresso.get("paginas") is not None:
+            self._fraction = max(self._fraction, min(progresso["paginas"] / self.total_pages, 1.0))
+        return {**progresso, "fracao": self._fraction}
+
+class JobManager:
+    """ Pool de threads que executa os jobs e os mantém acessíveis pelo ID até JOB_RETENTION após o término. """
+    def __init__(self, workers: int = JOB_WORKERS, retention: float = JOB_RETENTION):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gil-job")
+        self.retention = retention
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(self, key: str, fn, *args, label: str = "", total_pages: int = None, cleanup=None) -> Job:
+        """ Agenda fn(*args) num job. Se já houver um job com a mesma chave em andamento ou concluído com
+        sucesso, ele é devolvido e fn não é executada; cleanup() é chamada em ambos os casos, ao final. """
+        with self._lock:
+            self._purge()
+            for job in self._jobs.values():
+                if job.key == key and job.status != FAILED:
+                    if cleanup is not None:
+                        cleanup()
+                    return job
+            job = Job(key, label, total_pages)
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn, args, cleanup)
+        return job
+
+    def add_result(self, key: str, result, label: str = "") -> Job:
+        """ Registra como concluído um resultado já disponível (ex.: vindo do cache), sem executar nada. """
+        job = Job(key, label)
+        job.status = DONE
+        job.result = result
+        return self._add_finished(job)
+
+    def add_failure(self, key: str, error: Exception, label: str = "") -> Job:
+        """ Registra como falho o que nem chegou a ser agendado (ex.: um link cujo download falhou), para
+        que as reexecuções da página exibam o erro guardado em vez de repetir a tentativa. """
+        job = Job(key, label)
+        job.status = FAILED
+        job.error = error
+        return self._add_finished(job)
+
+    def discard(self, job_id: str):
+        """ Esquece o job (ex.: para tentar de novo um item que falhou). """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _add_finished(self, job: Job) -> Job:
+        job.started = job.finished = time.time()
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        return job
+
+    def _run(self, job: Job, fn, args, cleanup):
+        token = _current_job.set(job)
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            # Com GIL_PROFILE_DIR definido, o job grava o perfil e os tempos por etapa, como no modo síncrono
+            with timing.run(job.label) as timer:
+                job.timer = timer
+                job.result = fn(*args)
+            job.status = DONE
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+            _current_job.reset(token)
+            if cleanup is not None:
+                cleanup()
+
+    def _purge(self):
+        """ Remove os jobs encerrados há mais de `retention` segundos (chamada com o lock adquirido). """
+        limite = time.time() - self.retention
+        for job_id in [i for i, job in self._jobs.items() if job.finished is not None and job.finished < limite]:
+            del self._jobs[job_id]
+
+# --- Funções ---
+def notify(kind: str, message: str):
+    """ Aviso de um processador ("error", "warning"...): guardado no job corrente, para a sessão exibi-lo,
+    ou exibido direto pelo Streamlit quando a extração roda fora de um job. """
+    job = _current_job.get()
+    if job is not None:
+        job.messages.append((kind, message))
+        return
+    import streamlit as st
+    getattr(st, kind)(message)
+
+def publish(name: str, value):
+    """ Resultado parcial do job corrente (ex.: uma planilha pronta), exibido antes do término; fora de um job, nada faz. """
+    job = _current_job.get()
+    if job is not None:
+        job.partial[name] = value
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Etapas do Diário do Legislativo nos processos auxiliares
+# ======================================
+# Modo concorrente de LegislativeProcessor.iter_sheets (app.py): cada processo do pool recebe o
+# texto do diário uma única vez, na inicialização, e executa as etapas que lhe forem entregues.
+# Módulo separado de app.py pelo mesmo motivo de pdf_text: o Streamlit executa app.py como
+# __main__, e os processos "spawn" precisam importar as funções que recebem.
+
+_processor = None
+
+def init_worker(text: str, time_budget: float):
+    """ Inicializador do pool: cria o processador do processo sobre o texto recebido. """
+    global _processor
+    from app import LegislativeProcessor
+    _processor = LegislativeProcessor(text, time_budget)
+
+def run_step(step: str) -> tuple:
+    """ Executa uma etapa ("normas", "proposicoes"...) e retorna (linhas, segundos, tempos por regra, tempos por seção). """
+    return _processor.run_step(step)
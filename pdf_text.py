@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Extração de texto de PDFs, página a página
+# ======================================
+# Módulo separado de app.py para que as funções executadas nos processos
+# auxiliares possam ser importadas por eles (o Streamlit executa app.py como __main__).
+# Os PDFs são abertos a partir do disco sempre que possível e o texto das páginas é
+# entregue página a página, para que nenhum caminho mantenha o diário inteiro em memória.
+
+# --- Importações ---
+# pypdf, PyMuPDF e pdfplumber são importados só pelo backend que os usa (ver app.py)
+from __future__ import annotations
+
+import io
+import os
+import math
+import hashlib
+import shutil
+import sqlite3
+import tempfile
+import multiprocessing
+from typing import TYPE_CHECKING
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import timing
+
+if TYPE_CHECKING:
+    import pypdf
+
+# --- Configuração ---
+# Processos usados na extração (GIL_EXTRACTION_WORKERS); 1 desativa o paralelismo
+EXTRACTION_WORKERS = int(os.environ.get("GIL_EXTRACTION_WORKERS", os.cpu_count() or 1))
+# Abaixo deste número de páginas, iniciar processos custa mais do que extrair em série
+PARALLEL_MIN_PAGES = int(os.environ.get("GIL_PARALLEL_MIN_PAGES", "40"))
+# Cada processo recebe vários lotes menores, para equilibrar páginas mais pesadas
+CHUNKS_PER_WORKER = 4
+# Diretório dos PDFs temporários e dos arquivos de páginas (GIL_TMP_DIR); padrão do sistema se vazio
+TMP_DIR = os.environ.get("GIL_TMP_DIR") or None
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# --- Origem do PDF ---
+# As funções deste módulo aceitam o caminho do PDF (preferível: é lido do disco sob demanda) ou seus bytes.
+def _open_source(source):
+    """ Aceita o caminho do PDF ou seus bytes. """
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+def open_pdf(source):
+    """ Abre o PDF com o PyMuPDF, que lê do disco apenas o que cada página usa. """
+    import fitz # PyMuPDF
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+@contextmanager
+def spooled_pdf(fileobj):
+    """ Copia um arquivo aberto (upload, download) em blocos para um PDF temporário e entrega o caminho. """
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", dir=TMP_DIR, delete=False) as tmp:
+        shutil.copyfileobj(fileobj, tmp, SPOOL_CHUNK_SIZE)
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+def keep_pdf(path: str) -> str:
+    """ Dá ao PDF temporário um segundo nome (link no mesmo diretório, ou cópia se o sistema não
+    permitir), que continua existindo quando spooled_pdf remove o original. Quem chama o remove. """
+    fd, kept = tempfile.mkstemp(suffix=".pdf", dir=TMP_DIR)
+    os.close(fd)
+    os.unlink(kept)
+    try:
+        os.link(path, kept)
+    except OSError:
+        shutil.copyfile(path, kept)
+    return kept
+
+def pdf_hash(source) -> str:
+    """ SHA-256 do conteúdo do PDF (caminho ou bytes), lido em blocos: identifica a edição independentemente do nome. """
+    sha = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        sha.update(source)
+    else:
+        with open(source, "rb") as fh:
+            for bloco in iter(lambda: fh.read(SPOOL_CHUNK_SIZE), b""):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+@contextmanager
+def _pdf_path(source):
+    """ Entrega um caminho para o PDF, gravando-o num temporário só se ele estiver em memória. """
+    if isinstance(source, (bytes, bytearray)):
+        with spooled_pdf(io.BytesIO(source)) as path:
+            yield path
+    else:
+        yield str(source)
+
+# --- Armazenamento de Páginas ---
+class PageStore:
+    """ Texto das páginas de um PDF num SQLite temporário em disco. Os processos de extração
+    gravam cada um o seu intervalo e o leitor percorre as páginas sob demanda. """
+    def __init__(self, path: str = None):
+        self._owner = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".sqlite", dir=TMP_DIR)
+            os.close(fd)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=60)
+        if self._owner:
+            # WAL permite que os processos gravem enquanto o leitor consulta os intervalos já prontos
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS pages (num INTEGER PRIMARY KEY, text TEXT NOT NULL)")
+
+    def write(self, start: int, texts):
+        """ Grava os textos (um iterável) como as páginas start, start + 1, ... numa única transação. """
+        with self._conn:
+            self._conn.executemany("INSERT INTO pages (num, text) VALUES (?, ?)", enumerate(texts, start))
+
+    def iter_range(self, start: int, end: int):
+        cursor = self._conn.execute(
+            "SELECT text FROM pages WHERE num >= ? AND num < ? ORDER BY num", (start, end)
+        )
+        for (text,) in cursor:
+            yield text
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+        if self._owner:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.unlink(self.path + suffix)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Backends de Extração ---
+class PdfTextBackend(ABC):
+    """ Interface dos backends: contagem de páginas e texto de um intervalo de páginas, página a página. """
+    name = ""
+
+    @abstractmethod
+    def page_count(self, source) -> int:
+        ...
+
+    @abstractmethod
+    def iter_range(self, source, start: int, end: int):
+        ...
+
+    def extract_range(self, source, start: int, end: int) -> list:
+        return list(self.iter_range(source, start, end))
+
+class PypdfBackend(PdfTextBackend):
+    name = "pypdf"
+
+    def page_count(self, source) -> int:
+        import pypdf
+        return len(pypdf.PdfReader(_open_source(source)).pages)
+
+    def iter_range(self, source, start: int, end: int):
+        import pypdf
+        reader = pypdf.PdfReader(_open_source(source))
+        for i in range(start, end):
+            yield reader.pages[i].extract_text() or ""
+
+class PyMuPDFBackend(PdfTextBackend):
+    name = "pymupdf"
+
+    def page_count(self, source) -> int:
+        with open_pdf(source) as doc:
+            return doc.page_count
+
+    def iter_range(self, source, start: int, end: int):
+        with open_pdf(source) as doc:
+            for i in range(start, end):
+                yield doc[i].get_text("text")
+
+class PdfplumberBackend(PdfTextBackend):
+    name = "pdfplumber"
+
+    def page_count(self, source) -> int:
+        import pdfplumber
+        with pdfplumber.open(_open_source(source)) as pdf:
+            return len(pdf.pages)
+
+    def iter_range(self, source, start: int, end: int):
+        import pdfplumber
+        with pdfplumber.open(_open_source(source)) as pdf:
+            for i in range(start, end):
+                page = pdf.pages[i]
+                yield page.extract_text() or ""
+                page.close()
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PypdfBackend(), PyMuPDFBackend(), PdfplumberBackend())
+}
+
+# Backend de texto de cada tipo de diário (GIL_BACKEND_<TIPO>). Os padrões reproduzem as
+# bibliotecas usadas originalmente; use benchmarks/bench_backends.py antes de trocá-los.
+# O Executivo não aparece aqui: ele lê as coordenadas das palavras diretamente com o PyMuPDF.
+TEXT_BACKENDS = {
+    "Legislativo": os.environ.get("GIL_BACKEND_LEGISLATIVO", "pypdf"),
+    "Administrativo": os.environ.get("GIL_BACKEND_ADMINISTRATIVO", "pymupdf"),
+}
+
+# --- Funções ---
+# Atributos que uma página herda dos nós /Pages ancestrais (PDF 32000-1, 7.7.3.4)
+INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+def iter_pages_lazily(reader: "pypdf.PdfReader", node=None, inherited=None):
+    """ Percorre a árvore de páginas na ordem, lendo cada página só quando ela é alcançada.
+    reader.pages lê todas as páginas logo no primeiro acesso, o que num PDF remoto
+    (download.RangeFile) baixaria trechos do arquivo inteiro. """
+    import pypdf
+    node = reader.root_object["/Pages"].get_object() if node is None else node
+    inherited = dict(inherited or {})
+    inherited.update({key: node[key] for key in INHERITABLE_PAGE_KEYS if key in node})
+    for kid in node["/Kids"]:
+        obj = kid.get_object()
+        if obj.get("/Type") == "/Pages" or "/Kids" in obj:
+            yield from iter_pages_lazily(reader, obj, inherited)
+            continue
+        page = pypdf.PageObject(reader, kid if isinstance(kid, pypdf.generic.IndirectObject) else None)
+        page.update(obj)
+        for key, value in inherited.items():
+            if key not in page:
+                page[pypdf.generic.NameObject(key)] = value
+        yield page
+
+def _store_range(backend_name: str, pdf_path: str, store_path: str, start: int, end: int):
+    """ Executada nos processos auxiliares: extrai o texto das páginas [start, end) direto para o PageStore. """
+    store = PageStore(store_path)
+    try:
+        store.write(start, BACKENDS[backend_name].iter_range(pdf_path, start, end))
+    finally:
+        store.close()
+
+def iter_pages_text(source, workers: int = None, backend: str = "pypdf"):
+    """ Gera o texto de cada página do PDF, na ordem das páginas, usando o backend indicado. """
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    text_backend = BACKENDS[backend]
+    with timing.stage("Abertura do PDF") as etapa:
+        num_pages = etapa["paginas"] = text_backend.page_count(source)
+    if workers <= 1 or num_pages < PARALLEL_MIN_PAGES:
+        yield from text_backend.iter_range(source, 0, num_pages)
+        return
+
+    # Cada processo abre o PDF do disco e grava o seu intervalo no PageStore; o texto não volta
+    # pelo pool e cada intervalo é lido do disco assim que fica pronto, na ordem das páginas
+    chunk = max(1, math.ceil(num_pages / (workers * CHUNKS_PER_WORKER)))
+    starts = range(0, num_pages, chunk)
+    with _pdf_path(source) as pdf_path, PageStore() as store:
+        # "spawn" evita herdar o estado das threads do servidor Streamlit via fork
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(_store_range, backend, pdf_path, store.path, start, min(start + chunk, num_pages))
+                for start in starts
+            ]
+            try:
+                for start, future in zip(starts, futures):
+                    future.result()
+                    yield from store.iter_range(start, start + chunk)
+            finally:
+                # Leitura interrompida (ex.: tempo esgotado): não extrai os intervalos restantes
+                for future in futures:
+                    future.cancel()
+
+def extract_pages_text(source, workers: int = None, backend: str = "pypdf") -> list:
+    """ Retorna o texto de cada página do PDF numa lista (prefira iter_pages_text). """
+    return list(iter_pages_text(source, workers, backend))
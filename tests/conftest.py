@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Configuração comum dos testes (pytest)
+# ======================================
+# Os módulos do aplicativo ficam na raiz do repositório, sem empacotamento: os testes os
+# importam como o Streamlit faz, com a raiz no sys.path.
+# Uso (a partir da raiz do repositório):
+#     python -m pytest tests
+
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class PdfServer:
+    """ Servidor HTTP local com os arquivos registrados por add(). Cada arquivo pode ignorar o
+    cabeçalho Range, responder 503 às primeiras `falhas` requisições ou interromper as primeiras
+    `cortes` respostas na metade do corpo (com o Content-Length completo). Com `desvio`, as
+    respostas 206 começam `desvio` bytes antes da posição pedida, como um servidor com erro. """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []  # (nome, cabeçalho Range ou None)
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        # O cliente fecha a conexão ao desistir de uma resposta (ex.: RangeFile diante de um 200)
+        self._httpd.handle_error = lambda request, client_address: None
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def add(self, name: str, data: bytes, range: bool = True, falhas: int = 0, cortes: int = 0,
+            desvio: int = 0) -> str:
+        self.files[name] = {"data": data, "range": range, "falhas": falhas, "cortes": cortes, "desvio": desvio}
+        return self.url(name)
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}/{name}"
+
+    def ranges(self, name: str) -> list:
+        return [r for n, r in self.requests if n == name]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, headers: dict, body: bytes = b"", enviar: int = None):
+                self.send_response(status)
+                for nome, valor in headers.items():
+                    self.send_header(nome, valor)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                body = body[:enviar] if enviar is not None else body
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent += len(body)
+
+            def do_GET(self):
+                name = self.path.lstrip("/")
+                cabecalho = self.headers.get("Range")
+                with server._lock:
+                    server.requests.append((name, cabecalho))
+                    arquivo = server.files.get(name)
+                    if arquivo is not None and arquivo["falhas"]:
+                        arquivo["falhas"] -= 1
+                        falhar = True
+                    else:
+                        falhar = False
+                    cortar = arquivo is not None and not falhar and arquivo["cortes"] > 0
+                    if cortar:
+                        arquivo["cortes"] -= 1
+                if arquivo is None:
+                    return self._reply(404, {})
+                if falhar:
+                    return self._reply(503, {})
+                data = arquivo["data"]
+                headers = {"Content-Type": "application/pdf"}
+                m = re.match(r"bytes=(\d+)-(\d*)", cabecalho or "")
+                if m and arquivo["range"]:
+                    inicio = max(int(m.group(1)) - arquivo["desvio"], 0)
+                    fim = min(int(m.group(2)), len(data) - 1) if m.group(2) else len(data) - 1
+                    headers["Content-Range"] = f"bytes {inicio}-{fim}/{len(data)}"
+                    status, body = 206, data[inicio:fim + 1]
+                else:
+                    status, body = 200, data
+                if cortar:
+                    # Envia só metade do corpo e fecha a conexão, como uma queda de rede
+                    self.close_connection = True
+                    return self._reply(status, headers, body, enviar=len(body) // 2)
+                self._reply(status, headers, body)
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def pdf_server():
+    with PdfServer() as server:
+        yield server
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    """ Registra as esperas entre tentativas de download.py, sem dormir. """
+    import download
+    registro = []
+    monkeypatch.setattr(download.time, "sleep", registro.append)
+    return registro
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes do índice de atos (act_index.py)
+# ======================================
+
+import fitz
+
+import act_index
+from app import AdministrativeProcessor, export_diary
+
+
+def administrativo_pdf(path, paginas: list) -> str:
+    doc = fitz.open()
+    for texto in paginas:
+        doc.new_page().insert_text((72, 72), texto, fontsize=10)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_administrativo_rows_keep_their_page(tmp_path):
+    """ As linhas do Administrativo levam a página ao índice; o CSV continua só com sigla, número e ano. """
+    pdf = administrativo_pdf(tmp_path / "adm.pdf", [
+        "Diário Administrativo\nPORTARIA DGE Nº 10/2025",
+        "Texto corrido sem atos.",
+        "DELIBERAÇÃO DA MESA Nº 1.234/2025\nDECISÃO DA 1ª-SECRETARIA",
+    ])
+    dados = AdministrativeProcessor(pdf).process_pdf()
+    assert dados == [["PRT", "10", "2025", 1], ["DLB", "1234", "2025", 3], ["DCS", "", "", 3]]
+    assert export_diary(dados, "Administrativo", "csv")[0] == b"PRT\t10\t2025\r\nDLB\t1234\t2025\r\nDCS\t\t\r\n"
+
+    with act_index.ActIndex(str(tmp_path / "atos.sqlite")) as indice:
+        assert indice.ingest("abc", "Administrativo", "2025-03-14", "adm.pdf", dados) == 3
+        [linha] = indice.search(sigla="DLB")
+    registro = dict(zip(act_index.SEARCH_COLUMNS, linha))
+    assert (registro["Número"], registro["Página"], registro["Coluna"]) == ("1234", 3, None)
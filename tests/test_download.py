@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes do download de links (download.py)
+# ======================================
+
+import pytest
+
+import download
+
+
+@pytest.mark.parametrize("url", ["ftp://exemplo/diario.pdf", "sem-esquema.pdf", "http://"])
+def test_download_many_reports_invalid_links_without_stopping(url):
+    """ Links inválidos viram o erro do próprio link; os demais continuam sendo entregues. """
+    resultados = {u: (pdf, erro) for u, pdf, erro in download.download_many([url, "ftp://outro/b.pdf"])}
+    assert set(resultados) == {url, "ftp://outro/b.pdf"}
+    for pdf, erro in resultados.values():
+        assert pdf is None
+        assert isinstance(erro, download.DownloadError)
+
+
+def test_download_many_reports_unexpected_fetch_errors():
+    """ Uma falha qualquer de fetch (não só DownloadError) é entregue como erro do link. """
+    def fetch(url, session):
+        raise ValueError("PDF ilegível")
+    [(url, pdf, erro)] = download.download_many(["http://exemplo/a.pdf"], fetch=fetch)
+    assert pdf is None and isinstance(erro, ValueError)
+
+
+# --- Downloads contra um servidor HTTP local (fixture pdf_server, em conftest.py) ---
+CONTEUDO = bytes(range(256)) * 2000  # 512 KB, vários blocos de CHUNK_SIZE
+
+
+def test_download_pdf_retries_with_backoff(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO, falhas=2)
+    with download.download_pdf(url) as pdf:
+        assert pdf.read() == CONTEUDO
+    assert len(pdf_server.requests) == 3
+    assert esperas == [download.BACKOFF_SECONDS, 2 * download.BACKOFF_SECONDS]
+
+
+def test_download_pdf_gives_up_after_retries(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO, falhas=100)
+    with pytest.raises(download.DownloadError):
+        download.download_pdf(url, retries=2)
+    assert len(pdf_server.requests) == 3
+
+
+def test_download_pdf_does_not_retry_client_errors(pdf_server, esperas):
+    with pytest.raises(download.DownloadError) as erro:
+        download.download_pdf(pdf_server.url("inexistente.pdf"))
+    assert erro.value.status == 404
+    assert len(pdf_server.requests) == 1 and esperas == []
+
+
+def test_download_pdf_resumes_with_range_after_truncated_body(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO, cortes=1)
+    with download.download_pdf(url) as pdf:
+        assert pdf.read() == CONTEUDO
+    primeira, segunda = pdf_server.ranges("diario.pdf")
+    assert primeira is None
+    # A segunda requisição pede só o que faltou
+    recebidos = int(segunda.removeprefix("bytes=").rstrip("-"))
+    assert 0 < recebidos < len(CONTEUDO)
+    # Metade enviada na primeira resposta e, na segunda, só o restante a partir do que chegou
+    assert pdf_server.bytes_sent == len(CONTEUDO) // 2 + len(CONTEUDO) - recebidos
+
+
+def test_download_pdf_restarts_when_content_range_starts_elsewhere(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO, cortes=1, desvio=100)
+    with download.download_pdf(url) as pdf:
+        assert pdf.read() == CONTEUDO
+        assert pdf.size == len(CONTEUDO)
+    # O trecho deslocado é descartado e a terceira requisição baixa o arquivo inteiro
+    primeira, segunda, terceira = pdf_server.ranges("diario.pdf")
+    assert primeira is None and segunda is not None and terceira is None
+
+
+def test_download_pdf_restarts_when_server_ignores_range(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO, range=False, cortes=1)
+    with download.download_pdf(url) as pdf:
+        assert pdf.read() == CONTEUDO
+        assert pdf.size == len(CONTEUDO)
+
+
+def test_download_many_delivers_each_link(pdf_server, esperas):
+    urls = [pdf_server.add(f"{i}.pdf", CONTEUDO[i:]) for i in range(5)] + [pdf_server.url("falta.pdf")]
+    resultados = {url: (pdf, erro) for url, pdf, erro in download.download_many(urls, workers=3)}
+    for i in range(5):
+        pdf, erro = resultados[urls[i]]
+        assert erro is None and pdf.read() == CONTEUDO[i:]
+        pdf.close()
+    assert resultados[urls[-1]][0] is None and resultados[urls[-1]][1].status == 404
+
+
+def test_range_file_fetches_only_the_blocks_read(pdf_server, esperas):
+    url = pdf_server.add("diario.pdf", CONTEUDO)
+    remoto = download.RangeFile(url, block_size=4096)
+    assert remoto.size == len(CONTEUDO)
+    remoto.seek(-100, 2)
+    assert remoto.read() == CONTEUDO[-100:]
+    remoto.seek(10000)
+    assert remoto.read(50) == CONTEUDO[10000:10050]
+    # Primeiro bloco (tamanho do arquivo), último bloco e o bloco do trecho do meio
+    assert remoto.bytes_fetched == 3 * 4096
+
+
+def test_range_file_rejects_servers_without_range(pdf_server):
+    url = pdf_server.add("diario.pdf", CONTEUDO, range=False)
+    with pytest.raises(download.RangeNotSupported):
+        download.RangeFile(url)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes da leitura parcial do Diário do Executivo por Range (app.fetch_executive_section)
+# ======================================
+
+import random
+
+import pytest
+
+import app
+
+
+def executivo_pdf(paginas_depois: int = 30) -> bytes:
+    """ Diário do Executivo com a seção "Leis e Decretos" nas páginas 3 e 4, "Atos do Governador" na 5
+    e `paginas_depois` páginas com uma imagem em seguida, que a leitura parcial não precisa baixar. """
+    import fitz  # PyMuPDF
+    r = random.Random(0)
+    doc = fitz.open()
+    for p in range(6 + paginas_depois):
+        page = doc.new_page()
+        meio = page.rect.width / 2
+        if p == 0:
+            page.insert_text((40, 40), "Diário do Executivo\nSumário\nLeis e Decretos ..... 3\n"
+                             "Atos do Governador ..... 5", fontsize=9)
+        elif p in (2, 3):
+            if p == 2:
+                page.insert_text((meio - 60, 45), "LEIS E DECRETOS", fontsize=12)
+            for coluna in range(2):
+                page.insert_text((20 + coluna * meio, 70), "\n".join([
+                    f"DECRETO Nº {48000 + 2 * p + coluna}, DE 3 DE ABRIL DE 2025",
+                    "Altera o Decreto nº 46.000, de 5 de janeiro de 2020.",
+                    "Art. 1º O art. 2º passa a vigorar com a seguinte redação.",
+                ]), fontsize=6)
+        else:
+            if p == 4:
+                page.insert_text((meio - 70, 45), "ATOS DO GOVERNADOR", fontsize=12)
+            # Imagem de ruído: incompressível, dá peso às páginas sem custar tempo para gerar
+            ruido = fitz.Pixmap(fitz.csRGB, 150, 150, r.randbytes(150 * 150 * 3), False)
+            page.insert_image(fitz.Rect(20, 70, 300, 350), pixmap=ruido)
+    doc.set_metadata({})
+    data = doc.tobytes(no_new_id=True)
+    doc.close()
+    return data
+
+
+@pytest.fixture(scope="module")
+def diario():
+    return executivo_pdf()
+
+
+def test_fetch_executive_section_downloads_only_the_section(pdf_server, diario):
+    url = pdf_server.add("executivo.pdf", diario)
+    with app.fetch_executive_section(url) as pdf:
+        parcial = pdf.read()
+        baixados = pdf.size
+    # Menos de um quinto do arquivo trafega, e as normas extraídas são as do arquivo completo
+    assert baixados == pdf_server.bytes_sent
+    assert baixados * 5 < len(diario)
+    assert all(r is not None for r in pdf_server.ranges("executivo.pdf"))
+    esperado = app.ExecutiveProcessor(diario).process_pdf()
+    assert esperado and app.ExecutiveProcessor(parcial).process_pdf() == esperado
+
+
+def test_fetch_executive_section_falls_back_without_range(pdf_server, diario):
+    url = pdf_server.add("executivo.pdf", diario, range=False)
+    with app.fetch_executive_section(url) as pdf:
+        assert pdf.read() == diario
+        assert pdf.size == len(diario)
+
+
+def test_fetch_executive_section_falls_back_on_unreadable_pdf(pdf_server):
+    conteudo = b"%PDF-1.7\n" + b"isto nao e um PDF valido\n" * 10000
+    url = pdf_server.add("quebrado.pdf", conteudo)
+    with app.fetch_executive_section(url) as pdf:
+        assert pdf.read() == conteudo
+
+
+@pytest.mark.parametrize("erro", [KeyError("/Kids"), app.TimeBudgetExceeded("exec_leis_decretos", 121.0, 120)])
+def test_fetch_executive_section_falls_back_on_parse_errors(pdf_server, diario, monkeypatch, erro):
+    def find_section(page_texts, budget):
+        raise erro
+    monkeypatch.setattr(app.ExecutiveProcessor, "find_section", staticmethod(find_section))
+    url = pdf_server.add("executivo.pdf", diario)
+    with app.fetch_executive_section(url) as pdf:
+        assert pdf.read() == diario
+
+
+def test_fetch_executive_section_reports_network_errors(pdf_server, esperas):
+    import download
+    with pytest.raises(download.DownloadError):
+        app.fetch_executive_section(pdf_server.url("inexistente.pdf"))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes das regras do Diário do Executivo (ExecutiveProcessor, app.py)
+# ======================================
+
+import pytest
+
+from app import ALTERACAO_RAIO, PATTERNS, ExecutiveProcessor
+
+PUBLICADA = "DECRETO Nº 48.000, DE 10 DE JANEIRO DE 2025 "
+
+
+def alteracoes(texto: str) -> list:
+    """ Chaves das alterações registradas para a norma publicada no início da coluna. """
+    dados = ExecutiveProcessor(None).extract_rows([{"pagina": 1, "coluna": 1, "texto": texto}])
+    assert dados[0]["Número"] == "48000"
+    return [linha["Alterações"] for linha in dados if linha["Alterações"]]
+
+
+def altered(texto: str) -> list:
+    """ Normas escolhidas por altered_norms para o primeiro comando do texto. """
+    comando = PATTERNS["exec_comandos"].search(texto)
+    citadas = list(PATTERNS["exec_norma_alterada"].finditer(texto))
+    return [m.group(2).strip() for m in ExecutiveProcessor(None).altered_norms(comando, citadas, [m.start() for m in citadas])]
+
+
+# --- Raio em torno do comando ---
+@pytest.mark.parametrize("distancia, incluida", [(ALTERACAO_RAIO, True), (ALTERACAO_RAIO + 1, False)])
+def test_norm_before_command_window_edge(distancia, incluida):
+    """ Vale a norma que começa até ALTERACAO_RAIO caracteres antes do comando. """
+    norma = "Lei nº 111 "
+    texto = "x" * 50 + norma + "x" * (distancia - len(norma)) + "Ficam revogados os artigos."
+    assert altered(texto) == (["111"] if incluida else [])
+
+
+@pytest.mark.parametrize("distancia, incluida", [(ALTERACAO_RAIO - 1, True), (ALTERACAO_RAIO, False)])
+def test_norm_after_command_window_edge(distancia, incluida):
+    """ Vale a norma que começa antes de ALTERACAO_RAIO caracteres depois do comando, e ela é tomada
+    inteira, mesmo que termine fora do raio (antes, o trecho de ±ALTERACAO_RAIO a cortava). """
+    comando = "Ficam revogados "
+    texto = "x" * 200 + comando + "x" * (distancia - len(comando)) + "Lei nº 12.345, de 1º de março de 2020; x"
+    assert altered(texto) == (["12.345"] if incluida else [])
+
+
+def test_window_edge_norm_is_taken_whole_with_its_year():
+    texto = PUBLICADA + "Ficam revogados " + "x" * (ALTERACAO_RAIO - 20) + "Lei nº 12.345, de 1º de março de 2020."
+    assert alteracoes(texto) == ["LEI 12345 2020"]
+
+
+# --- Norma mais próxima ---
+def test_nearest_norm_wins_and_ties_go_to_the_earlier_one():
+    """ Fora da revogação vale só a norma mais próxima do comando; no empate, a anterior. """
+    antes, depois = "Lei nº 100 ", "Lei nº 200 "
+    comando = "passa a vigorar "
+    # O comando começa a 21 caracteres da primeira norma; a segunda começa a len(comando) + folga dele
+    empate = len(antes) + 10 - len(comando)
+    assert altered(antes + "x" * 10 + comando + "x" * empate + depois) == ["100"]
+    assert altered(antes + "x" * 10 + comando + "x" * (empate - 1) + depois) == ["200"]
+    assert altered(antes + "x" * 10 + comando + "x" * (empate + 1) + depois) == ["100"]
+
+
+def test_revocation_takes_every_norm_in_the_window():
+    texto = PUBLICADA + "Ficam revogados a Lei nº 100, de 2 de maio de 2001, e o Decreto nº 200, de 3 de junho de 2002."
+    assert alteracoes(texto) == ["LEI 100 2001", "DEC 200 2002"]
+
+
+# --- Data da norma alterada ---
+def test_altered_norm_date_is_capped_at_40_characters():
+    """ A data vai até 40 caracteres depois de ", de": um ano mais distante pertence a outro trecho. """
+    assert alteracoes(PUBLICADA + "Fica acrescentado à Lei nº 100, de 1º de dezembro de 2024, o artigo.") == ["LEI 100 2024"]
+    longa = "acordo com o disposto no regulamento aprovado em 2019"
+    assert len(longa) > 40
+    assert alteracoes(PUBLICADA + f"Fica acrescentado à Lei nº 100, de {longa}, o artigo.") == ["LEI 100"]
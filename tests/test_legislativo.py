@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes das regras do Diário do Legislativo (LegislativeProcessor, app.py)
+# ======================================
+# Os textos já estão normalizados como em extract_legislative_text: espaços horizontais
+# reduzidos a um e sem linhas em branco.
+
+import random
+
+import pytest
+
+from app import ANCHOR_RULES, PATTERNS, LegislativeProcessor
+
+
+def planilhas(texto: str) -> dict:
+    return LegislativeProcessor(texto).process_all(workers=1)
+
+
+# --- Requerimentos no padrão antigo ("Nº 12.345/2025, do ...") ---
+REQUERIMENTOS_ANTIGOS = (
+    "REQUERIMENTOS\n"
+    "Nº 12.345/2025, do deputado Fulano, em que requer seja formulado voto de congratulações com a escola.\n"
+    " Nº 12.346/2025, da deputada Beltrana, em que requer seja enviada manifestação de pesar à família.\n"
+    "nº 12.347/2025, da Comissão de Saúde, em que requer moção de aplauso ao hospital.\n"
+    " nº 12.348/2025, do deputado Sicrano, em que requer manifestação de repúdio ao ataque.\n"
+    "Nº 12.349/2025\n"
+    "É encaminhado à comissão o texto acima.\n"
+)
+
+
+def test_old_style_headers_with_and_without_indentation():
+    """ Cabeçalhos recuados abrem requerimento como os demais (antes, o bloco recuado era descartado). """
+    resultado = planilhas(REQUERIMENTOS_ANTIGOS)
+    assert resultado == {
+        "Normas": [],
+        "Proposicoes": [],
+        "Requerimentos": [
+            ["RQN", "12345", "2025", "", "", "Voto de congratulações"],
+            ["RQN", "12346", "2025", "", "", "Manifestação de pesar"],
+            ["RQC", "12347", "2025", "", "", "Moção de aplauso"],
+            ["RQC", "12348", "2025", "", "", "Manifestação de repúdio"],
+        ],
+        "Pareceres": [],
+    }
+
+
+def test_old_style_block_ends_at_next_indented_header():
+    """ O bloco de um requerimento termina no cabeçalho seguinte, recuado ou não: a classificação não vaza. """
+    texto = (
+        "Nº 12.345/2025, do deputado Fulano, em que requer informações.\n"
+        " Nº 12.346/2025, do deputado Beltrano, em que requer manifestação de pesar.\n"
+    )
+    assert planilhas(texto)["Requerimentos"] == [
+        ["RQN", "12345", "2025", "", "", ""],
+        ["RQN", "12346", "2025", "", "", "Manifestação de pesar"],
+    ]
+
+
+# --- Blocos "Votação do Requerimento" na Tramitação de Proposições ---
+# O primeiro bloco é prefixo do segundo: remover o texto do primeiro em todo o diário (como antes)
+# deixava a cauda do segundo, com a conclusão e a emenda do PL 10/2025, na planilha de Pareceres.
+VOTACAO_PREFIXO = (
+    "TRAMITAÇÃO DE PROPOSIÇÕES\n"
+    "Votação do Requerimento nº 1.234/2025\n"
+    "Votação do Requerimento nº 1.234/2025\n"
+    "Conclusão\n"
+    "Opinamos pela aprovação do Projeto de Lei nº 10/2025.\n"
+    "EMENDA Nº 1\n"
+    "Diário do Legislativo\n"
+    "Conclusão\n"
+    "Opinamos pela aprovação do Projeto de Lei nº 20/2025.\n"
+    "EMENDA Nº 1\n"
+    "SUBSTITUTIVO Nº 1\n"
+)
+
+
+def test_votacao_blocks_sharing_a_prefix_are_removed_whole():
+    """ Só os intervalos dos blocos de votação saem do texto: nada do segundo bloco chega aos pareceres. """
+    resultado = planilhas(VOTACAO_PREFIXO)
+    assert resultado["Pareceres"] == [["PL", "20", "2025", "SUB/EMENDA"]]
+    assert resultado["Requerimentos"] == []
+
+
+# --- Pareceres: só nas seções "TRAMITAÇÃO DE PROPOSIÇÕES" ---
+TRAMITACAO_EM_PARTES = (
+    "TRAMITAÇÃO DE PROPOSIÇÕES\n"
+    "Conclusão\n"
+    "Opinamos pela aprovação do Projeto de Lei nº 10/2025.\n"
+    "EMENDA Nº 1\n"
+    "Conforme as ATAS das reuniões anteriores.\n"
+    "SUBSTITUTIVO Nº 1\n"
+    "ATAS\n"
+    "Conclusão\n"
+    "Opinamos pela aprovação do Projeto de Lei nº 30/2025.\n"
+    "EMENDA Nº 2\n"
+    "TRAMITAÇÃO DE PROPOSIÇÕES\n"
+    "Conclusão\n"
+    "Opinamos pela aprovação do Projeto de Resolução nº 20/2025.\n"
+    "SUBSTITUTIVO Nº 1\n"
+)
+
+
+def test_pareceres_span_every_tramitacao_section():
+    """ Cada Tramitação vai até o título seguinte; os pareceres de todas elas entram, os das Atas não.
+    Um título só encerra a seção quando ocupa a linha inteira ("as ATAS das reuniões" não encerra). """
+    assert planilhas(TRAMITACAO_EM_PARTES)["Pareceres"] == [
+        ["PL", "10", "2025", "SUB/EMENDA"],
+        ["PRE", "20", "2025", "SUBSTITUTIVO"],
+    ]
+
+
+@pytest.mark.parametrize("titulo", ["ORDEM DO DIA", " ORDENS DO DIA", "EDITAIS DE CONVOCAÇÃO", "MANIFESTAÇÕES", "MATÉRIA ADMINISTRATIVA"])
+def test_pareceres_after_a_later_heading_are_skipped(titulo):
+    """ A Tramitação termina no título seguinte, recuado ou não: o que vem depois dele não é parecer. """
+    texto = (
+        "TRAMITAÇÃO DE PROPOSIÇÕES\n"
+        "Conclusão\n"
+        "Opinamos pela aprovação do Projeto de Lei nº 10/2025.\n"
+        "EMENDA Nº 1\n"
+        f"{titulo}\n"
+        "Conclusão\n"
+        "Opinamos pela aprovação do Projeto de Lei nº 40/2025.\n"
+        "EMENDA Nº 3\n"
+        "SUBSTITUTIVO Nº 2\n"
+    )
+    assert planilhas(texto)["Pareceres"] == [["PL", "10", "2025", "EMENDA"]]
+
+
+def test_pareceres_without_tramitacao_section():
+    assert planilhas("ATAS\nConclusão\nOpinamos pela aprovação do Projeto de Lei nº 10/2025.\nEMENDA Nº 1\n")["Pareceres"] == []
+
+
+# --- Regras testadas só nas âncoras (ANCHOR_RULES) ---
+# Âncoras sem desfecho ("órfãs") misturadas a ocorrências completas: o caminho das âncoras tem de
+# dar exatamente as ocorrências de PATTERNS[regra].finditer no texto inteiro.
+TRECHOS = [
+    "Ofício nº 12/2025, do Secretário de Estado, encaminhando informações ",
+    "relativas ao Requerimento nº 1.234/2025. ",
+    "Ofício nº 13/2025 sem vírgula nem requerimento. ",
+    "da Comissão de Saúde, informando que, na reunião de ontem, ",
+    "foi aprovado o Requerimento nº 12.345/2025. ",
+    "da Comissão de Educação sem o restante. ",
+    "RECEBIMENTO DE PROPOSIÇÃO ",
+    "REQUERIMENTO Nº 5.678/2025, do deputado Fulano. ",
+    "É recebido pela presidência, submetido a votação e aprovado o Requerimento nº 9.876/2025. ",
+    "É recebido pela presidência, para posterior apreciação, o Requerimento nº 4.321/2025. ",
+    "É recebido pela presidência, e nada mais. ",
+    "\nNº 12.345/2025, do deputado Fulano, em que requer informações. ",
+    "\nnº 12.346/2025, da deputada Beltrana. ",
+    "\nNº sem número. ",
+    "\n - PROJETO DE LEI Nº 1.234/2025 ",
+    "\nPROJETO DE RESOLUÇÃO sem número. ",
+    "\nMENSAGEM Nº 12/2025 ",
+    "texto comum sem âncora. ",
+]
+ORFAS = [
+    "Ofício nº 13/2025 sem vírgula nem requerimento. ",
+    "da Comissão de Educação sem o restante. ",
+    "RECEBIMENTO DE PROPOSIÇÃO ",
+    "É recebido pela presidência, e nada mais. ",
+    "\nNº sem número. ",
+    "\nPROJETO DE RESOLUÇÃO sem número. ",
+]
+
+
+def assert_anchor_path_matches_finditer(texto: str):
+    processador = LegislativeProcessor(texto)
+    for regra in sorted({r for regras in ANCHOR_RULES.values() for r in regras}):
+        esperado = [(m.span(), m.groups()) for m in PATTERNS[regra].finditer(texto)]
+        obtido = [(m.span(), m.groups()) for m in processador._iter_rule(regra)]
+        assert obtido == esperado, regra
+
+
+def test_orphan_anchors_match_plain_finditer():
+    # Cada âncora órfã vem antes de uma ocorrência completa da mesma regra, que o padrão
+    # preguiçoso alcançaria a partir da órfã no texto inteiro
+    texto = "".join(reversed(TRECHOS)) + "".join(TRECHOS)
+    assert_anchor_path_matches_finditer(texto)
+
+
+def test_only_orphan_anchors_match_plain_finditer():
+    texto = "".join(ORFAS)
+    assert_anchor_path_matches_finditer(texto)
+    processador = LegislativeProcessor(texto)
+    assert all(not list(processador._iter_rule(regra)) for regra in ("leg_req_oficio", "leg_req_aprovado_comissao", "leg_req_recebimento"))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_shuffled_anchors_match_plain_finditer(seed):
+    r = random.Random(seed)
+    assert_anchor_path_matches_finditer("".join(r.choice(TRECHOS) for _ in range(60)))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Testes do acompanhamento de pasta (watch.py)
+# ======================================
+
+import shutil
+
+import fitz
+
+import watch
+
+
+def diario_pdf(path, texto: str):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), texto, fontsize=10)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_identical_content_is_processed_once(tmp_path):
+    """ Cópias com o mesmo conteúdo, na mesma varredura ou depois, recebem a saída do original sem reprocessá-lo. """
+    diario_pdf(tmp_path / "a.pdf", "Diário Administrativo\nPORTARIA DGE Nº 10/2025")
+    shutil.copyfile(tmp_path / "a.pdf", tmp_path / "b.pdf")
+    estado = watch.WatchState(tmp_path / watch.STATE_FILE)
+    watch.watch(tmp_path, estado, processos=1, estabilidade=0, uma_vez=True)
+
+    saida_a = tmp_path / "a_Administrativo_Extraido.csv"
+    saida_b = tmp_path / "b_Administrativo_Extraido.csv"
+    assert saida_a.read_bytes() == saida_b.read_bytes() == b"PRT\t10\t2025\r\n"
+    assert estado.get("a.pdf").get("copia_de") is None
+    assert estado.get("b.pdf")["copia_de"] == "a.pdf"
+
+    # Renomeado depois: nada é processado, e o estado reaberto ainda conhece o conteúdo
+    (tmp_path / "b.pdf").rename(tmp_path / "c.pdf")
+    estado = watch.WatchState(tmp_path / watch.STATE_FILE)
+    assert list(watch.pending(tmp_path, estado, set(), estabilidade=0)) == []
+    assert estado.get("c.pdf")["copia_de"] == "a.pdf"
+    assert (tmp_path / "c_Administrativo_Extraido.csv").read_bytes() == saida_a.read_bytes()
+
+
+def test_identical_content_is_reprocessed_when_output_does_not_fit(tmp_path):
+    """ Sem a saída original, ou com outro formato pedido, a cópia é processada normalmente. """
+    diario_pdf(tmp_path / "a.pdf", "Diário Administrativo\nPORTARIA DGE Nº 10/2025")
+    estado = watch.WatchState(tmp_path / watch.STATE_FILE)
+    estado.update("a.pdf", hash="h", diario="Administrativo", saida="a_Administrativo_Extraido.csv", erro=None)
+    shutil.copyfile(tmp_path / "a.pdf", tmp_path / "b.pdf")
+    digest = watch.pdf_hash(str(tmp_path / "b.pdf"))
+    estado.update("a.pdf", hash=digest)
+
+    # A saída de a.pdf não existe
+    assert [nome for _, nome, *_ in watch.pending(tmp_path, estado, {"a.pdf"}, estabilidade=0)] == ["b.pdf"]
+
+    (tmp_path / "a_Administrativo_Extraido.csv").write_bytes(b"PRT\t10\t2025\r\n")
+    assert [nome for _, nome, *_ in watch.pending(tmp_path, estado, {"a.pdf"}, estabilidade=0, formato="jsonl")] == ["b.pdf"]
+    # Em andamento: espera a próxima varredura
+    adiados = set()
+    assert list(watch.pending(tmp_path, estado, {"a.pdf"}, estabilidade=0, hashes={digest}, adiados=adiados)) == []
+    assert adiados == {"b.pdf"}
+
+
+def test_changed_original_hands_its_content_to_a_copy(tmp_path):
+    estado = watch.WatchState(tmp_path / watch.STATE_FILE)
+    estado.update("a.pdf", hash="h1", saida="a_x.csv", erro=None)
+    estado.update("b.pdf", hash="h1", saida="b_x.csv", erro=None, copia_de="a.pdf")
+    assert estado.processed("h1") == "a.pdf"
+    estado.update("a.pdf", hash="h2", saida="a_x.csv", erro=None)
+    assert (estado.processed("h1"), estado.processed("h2")) == ("b.pdf", "a.pdf")
+    estado.update("b.pdf", erro="erro ao processar")
+    assert estado.processed("h1") is None
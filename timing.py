@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Medição de tempo por etapa do processamento
+# ======================================
+# Cada execução (um diário processado) abre um RunTimer com run(); dentro dela, stage()
+# registra o tempo, as páginas e o pico de memória alocada de cada etapa e add() acumula os
+# tempos por regra. Fora de uma execução, stage() e add() não fazem nada, então as funções
+# instrumentadas continuam utilizáveis isoladamente (benchmarks, testes manuais).
+# Com GIL_PROFILE_DIR definido, cada execução grava nesse diretório um perfil do cProfile
+# (.prof, para snakeviz/pstats) e os tempos das etapas em JSON.
+# As etapas em andamento ficam visíveis em RunTimer.progress(), que outra thread pode consultar
+# (ex.: o aplicativo acompanhando um job em segundo plano).
+# Com GIL_TRACE_MEMORY=1, a memória vem do tracemalloc, ligado enquanto houver uma execução
+# aberta (ele deixa a extração várias vezes mais lenta, por isso vem desligado): o pico de cada etapa
+# é o máximo alocado pelo Python acima do que já estava alocado no início dela (os processos
+# auxiliares não entram). O tracemalloc não separa as threads: com jobs simultâneos no mesmo
+# processo, o pico de uma etapa inclui o que os outros alocaram no mesmo intervalo.
+
+# --- Importações ---
+import os
+import re
+import json
+import time
+import cProfile
+import itertools
+import threading
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- Configuração ---
+PROFILE_DIR = os.environ.get("GIL_PROFILE_DIR") or None
+# Mede o pico de memória alocada em cada etapa (desligado por padrão)
+TRACE_MEMORY = os.environ.get("GIL_TRACE_MEMORY") == "1"
+
+_current = contextvars.ContextVar("gil_run_timer", default=None)
+# Número sequencial das execuções gravadas por este processo (ver _dump)
+_dump_counter = itertools.count(1)
+
+# --- Memória por Etapa ---
+# O tracemalloc tem um único pico por processo: antes de zerá-lo no início de uma etapa, o pico
+# até ali é repassado a todas as etapas abertas (de qualquer execução), que guardam o seu máximo
+_memory_lock = threading.Lock()
+_memory_runs = 0
+_memory_owner = False
+_open_stages = []
+
+def _start_memory():
+    global _memory_runs, _memory_owner
+    with _memory_lock:
+        if _memory_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_owner = True
+        _memory_runs += 1
+
+def _stop_memory():
+    global _memory_runs, _memory_owner
+    with _memory_lock:
+        _memory_runs -= 1
+        if _memory_runs == 0 and _memory_owner:
+            tracemalloc.stop()
+            _memory_owner = False
+
+def _stage_begin(registro: dict):
+    with _memory_lock:
+        if not tracemalloc.is_tracing():
+            return
+        atual, pico = tracemalloc.get_traced_memory()
+        for aberta in _open_stages:
+            aberta["_pico"] = max(aberta["_pico"], pico)
+        tracemalloc.reset_peak()
+        registro["_base"] = registro["_pico"] = atual
+        _open_stages.append(registro)
+
+def _stage_end(registro: dict):
+    """ Pico de memória alocada durante a etapa, acima do início dela, em MB (None se não medido). """
+    with _memory_lock:
+        if "_base" not in registro:
+            return None
+        pico = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        for aberta in _open_stages:
+            aberta["_pico"] = max(aberta["_pico"], pico)
+        _open_stages.remove(registro)
+        return (registro.pop("_pico") - registro.pop("_base")) / (1024 * 1024)
+
+# --- Classes ---
+class RunTimer:
+    """ Tempos de uma execução: uma linha por etapa ou regra, na ordem em que foram concluídas. """
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.rows = []
+        self.active = []
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, pages: int = None):
+        """ Mede a etapa; o registro entregue aceita "paginas" e "ocorrencias" preenchidos durante ela. """
+        registro = {"etapa": name, "tipo": "etapa", "segundos": 0.0, "paginas": pages}
+        _stage_begin(registro)
+        inicio = time.perf_counter()
+        self.active.append(registro)
+        try:
+            yield registro
+        finally:
+            self.active.remove(registro)
+            registro["segundos"] = time.perf_counter() - inicio
+            registro["memoria_mb"] = _stage_end(registro)
+            self.rows.append(registro)
+
+    def add(self, name: str, seconds: float, kind: str = "regra", **extra):
+        """ Registra um tempo já medido (ex.: o total de uma regra ao longo do processador). """
+        self.rows.append({"etapa": name, "tipo": kind, "segundos": seconds, **extra})
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def progress(self) -> dict:
+        """ Etapa em andamento (a mais interna) e as páginas e colunas já contadas nas etapas abertas. """
+        active = list(self.active)
+        progresso = {"etapa": active[-1]["etapa"] if active else None}
+        for registro in reversed(active):
+            for chave in ("paginas", "colunas"):
+                if registro.get(chave) is not None:
+                    progresso.setdefault(chave, registro[chave])
+        return progresso
+
+    def to_frame(self):
+        """ Tabela das etapas, com as colunas exibidas no aplicativo. """
+        import pandas as pd
+        colunas = {
+            "etapa": "Etapa", "tipo": "Tipo", "segundos": "Segundos", "paginas": "Páginas",
+            "colunas": "Colunas", "ocorrencias": "Ocorrências", "caracteres": "Caracteres", "memoria_mb": "Pico alocado (MB)",
+        }
+        df = pd.DataFrame(self.rows, columns=list(colunas))
+        return df.rename(columns=colunas).dropna(axis=1, how="all")
+
+    def to_json(self) -> dict:
+        return {"execucao": self.label, "total_segundos": self.total, "etapas": self.rows}
+
+# --- Funções ---
+@contextmanager
+def run(label: str = "", profile_dir: str = None):
+    """ Abre a medição de uma execução e a torna a execução corrente de stage() e add(). """
+    timer = RunTimer(label)
+    token = _current.set(timer)
+    if TRACE_MEMORY:
+        _start_memory()
+    profile_dir = profile_dir or PROFILE_DIR
+    profiler = None
+    if profile_dir:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro perfil já ativo (ex.: outra sessão do Streamlit): registra só os tempos
+            profiler = None
+    try:
+        yield timer
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if TRACE_MEMORY:
+            _stop_memory()
+        _current.reset(token)
+        if profile_dir:
+            _dump(timer, profiler, profile_dir)
+
+def _dump(timer: RunTimer, profiler, profile_dir: str):
+    os.makedirs(profile_dir, exist_ok=True)
+    nome = re.sub(r"[^\w.-]+", "_", timer.label) or "execucao"
+    # pid e número sequencial: execuções no mesmo segundo (ex.: processos do lote) não se sobrescrevem
+    base = os.path.join(profile_dir, f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{next(_dump_counter)}-{nome}")
+    if profiler is not None:
+        profiler.dump_stats(base + ".prof")
+    with open(base + ".json", "w", encoding="utf-8") as fh:
+        json.dump(timer.to_json(), fh, ensure_ascii=False, indent=2)
+
+@contextmanager
+def stage(name: str, pages: int = None):
+    """ Mede uma etapa na execução corrente; sem execução aberta, apenas executa o bloco. """
+    timer = _current.get()
+    if timer is None:
+        yield {}
+        return
+    with timer.stage(name, pages) as registro:
+        yield registro
+
+def add(name: str, seconds: float, kind: str = "regra", **extra):
+    timer = _current.get()
+    if timer is not None:
+        timer.add(name, seconds, kind, **extra)
+
+def timed(iterable, registro: list):
+    """ Repassa os itens do iterável (ex.: as ocorrências de uma regra), somando ao registro [itens, segundos]
+    só o tempo gasto obtendo cada item, e não o de quem os consome. """
+    itens = iter(iterable)
+    while True:
+        inicio = time.perf_counter()
+        item = next(itens, None)
+        registro[1] += time.perf_counter() - inicio
+        if item is None:
+            return
+        registro[0] += 1
+        yield item
+
+def counted(iterable, registro: dict, key: str = "paginas"):
+    """ Repassa os itens do iterável, contando-os no registro da etapa (ex.: páginas lidas). """
+    registro[key] = 0
+    for item in iterable:
+        registro[key] += 1
+        yield item
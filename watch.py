@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Ingestão contínua de uma pasta de diários (linha de comando)
+# ======================================
+"""
+Acompanha um diretório em que as edições são depositadas: a cada varredura,
+os PDFs novos ou alterados (pelo SHA-256 do conteúdo) têm o tipo de diário
+identificado e são processados num pool de processos limitado, com os mesmos
+processadores do aplicativo. Cada saída é gravada ao lado do PDF, como em
+batch.py ("<nome do PDF>_<Tipo>_Extraido.<formato>").
+
+O arquivo de estado (por padrão, .gil_watch.json no diretório acompanhado)
+registra o hash de cada PDF tratado e é regravado a cada arquivo concluído:
+ao reiniciar, nada do que já foi processado é repetido, e os arquivos que
+estavam em andamento são processados de novo. Um PDF renomeado ou copiado,
+com o mesmo conteúdo de outro já processado, não é processado de novo: a
+saída existente é copiada para junto dele, com o nome que ele teria. Um PDF que falhou só é tentado
+outra vez se o seu conteúdo mudar (ou com --repetir-erros). Falhas de um
+arquivo (leitura, processamento, gravação no índice) ficam registradas no
+estado como o seu erro, e o acompanhamento continua.
+
+Um PDF só é lido quando deixa de ser modificado há --estabilidade segundos,
+para não processar um arquivo ainda em cópia. Com --indice, os atos extraídos
+também são gravados no índice de act_index.py.
+
+Uso (a partir da raiz do repositório):
+    python watch.py /srv/diarios
+    python watch.py /srv/diarios --processos 2 --intervalo 60 --indice atos.sqlite
+    python watch.py /srv/diarios --uma-vez --formato jsonl
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import batch
+import writers
+from act_index import ActIndex
+from app import DEFAULT_FORMATS, DIARY_TYPES, edition_date
+from pdf_text import pdf_hash
+
+# --- Configuração ---
+# Intervalo entre as varreduras do diretório, em segundos (GIL_WATCH_INTERVAL)
+WATCH_INTERVAL = float(os.environ.get("GIL_WATCH_INTERVAL", "30"))
+# Tempo sem modificações para que um PDF seja considerado completo, em segundos (GIL_WATCH_SETTLE)
+WATCH_SETTLE = float(os.environ.get("GIL_WATCH_SETTLE", "10"))
+STATE_FILE = ".gil_watch.json"
+
+
+def log(mensagem: str):
+    print(f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S}  {mensagem}", flush=True)
+
+
+class WatchState:
+    """ Estado persistido: para cada PDF (caminho relativo ao diretório), o hash, o tamanho e a data de
+    modificação vistos, o tipo, a saída gravada ou o erro. Regravado por inteiro a cada alteração,
+    num arquivo temporário renomeado sobre o anterior, para nunca ficar pela metade. """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.arquivos = {}
+        if path.exists():
+            self.arquivos = json.loads(path.read_text(encoding="utf-8")).get("arquivos", {})
+        # hash -> nome de um PDF processado com sucesso com esse conteúdo (ver processed)
+        self.por_hash = {}
+        for nome, registro in self.arquivos.items():
+            self._index(nome, registro)
+
+    def get(self, nome: str) -> dict:
+        return self.arquivos.get(nome)
+
+    def processed(self, digest: str) -> str:
+        """ Nome de um PDF já processado com sucesso (com saída e sem erro) com este conteúdo; None se nenhum. """
+        return self.por_hash.get(digest)
+
+    @staticmethod
+    def _reusable(registro: dict) -> bool:
+        return bool(registro.get("hash") and registro.get("saida") and not registro.get("erro"))
+
+    def _index(self, nome: str, registro: dict):
+        if self._reusable(registro):
+            self.por_hash.setdefault(registro["hash"], nome)
+
+    def update(self, nome: str, **campos):
+        anterior = self.arquivos.get(nome, {})
+        self.arquivos[nome] = registro = {**anterior, **campos}
+        digest = anterior.get("hash")
+        if self.por_hash.get(digest) == nome and not (registro.get("hash") == digest and self._reusable(registro)):
+            # O conteúdo deste PDF mudou ou falhou: outro PDF com o conteúdo antigo, se houver, passa a representá-lo
+            del self.por_hash[digest]
+            for outro, dados in self.arquivos.items():
+                if dados.get("hash") == digest:
+                    self._index(outro, dados)
+        self._index(nome, registro)
+        self.save()
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"arquivos": self.arquivos}, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def scan(diretorio: Path, recursivo: bool = False) -> list:
+    """ PDFs do diretório (e dos subdiretórios, se recursivo), sem os arquivos ocultos. """
+    arquivos = diretorio.rglob("*") if recursivo else diretorio.iterdir()
+    return sorted(
+        p for p in arquivos
+        if p.suffix.lower() == ".pdf" and p.is_file()
+        and not any(parte.startswith(".") for parte in p.relative_to(diretorio).parts)
+    )
+
+
+def reuse_output(diretorio: Path, origem: str, path: Path, estado: WatchState, diario: str = None,
+                 formato: str = None) -> Path:
+    """ Copia para junto de `path` a saída já gravada para o PDF `origem`, de mesmo conteúdo, com o nome que
+    batch.py daria a ela. None se essa saída não serve (tipo ou formato pedidos diferentes) ou não existe mais.
+    É uma cópia, e não um link: o reprocessamento da origem regrava a saída dela no mesmo arquivo. """
+    registro = estado.get(origem)
+    if diario is not None and registro.get("diario") != diario:
+        return None
+    extensao = writers.FORMATS[formato or DEFAULT_FORMATS[registro["diario"]]][0]
+    if not registro["saida"].endswith(extensao):
+        return None
+    anterior = (diretorio / origem).parent / registro["saida"]
+    destino = path.parent / f"{path.stem}_{registro['saida'][len(Path(origem).stem) + 1:]}"
+    if not anterior.is_file():
+        return None
+    if destino != anterior:
+        shutil.copyfile(anterior, destino)
+    return destino
+
+
+def pending(diretorio: Path, estado: WatchState, em_andamento: set, recursivo: bool = False,
+            estabilidade: float = WATCH_SETTLE, repetir_erros: bool = False, hashes: set = (),
+            diario: str = None, formato: str = None, adiados: set = None):
+    """ Gera (caminho, nome no estado, hash, tamanho, data de modificação) dos PDFs a processar: os novos e
+    aqueles cujo conteúdo mudou. Tamanho e data iguais aos registrados dispensam a leitura do arquivo.
+    Um conteúdo já processado com sucesso sob outro nome reaproveita aquela saída (ver reuse_output), e
+    um conteúdo em andamento (`hashes`, ou já gerado nesta varredura) espera a próxima varredura (o nome
+    vai para `adiados`). """
+    hashes = set(hashes)
+    for path in scan(diretorio, recursivo):
+        nome = path.relative_to(diretorio).as_posix()
+        if nome in em_andamento:
+            continue
+        try:
+            info = path.stat()
+        except FileNotFoundError:
+            continue
+        if time.time() - info.st_mtime < estabilidade:
+            continue
+        registro = estado.get(nome)
+        repetir = repetir_erros and registro is not None and registro.get("erro")
+        if registro and not repetir and (registro.get("tamanho"), registro.get("mtime")) == (info.st_size, info.st_mtime):
+            continue
+        try:
+            digest = pdf_hash(str(path))
+        except FileNotFoundError:
+            # Removido ou renomeado durante a varredura
+            continue
+        except OSError as e:
+            # Arquivo bloqueado ou ilegível: o erro fica no estado e a leitura é tentada na próxima varredura
+            estado.update(nome, hash=None, tamanho=None, mtime=None, erro=f"leitura do arquivo: {e}")
+            log(f"{nome}: erro de leitura ({e}); nova tentativa na próxima varredura")
+            continue
+        if registro and not repetir and registro.get("hash") == digest:
+            # Só a data de modificação mudou (ex.: arquivo copiado de novo)
+            estado.update(nome, tamanho=info.st_size, mtime=info.st_mtime)
+            continue
+        if digest in hashes:
+            # Outra cópia deste conteúdo está sendo processada: na próxima varredura, a saída dela é reaproveitada
+            if adiados is not None:
+                adiados.add(nome)
+            continue
+        origem = estado.processed(digest)
+        if origem is not None and origem != nome:
+            try:
+                saida = reuse_output(diretorio, origem, path, estado, diario, formato)
+            except OSError as e:
+                log(f"{nome}: não foi possível copiar a saída de {origem} ({e}); o PDF será processado")
+                saida = None
+            if saida is not None:
+                estado.update(
+                    nome, hash=digest, tamanho=info.st_size, mtime=info.st_mtime, diario=estado.get(origem)["diario"],
+                    saida=saida.name, erro=None, copia_de=origem,
+                    processado_em=datetime.datetime.now().isoformat(timespec="seconds"),
+                )
+                log(f"{nome}: mesmo conteúdo de {origem}; saída copiada para {saida.name}")
+                continue
+        hashes.add(digest)
+        yield path, nome, digest, info.st_size, info.st_mtime
+
+
+def process_file(path: Path, diario: str = None, formato: str = None) -> dict:
+    """ Executada nos processos auxiliares: batch.process_file, com a saída ao lado do PDF, e a data
+    da edição (para o índice), lida enquanto o PDF ainda está aberto neste processo. """
+    resultado = batch.process_file(path, diario, path.parent, formato)
+    resultado["data"] = None
+    if resultado["dados"]:
+        try:
+            resultado["data"] = edition_date(str(path), path.name)
+        except Exception:
+            # Sem a data, a edição vai para o índice sem data
+            pass
+    return resultado
+
+
+def finish(resultado: dict, nome: str, digest: str, tamanho: int, mtime: float, estado: WatchState,
+           indice: ActIndex = None):
+    """ Registra no estado (e, com o índice, grava os atos) o resultado de um PDF processado. Uma falha
+    do índice fica registrada como o erro do arquivo, sem descartar a saída já gravada. """
+    path = resultado["arquivo"]
+    if resultado["dados"] and indice is not None:
+        try:
+            atos = indice.ingest(digest, resultado["diario"], resultado.get("data"), path.name, resultado["dados"])
+            log(f"{nome}: {atos} atos gravados no índice" if atos else f"{nome}: edição já estava no índice")
+        except Exception as e:
+            resultado["erro"] = f"índice de atos: {e}"
+    estado.update(
+        nome, hash=digest, tamanho=tamanho, mtime=mtime, diario=resultado["diario"],
+        saida=resultado["saida"] and resultado["saida"].name, erro=resultado["erro"], copia_de=None,
+        processado_em=datetime.datetime.now().isoformat(timespec="seconds"),
+    )
+    status = "; ".join(str(campo) for campo in (resultado["saida"], resultado["erro"]) if campo)
+    log(f"{nome}: {resultado['diario'] or '?'}, {resultado['paginas']} pág. em {resultado['segundos']:.1f}s  {status}")
+
+
+def new_pool(processos: int) -> ProcessPoolExecutor:
+    # "spawn", como em batch.py: os processos importam app.py sem herdar o estado do pai
+    context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=processos, mp_context=context, initializer=batch._init_worker)
+
+
+def watch(diretorio: Path, estado: WatchState, processos: int, diario: str = None, formato: str = None,
+          intervalo: float = WATCH_INTERVAL, estabilidade: float = WATCH_SETTLE, recursivo: bool = False,
+          indice: ActIndex = None, uma_vez: bool = False, repetir_erros: bool = False):
+    """ Varre o diretório a cada `intervalo` segundos e processa os PDFs pendentes no pool; cada resultado é
+    registrado assim que o seu arquivo termina. Com uma_vez, faz uma única varredura e retorna ao concluí-la. """
+    pool = new_pool(processos)
+    em_andamento = {}  # future -> (nome, hash, tamanho, data de modificação, pool)
+    adiados = set()  # cópias de um conteúdo que estava em andamento na última varredura
+    proxima_varredura = 0.0
+    try:
+        while True:
+            if time.monotonic() >= proxima_varredura:
+                nomes = {v[0] for v in em_andamento.values()}
+                hashes = {v[1] for v in em_andamento.values()}
+                adiados.clear()
+                try:
+                    for path, nome, digest, tamanho, mtime in pending(diretorio, estado, nomes, recursivo, estabilidade,
+                                                                      repetir_erros, hashes, diario, formato, adiados):
+                        log(f"{nome}: na fila")
+                        future = pool.submit(process_file, path, diario, formato)
+                        em_andamento[future] = (nome, digest, tamanho, mtime, pool)
+                except OSError as e:
+                    # Diretório momentaneamente inacessível (ex.: compartilhamento de rede): tenta na próxima varredura
+                    log(f"Erro ao varrer {diretorio}: {e}")
+                # Os erros só são repetidos na primeira varredura
+                repetir_erros = False
+                proxima_varredura = float("inf") if uma_vez else time.monotonic() + intervalo
+
+            if not em_andamento:
+                if uma_vez:
+                    if not adiados:
+                        return
+                    # Com o original concluído, uma nova varredura trata as cópias adiadas
+                    proxima_varredura = 0.0
+                    continue
+                time.sleep(max(0.0, proxima_varredura - time.monotonic()))
+                continue
+
+            espera = None if uma_vez else max(0.0, proxima_varredura - time.monotonic())
+            concluidos, _ = wait(em_andamento, timeout=espera, return_when=FIRST_COMPLETED)
+            for future in concluidos:
+                nome, digest, tamanho, mtime, origem = em_andamento.pop(future)
+                try:
+                    resultado = future.result()
+                except Exception as e:
+                    # Ex.: um processo auxiliar morreu (memória esgotada). Com o pool quebrado, os arquivos em
+                    # andamento nele ficam com erro e um novo pool recebe os próximos
+                    erro = "processo auxiliar interrompido" if isinstance(e, BrokenProcessPool) else f"erro ao processar: {e}"
+                    resultado = {"arquivo": diretorio / nome, "diario": diario, "paginas": 0, "segundos": 0.0,
+                                 "saida": None, "dados": None, "erro": erro}
+                    if isinstance(e, BrokenProcessPool) and origem is pool:
+                        pool.shutdown(cancel_futures=True)
+                        pool = new_pool(processos)
+                finish(resultado, nome, digest, tamanho, mtime, estado, indice)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acompanha um diretório e processa os diários novos ou alterados.")
+    parser.add_argument("diretorio", type=Path, help="diretório em que as edições são depositadas")
+    parser.add_argument("--tipo", choices=[*DIARY_TYPES, "auto"], default="auto",
+                        help="tipo dos diários; 'auto' identifica cada arquivo pela primeira página")
+    parser.add_argument("--formato", choices=["padrao", "jsonl", "parquet"], default="padrao",
+                        help="formato dos arquivos gerados; 'padrao' é o do aplicativo (XLSX no Legislativo, CSV nos demais)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="arquivos processados em paralelo")
+    parser.add_argument("--intervalo", type=float, default=WATCH_INTERVAL, help="segundos entre as varreduras")
+    parser.add_argument("--estabilidade", type=float, default=WATCH_SETTLE,
+                        help="segundos sem modificação para que um PDF seja processado")
+    parser.add_argument("--estado", type=Path, help=f"arquivo de estado (padrão: {STATE_FILE} no diretório)")
+    parser.add_argument("--recursivo", action="store_true", help="inclui os subdiretórios")
+    parser.add_argument("--indice", metavar="BANCO", help="grava também os atos extraídos neste índice (act_index.py)")
+    parser.add_argument("--repetir-erros", action="store_true", help="tenta de novo os PDFs que falharam")
+    parser.add_argument("--uma-vez", action="store_true", help="faz uma única varredura e encerra ao concluí-la")
+    args = parser.parse_args()
+    if not args.diretorio.is_dir():
+        parser.error(f"diretório não encontrado: {args.diretorio}")
+    if args.formato == "parquet" and not writers.parquet_available():
+        parser.error("o formato parquet exige o pacote pyarrow")
+
+    # SIGTERM (ex.: parada do serviço) encerra como Ctrl+C: o pool é desfeito e o estado já está gravado
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    estado = WatchState(args.estado or args.diretorio / STATE_FILE)
+    indice = ActIndex(args.indice) if args.indice else None
+    diario = None if args.tipo == "auto" else args.tipo
+    formato = None if args.formato == "padrao" else args.formato
+    log(f"Acompanhando {args.diretorio} ({len(estado.arquivos)} PDFs no estado, {args.processos} processos)")
+    try:
+        watch(args.diretorio, estado, args.processos, diario, formato, args.intervalo, args.estabilidade,
+              args.recursivo, indice, args.uma_vez, args.repetir_erros)
+    except KeyboardInterrupt:
+        log("Interrompido; os arquivos em andamento serão processados na próxima execução")
+    finally:
+        if indice is not None:
+            indice.close()
+
+
+if __name__ == "__main__":
+    main()
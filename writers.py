@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# ======================================
+# Gravação dos arquivos de saída
+# ======================================
+# Os processadores entregam listas de linhas e cada formato é gravado linha a linha, sem
+# DataFrames intermediários: o XLSX usa o modo write-only do openpyxl (as células não ficam
+# em memória depois de gravadas) e o CSV é codificado à medida que as linhas são escritas.
+# JSONL e Parquet atendem as cargas posteriores; o Parquet depende do pyarrow (opcional).
+
+# --- Importações ---
+import io
+import csv
+import json
+import importlib.util
+
+# --- Configuração ---
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Formato -> (extensão, MIME)
+FORMATS = {
+    "xlsx": (".xlsx", XLSX_MIME),
+    "csv": (".csv", "text/csv"),
+    "jsonl": (".jsonl", "application/jsonl"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+# --- Funções ---
+def write_xlsx(sheets: dict) -> bytes:
+    """ Grava {nome da planilha: linhas} num XLSX, sem cabeçalho, em modo write-only. """
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for sheet_name, rows in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row in rows:
+            sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+def write_csv(rows, header: list = None, delimiter: str = ",", lineterminator: str = "\n") -> bytes:
+    """ Grava as linhas em CSV UTF-8 (sem BOM), codificando-as à medida que são escritas. """
+    output = io.BytesIO()
+    with io.TextIOWrapper(output, encoding="utf-8", newline="", write_through=True) as text:
+        writer = csv.writer(text, delimiter=delimiter, lineterminator=lineterminator)
+        if header:
+            writer.writerow(header)
+        writer.writerows(rows)
+        text.flush()
+        return output.getvalue()
+
+def records(rows, columns: list, **fixed):
+    """ Converte as linhas em dicionários {coluna: valor}, com os campos fixos (ex.: planilha) à frente. """
+    for row in rows:
+        yield {**fixed, **dict(zip(columns, row))}
+
+def write_jsonl(recs) -> bytes:
+    """ Um objeto JSON por linha (JSON Lines). """
+    output = io.BytesIO()
+    for rec in recs:
+        output.write(json.dumps(rec, ensure_ascii=False).encode("utf-8"))
+        output.write(b"\n")
+    return output.getvalue()
+
+def write_parquet(recs, columns: list) -> bytes:
+    """ Grava os registros num Parquet com as colunas indicadas (texto; ausentes ficam nulas). """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    recs = list(recs)
+    table = pa.table({
+        col: pa.array([None if rec.get(col) is None else str(rec[col]) for rec in recs], type=pa.string())
+        for col in columns
+    })
+    output = io.BytesIO()
+    pq.write_table(table, output)
+    return output.getvalue()